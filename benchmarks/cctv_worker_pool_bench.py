@@ -0,0 +1,81 @@
+"""Benchmark for CCTV bulk status checks on a mixed-health fleet: fixed batches of 10 vs the sliding-window worker pool.
+
+Run from the repo root:  python benchmarks/cctv_worker_pool_bench.py [devices] [slow_percent]
+
+Devices are simulated (no network): most answer in ~0.3s, some are offline and
+fail fast, and ``slow_percent`` of them hang until a 3s timeout (the 30s
+RTMP/TRTC timeouts, scaled down). Both variants run the same per-device function.
+"""
+import os
+import random
+import sys
+import time
+import concurrent.futures as futures
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.common.concurrency import AdaptiveLimiter  # noqa: E402
+from modules.cctv_tools.worker_pool import DeviceWorkerPool, time_left  # noqa: E402
+
+HEALTHY_SECONDS = 0.3
+OFFLINE_SECONDS = 0.05
+TIMEOUT_SECONDS = 3.0
+
+
+def make_fleet(count: int, slow_percent: float):
+    rng = random.Random(42)
+    fleet = []
+    for i in range(count):
+        roll = rng.random() * 100
+        kind = "slow" if roll < slow_percent else ("offline" if roll < slow_percent + 10 else "healthy")
+        fleet.append({"ip": f"10.0.{i // 256}.{i % 256}", "room": f"R{i}", "kind": kind})
+    return fleet
+
+
+def check_device(device, deadline=None):
+    kind = device["kind"]
+    if kind == "offline":
+        time.sleep(OFFLINE_SECONDS)
+        return {"ip": device["ip"], "status": "error", "message": "Device offline - connection failed"}
+    if kind == "slow":
+        time.sleep(time_left(deadline, TIMEOUT_SECONDS))
+        return {"ip": device["ip"], "status": "error", "message": "Error: Read timed out"}
+    time.sleep(HEALTHY_SECONDS * random.uniform(0.8, 1.2))
+    return {"ip": device["ip"], "status": "success", "message": "Device online"}
+
+
+def fixed_batches(fleet):
+    """The previous implementation: groups of 10, a new pool per group, each group waits for its slowest device"""
+    results = []
+    for i in range(0, len(fleet), 10):
+        with futures.ThreadPoolExecutor(max_workers=10) as executor:
+            results.extend(executor.map(check_device, fleet[i:i + 10]))
+    return results
+
+
+def sliding_window(fleet):
+    pool = DeviceWorkerPool(AdaptiveLimiter("bench", 10, 2, 32, adaptive=False))
+    try:
+        return list(pool.submit("Status check", check_device, fleet, deadline_seconds=20))
+    finally:
+        pool.shutdown()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    slow_percent = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    fleet = make_fleet(count, slow_percent)
+    kinds = {kind: sum(1 for d in fleet if d["kind"] == kind) for kind in ("healthy", "offline", "slow")}
+    print(f"📊 {count} devices {kinds}, 10 concurrent in both variants")
+    print(f"{'variant':<18}{'seconds':>10}{'results':>10}")
+    timings = {}
+    for name, fn in (("fixed batches", fixed_batches), ("sliding window", sliding_window)):
+        start = time.perf_counter()
+        results = fn(fleet)
+        timings[name] = time.perf_counter() - start
+        print(f"{name:<18}{timings[name]:>10.2f}{len(results):>10}")
+    print(f"speedup: {timings['fixed batches'] / timings['sliding window']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark for parsing a synthetic 50k-entry lognavigator.xml: legacy in-memory parse vs streaming iterparse.
+
+Run from the repo root:  python benchmarks/lognavigator_parse_bench.py [entries] [repeat]
+
+Each variant runs in its own process so the peak RSS it reports is its own.
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lxml import etree  # noqa: E402
+
+from config import settings  # noqa: E402
+from modules.common import inventory  # noqa: E402
+
+GROUPS = settings.OSMACHINE_ALLOWED_GROUPS + ["OSM_QAT", "OSM_UAT", "SRS_LOGS", "CCTV"]
+
+
+def make_file(path: str, entries: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<lognavigator-config>\n')
+        for i in range(entries):
+            group = GROUPS[i % len(GROUPS)]
+            f.write(
+                f'  <log-access-config id="OSM{i:05d}" type="HTTPD" url="http://10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}:80" '
+                f'display-group="{group}" directory="/var/log/osm/{group.lower()}/{i:05d}">\n'
+                f'    <description>Machine {i} of {group}, studio log access</description>\n'
+                f'  </log-access-config>\n'
+            )
+        f.write('</lognavigator-config>\n')
+
+
+def legacy_parse(path: str) -> dict:
+    """The previous implementation: whole file as str, re-encoded, counted, then findall over the full tree"""
+    with open(path, 'r', encoding='utf-8') as f:
+        xml_content = f.read()
+    xml_content.count('<log-access-config')
+    root = etree.fromstring(xml_content.encode('utf-8'))
+    machines = {}
+    for config in root.findall('.//log-access-config'):
+        display_group = config.get('display-group') or 'Unknown'
+        if display_group not in settings.OSMACHINE_ALLOWED_GROUPS:
+            continue
+        url = config.get('url', '')
+        ip = url.replace('http://', '').replace('https://', '').replace(':80', '').replace(':443', '')
+        machines.setdefault(display_group, []).append({
+            'ip': ip.split(':')[0], 'config_id': config.get('id', 'Unknown'), 'display_group': display_group,
+            'url': url, 'status': 'unknown'
+        })
+    return machines
+
+
+def streaming_parse(path: str) -> dict:
+    inventory._lognav_cache.clear()
+    machines = inventory.parse_lognavigator(path, settings.OSMACHINE_ALLOWED_GROUPS)
+    return {group: machines.find_dicts('display_group', group) for group in machines.keys('display_group')}
+
+
+def cached_parse(path: str) -> dict:
+    """Same content again (e.g. the file was rewritten unchanged): only the sha1 is computed"""
+    machines = inventory.parse_lognavigator(path, settings.OSMACHINE_ALLOWED_GROUPS)
+    return {group: machines.find_dicts('display_group', group) for group in machines.keys('display_group')}
+
+
+VARIANTS = {"legacy": legacy_parse, "iterparse": streaming_parse, "iterparse (cached)": cached_parse}
+
+
+def run_one(name: str, path: str, repeat: int):
+    """Child process: time one variant and report its peak RSS above the post-import baseline"""
+    fn = VARIANTS[name]
+    if name == "iterparse (cached)":
+        streaming_parse(path)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(path)
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+    print(f"{elapsed:.1f} {peak / 1024:.1f} {sum(len(m) for m in result.values())}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--one":
+        run_one(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "lognavigator.xml")
+        make_file(path, entries)
+        print(f"📊 {entries}-entry lognavigator.xml ({os.path.getsize(path) / 1024 / 1024:.1f} MB), mean of {repeat} runs")
+        print(f"{'variant':<22}{'ms':>10}{'peak MB':>10}{'machines':>10}")
+        for name in VARIANTS:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--one", name, path, str(repeat)],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            elapsed, peak, machines = output[-3:]
+            print(f"{name:<22}{float(elapsed):>10.1f}{float(peak):>10.1f}{machines:>10}")
+
+
+if __name__ == "__main__":
+    main()
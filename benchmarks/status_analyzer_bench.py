@@ -0,0 +1,82 @@
+"""Micro-benchmark for the Image Recon log status analyzer on 10k-line buffers.
+
+Run from the repo root:  python benchmarks/status_analyzer_bench.py [lines] [repeat]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.image_recon_service.status_analyzer import DEFAULT_INDICATORS, StatusAnalyzer  # noqa: E402
+
+
+def make_buffer(lines: int, tail: str = "") -> str:
+    body = [
+        f"Oct 07 11:{(i // 60) % 60:02d}:{i % 60:02d} image-recon-server osm[1234]: "
+        f"[INFO] Processing request {i} from client id=cam{i % 97} frame ok latency={i % 40}ms"
+        for i in range(lines)
+    ]
+    if tail:
+        body[-lines // 10] = tail
+    return "\n".join(body)
+
+
+def legacy_analyze(logs: str) -> str:
+    """The previous implementation: lowercase the buffer again for every indicator"""
+    for indicator in DEFAULT_INDICATORS["offline"]:
+        if indicator in logs.lower():
+            return "Offline"
+    if "Error:" in logs and any(i in logs.lower() for i in DEFAULT_INDICATORS["connection_error"]):
+        return "Offline"
+    for indicator in DEFAULT_INDICATORS["error"]:
+        if indicator in logs.lower():
+            return f"Error: {indicator}"
+    return "Online"
+
+
+_COMBINED = re.compile("|".join(
+    re.escape(i) for i in sorted(DEFAULT_INDICATORS["offline"] + DEFAULT_INDICATORS["error"], key=len, reverse=True)
+))
+
+
+def combined_regex_scan(logs: str) -> list:
+    """Single combined alternation over the lowercased buffer (the other candidate design)"""
+    return [match.group(0) for match in _COMBINED.finditer(logs.lower())]
+
+
+def timed(fn, logs: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(logs)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    analyzer = StatusAnalyzer(DEFAULT_INDICATORS)
+
+    buffers = {
+        "clean": make_buffer(lines),
+        "error (last indicator)": make_buffer(lines, "osm[1234]: [ERROR] curl handler not initialized"),
+        "offline": make_buffer(lines, "systemd[1]: Stopped OSM Service."),
+    }
+
+    print(f"📊 {lines}-line buffers, mean of {repeat} runs (ms)")
+    print(f"{'buffer':<24}{'legacy':>10}{'regex':>10}{'analyzer':>10}   analyzer status / hits")
+    for name, logs in buffers.items():
+        result = analyzer.analyze(logs, "bench")
+        assert result["status_text"] == legacy_analyze(logs), name
+        print(
+            f"{name:<24}"
+            f"{timed(legacy_analyze, logs, repeat):>10.2f}"
+            f"{timed(combined_regex_scan, logs, repeat):>10.2f}"
+            f"{timed(analyzer.scan, logs, repeat):>10.2f}"
+            f"   {result['status_text']} {[(h['indicator'], h['line']) for h in result['hits']]}"
+        )
+
+
+if __name__ == "__main__":
+    main()
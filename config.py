@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings:
     # Environment Configuration
@@ -10,12 +10,127 @@ class Settings:
     # SSH Configuration
     SSH_USERNAME: str = os.getenv("SSH_USERNAME", "ubuntu")
     SSH_KEY_PATH: str = os.getenv("SSH_KEY_PATH", "static/keys/image_identifier.pem")
+    SSH_POOL_MAX_PER_HOST: int = int(os.getenv("SSH_POOL_MAX_PER_HOST", "4"))
+    SSH_POOL_IDLE_TIMEOUT: int = int(os.getenv("SSH_POOL_IDLE_TIMEOUT", "300"))
+    
+    # Remote execution backend for fleet operations: "paramiko" (threads) or "asyncssh" (asyncio)
+    SSH_BACKEND: str = os.getenv("SSH_BACKEND", "paramiko")
+    ASYNC_SSH_MAX_CONCURRENCY: int = int(os.getenv("ASYNC_SSH_MAX_CONCURRENCY", "50"))
+    ASYNC_SSH_HOST_TIMEOUT: int = int(os.getenv("ASYNC_SSH_HOST_TIMEOUT", "30"))
+    
+    # Thread lanes for blocking work dispatched from async routes (per module)
+    EXECUTOR_IMAGE_RECON_WORKERS: int = int(os.getenv("EXECUTOR_IMAGE_RECON_WORKERS", "8"))
+    EXECUTOR_OSMACHINE_WORKERS: int = int(os.getenv("EXECUTOR_OSMACHINE_WORKERS", "8"))
+    EXECUTOR_CCTV_TOOLS_WORKERS: int = int(os.getenv("EXECUTOR_CCTV_TOOLS_WORKERS", "4"))
+    EXECUTOR_QUEUE_LIMIT: int = int(os.getenv("EXECUTOR_QUEUE_LIMIT", "32"))
+    
+    # Image Recon server refresh: concurrent SSH fetches and overall time budget (seconds)
+    IR_REFRESH_PARALLELISM: int = int(os.getenv("IR_REFRESH_PARALLELISM", "20"))
+    IR_REFRESH_DEADLINE: int = int(os.getenv("IR_REFRESH_DEADLINE", "120"))
+    
+    # Scheduled version check: concurrent version fetches and total runtime budget (seconds)
+    VERSION_CHECK_PARALLELISM: int = int(os.getenv("VERSION_CHECK_PARALLELISM", "20"))
+    VERSION_CHECK_BUDGET: int = int(os.getenv("VERSION_CHECK_BUDGET", "30"))
+    # Service status check (/check-status): concurrent snapshots and total runtime budget (seconds)
+    IR_STATUS_CHECK_PARALLELISM: int = int(os.getenv("IR_STATUS_CHECK_PARALLELISM", "20"))
+    IR_STATUS_CHECK_BUDGET: int = int(os.getenv("IR_STATUS_CHECK_BUDGET", "60"))
+    
+    # Image Recon version cache: fresh TTL, how long stale values may still be served, background refresh
+    VERSION_CACHE_TTL: int = int(os.getenv("VERSION_CACHE_TTL", "600"))
+    VERSION_CACHE_MAX_STALE: int = int(os.getenv("VERSION_CACHE_MAX_STALE", "3600"))
+    VERSION_REFRESH_INTERVAL: int = int(os.getenv("VERSION_REFRESH_INTERVAL", "540"))
+    VERSION_REFRESH_PARALLELISM: int = int(os.getenv("VERSION_REFRESH_PARALLELISM", "10"))
+    VERSION_REFRESH_JITTER: float = float(os.getenv("VERSION_REFRESH_JITTER", "5"))
+    
+    # Journal reads: per-server ring buffer fed incrementally via journalctl cursors
+    JOURNAL_BUFFER_LINES: int = int(os.getenv("JOURNAL_BUFFER_LINES", "2000"))
+    JOURNAL_INITIAL_LINES: int = int(os.getenv("JOURNAL_INITIAL_LINES", "500"))
+    JOURNAL_MIN_READ_INTERVAL: float = float(os.getenv("JOURNAL_MIN_READ_INTERVAL", "1"))
+    
+    # Live log streaming (SSE): per-client queue size, max delivered lines/sec, keepalive interval
+    LOG_STREAM_QUEUE_SIZE: int = int(os.getenv("LOG_STREAM_QUEUE_SIZE", "1000"))
+    LOG_STREAM_MAX_LINES_PER_SEC: float = float(os.getenv("LOG_STREAM_MAX_LINES_PER_SEC", "50"))
+    LOG_STREAM_HEARTBEAT: float = float(os.getenv("LOG_STREAM_HEARTBEAT", "15"))
+    
+    # Rolling service restarts: wave size, max share of the fleet down at once, abort threshold, health gate
+    RESTART_WAVE_SIZE: int = int(os.getenv("RESTART_WAVE_SIZE", "5"))
+    RESTART_MAX_DOWN_PERCENT: float = float(os.getenv("RESTART_MAX_DOWN_PERCENT", "20"))
+    RESTART_FAILURE_THRESHOLD: float = float(os.getenv("RESTART_FAILURE_THRESHOLD", "0.3"))
+    RESTART_HEALTH_TIMEOUT: int = int(os.getenv("RESTART_HEALTH_TIMEOUT", "120"))
+    RESTART_HEALTH_INTERVAL: int = int(os.getenv("RESTART_HEALTH_INTERVAL", "5"))
+    
+    # Background jobs: worker threads, finished jobs kept, min seconds between progress saves
+    JOBS_MAX_WORKERS: int = int(os.getenv("JOBS_MAX_WORKERS", "4"))
+    JOBS_HISTORY: int = int(os.getenv("JOBS_HISTORY", "100"))
+    JOBS_PERSIST_INTERVAL: float = float(os.getenv("JOBS_PERSIST_INTERVAL", "2"))
+    
+    # Image recon update rollout: canary server(s), then concurrent waves gated on the new version in the journal
+    IR_UPDATE_CANARY_SIZE: int = int(os.getenv("IR_UPDATE_CANARY_SIZE", "1"))
+    IR_UPDATE_WAVE_SIZE: int = int(os.getenv("IR_UPDATE_WAVE_SIZE", "5"))
+    IR_UPDATE_FAILURE_THRESHOLD: float = float(os.getenv("IR_UPDATE_FAILURE_THRESHOLD", "0.2"))
+    IR_UPDATE_SCRIPT_TIMEOUT: int = int(os.getenv("IR_UPDATE_SCRIPT_TIMEOUT", "600"))
+    IR_UPDATE_VERSION_TIMEOUT: int = int(os.getenv("IR_UPDATE_VERSION_TIMEOUT", "300"))
+    IR_UPDATE_POLL_INTERVAL: int = int(os.getenv("IR_UPDATE_POLL_INTERVAL", "5"))
+    # Version every updated server must come up on (e.g. "3.1.2337-1"); empty = the first canary's new version
+    IR_UPDATE_TARGET_VERSION: str = os.getenv("IR_UPDATE_TARGET_VERSION", "")
+    # Servers never updated (comma-separated IPs)
+    IR_UPDATE_IGNORE_IPS: List[str] = [
+        ip.strip() for ip in os.getenv("IR_UPDATE_IGNORE_IPS", "10.50.14.119").split(",") if ip.strip()
+    ]
+    
+    # Config file watcher: poll interval (seconds) and whether to use inotify when watchfiles is installed
+    FILE_WATCH_INTERVAL: float = float(os.getenv("FILE_WATCH_INTERVAL", "2"))
+    FILE_WATCH_INOTIFY: bool = os.getenv("FILE_WATCH_INOTIFY", "true").lower() in ("1", "true", "yes")
+    
+    # OSMachine: lognavigator.xml display groups that are loaded (comma-separated)
+    OSMACHINE_ALLOWED_GROUPS: List[str] = [
+        group.strip() for group in os.getenv(
+            "OSMACHINE_ALLOWED_GROUPS",
+            "OSM_CP,OSM_TBP,OSM_TBR,OSM_WF,OSM_NCH,OSM_DHS,OSM_MDR,OSM_NP,OSM_LUCKYLINK,LUCKYLINK_NCH"
+        ).split(",") if group.strip()
+    ]
+    # OSMachine bulk status: TCP connect + SSH banner pre-scan timeout (seconds) and concurrent sockets
+    OSMACHINE_PROBE_TIMEOUT: float = float(os.getenv("OSMACHINE_PROBE_TIMEOUT", "2"))
+    OSMACHINE_PROBE_CONCURRENCY: int = int(os.getenv("OSMACHINE_PROBE_CONCURRENCY", "256"))
+    # OSMachine status store: background prober cadence (seconds; per group as "GROUP=seconds,..."), max result age served
+    OSMACHINE_PROBER_ENABLED: bool = os.getenv("OSMACHINE_PROBER_ENABLED", "true").lower() in ("1", "true", "yes")
+    OSMACHINE_PROBE_INTERVAL: int = int(os.getenv("OSMACHINE_PROBE_INTERVAL", "300"))
+    OSMACHINE_PROBE_GROUP_INTERVALS: Dict[str, int] = {
+        group.strip(): int(seconds)
+        for group, _, seconds in (
+            entry.partition("=") for entry in os.getenv("OSMACHINE_PROBE_GROUP_INTERVALS", "").split(",") if "=" in entry
+        )
+    }
+    OSMACHINE_STATUS_MAX_AGE: int = int(os.getenv("OSMACHINE_STATUS_MAX_AGE", "600"))
+    
+    # Adaptive concurrency (AIMD) for bulk SSH/HTTP fan-outs; limits per target class as "class=initial:min:max,..."
+    ADAPTIVE_CONCURRENCY_ENABLED: bool = os.getenv("ADAPTIVE_CONCURRENCY_ENABLED", "true").lower() in ("1", "true", "yes")
+    ADAPTIVE_CONCURRENCY_LIMITS: Dict[str, tuple] = {
+        name.strip(): tuple(int(value) for value in limits.split(":"))
+        for name, _, limits in (
+            entry.partition("=") for entry in os.getenv("ADAPTIVE_CONCURRENCY_LIMITS", "").split(",") if "=" in entry
+        )
+    }
+    # Back off (multiply the limit by ADAPTIVE_BACKOFF) when latency exceeds tolerance x baseline or errors exceed the threshold
+    ADAPTIVE_LATENCY_TOLERANCE: float = float(os.getenv("ADAPTIVE_LATENCY_TOLERANCE", "2"))
+    ADAPTIVE_ERROR_THRESHOLD: float = float(os.getenv("ADAPTIVE_ERROR_THRESHOLD", "0.2"))
+    ADAPTIVE_BACKOFF: float = float(os.getenv("ADAPTIVE_BACKOFF", "0.7"))
+    
+    # CCTV bulk status/configuration: time budget per device (seconds), counted from when a worker picks it up
+    CCTV_STATUS_DEADLINE: float = float(os.getenv("CCTV_STATUS_DEADLINE", "20"))
+    CCTV_CONFIGURE_DEADLINE: float = float(os.getenv("CCTV_CONFIGURE_DEADLINE", "60"))
+    # CCTV HTTP keep-alive sessions: devices keeping open connections, idle connections per device, idle seconds before closing
+    CCTV_HTTP_MAX_SESSIONS: int = int(os.getenv("CCTV_HTTP_MAX_SESSIONS", "128"))
+    CCTV_HTTP_CONNECTIONS_PER_DEVICE: int = int(os.getenv("CCTV_HTTP_CONNECTIONS_PER_DEVICE", "2"))
+    CCTV_HTTP_IDLE_SECONDS: float = float(os.getenv("CCTV_HTTP_IDLE_SECONDS", "15"))
     
     # File Paths
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
     LOG_DIR: str = os.getenv("LOG_DIR", "logs")
     TYPE_DIR: str = os.getenv("TYPE_DIR", "type")
     FIRMWARE_DIR: str = os.getenv("FIRMWARE_DIR", "static/update")
+    JOBS_STATE_FILE: str = os.getenv("JOBS_STATE_FILE", os.path.join(LOG_DIR, "jobs.json"))
+    OSMACHINE_STATUS_DB: str = os.getenv("OSMACHINE_STATUS_DB", os.path.join(LOG_DIR, "osmachine_status.db"))
     
     # Server Configuration
     HOST: str = os.getenv("HOST", "0.0.0.0")
@@ -14,67 +14,52 @@ from modules.image_recon_service.router import router as image_recon_service_rou
 from modules.cctv_tools.router import router as cctv_tools_router
 from modules.osmachine.router import router as osmachine_router
 from modules.config_editor.router import router as config_editor_router
+from modules.jobs.router import router as jobs_router
 
-# Import service manager for background tasks
-from modules.image_recon_service.service import ImageReconServiceManager
-
-# Create a shared service manager instance for caching
-shared_service_manager = ImageReconServiceManager()
+# Shared service instances (routers resolve the same ones through app.state.services)
+from modules.common.registry import services
+from modules.common.ssh_pool import ssh_pool
+from modules.common.async_ssh import async_ssh_runner
+from modules.common.executor import blocking_executor, run_blocking
+from modules.common.jobs import jobs
+from modules.common.file_watch import file_watcher
+from modules.common.concurrency import limiters
 
 # Background task for version caching
 async def refresh_version_cache_periodically():
-    """Background task to refresh version cache every 10 minutes"""
-    global shared_service_manager
+    """Background task to revalidate the version cache before entries go stale"""
+    image_recon_service_manager = services.get("image_recon_service")
     
     while True:
         try:
             print("🔄 [Background] Starting periodic version cache refresh...")
-            servers = shared_service_manager.get_image_recon_servers()
+            servers = image_recon_service_manager.get_image_recon_servers()
             
             if servers:
-                # Pre-fetch all versions to populate cache
-                for server in servers:
-                    try:
-                        version = shared_service_manager._get_server_version(server['ip'])
-                        print(f"✅ [Background] Cached version for {server['hostname']}: {version}")
-                    except Exception as e:
-                        print(f"⚠️ [Background] Failed to cache version for {server['hostname']}: {e}")
-                
-                print(f"✅ [Background] Version cache refresh completed for {len(servers)} servers")
+                # Parallel, jittered revalidation; failures keep serving the previous value
+                results = await run_blocking("image_recon_service", image_recon_service_manager.refresh_versions, servers)
+                failed = sum(1 for result in results.values() if isinstance(result, Exception))
+                print(f"✅ [Background] Version cache refresh completed for {len(servers)} servers ({failed} failed)")
             else:
                 print("⚠️ [Background] No servers found for version caching")
         except Exception as e:
             print(f"❌ [Background] Error in version cache refresh: {e}")
         
-        # Wait 10 minutes before next refresh
-        await asyncio.sleep(600)  # 600 seconds = 10 minutes
+        # Refresh a little before the cache TTL so reads stay fresh
+        await asyncio.sleep(settings.VERSION_REFRESH_INTERVAL)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
-    # Startup: Start background task immediately (no blocking warm-up)
+    # Startup: Start background task immediately (its first pass warms the cache, non-blocking)
     print("🚀 Application starting up...")
-    print("🔄 Starting background version cache refresh task (every 10 minutes)...")
+    print(f"🔄 Starting background version cache refresh task (every {settings.VERSION_REFRESH_INTERVAL}s)...")
     task = asyncio.create_task(refresh_version_cache_periodically())
     
-    # Start cache warm-up in background (non-blocking)
-    async def warm_up_cache():
-        global shared_service_manager
-        try:
-            print("📊 Background cache warm-up started...")
-            servers = shared_service_manager.get_image_recon_servers()
-            if servers:
-                for server in servers[:5]:  # Cache first 5 servers
-                    try:
-                        version = shared_service_manager._get_server_version(server['ip'])
-                        print(f"✅ [Warm-up] Cached {server['hostname']}: {version}")
-                    except Exception as e:
-                        print(f"⚠️ [Warm-up] Failed to cache {server['hostname']}: {e}")
-                print("✅ Background cache warm-up completed")
-        except Exception as e:
-            print(f"⚠️ Cache warm-up error: {e}")
-    
-    asyncio.create_task(warm_up_cache())  # Non-blocking
+    # Keep the OSMachine status store fresh (one worker at a time holds the prober lease)
+    prober_task = None
+    if settings.OSMACHINE_PROBER_ENABLED:
+        prober_task = asyncio.create_task(services.get("osmachine").run_status_prober())
     
     yield
     
@@ -85,6 +70,31 @@ async def lifespan(app: FastAPI):
         await task
     except asyncio.CancelledError:
         print("✅ Background task cancelled successfully")
+    
+    if prober_task is not None:
+        prober_task.cancel()
+        try:
+            await prober_task
+        except asyncio.CancelledError:
+            print("✅ Status prober cancelled successfully")
+    
+    # Ask background jobs to stop and save their state
+    jobs.shutdown()
+    
+    # Stop watching config files
+    file_watcher.stop()
+    
+    # Close live log channels, then pooled SSH connections
+    await services.get("image_recon_service").log_stream.close_all()
+    ssh_pool.close_all()
+    await async_ssh_runner.close_all()
+    
+    # Stop the CCTV device workers and close their keep-alive HTTP sessions
+    services.get("cctv_tools").worker_pool.shutdown()
+    services.get("cctv_tools").http_sessions.close()
+    
+    # Stop the blocking-call executor lanes
+    blocking_executor.shutdown()
 
 # Create FastAPI app with lifespan
 app = FastAPI(
@@ -96,6 +106,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# One instance per service for routers and background tasks alike
+app.state.services = services
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -118,6 +131,7 @@ app.include_router(image_recon_service_router, prefix="/image-recon-service", ta
 app.include_router(cctv_tools_router, prefix="/cctv-tools", tags=["CCTV Tools"])
 app.include_router(osmachine_router, prefix="/osmachine", tags=["OSMachine"])
 app.include_router(config_editor_router, prefix="/config-editor", tags=["Config Editor"])
+app.include_router(jobs_router, prefix="/api/jobs", tags=["Jobs"])
 
 @app.get("/")
 async def home(request: Request):
@@ -178,6 +192,30 @@ async def get_system_stats():
         }
     }
 
+@app.get("/api/executor-stats")
+async def get_executor_stats():
+    """Queue depth and wait/run time per module executor lane"""
+    return {
+        "status": "success",
+        "lanes": blocking_executor.get_stats()
+    }
+
+@app.get("/api/file-watch-stats")
+async def get_file_watch_stats():
+    """Watched config files: active path, reload count, last parse error"""
+    return {
+        "status": "success",
+        **file_watcher.get_stats()
+    }
+
+@app.get("/api/concurrency-stats")
+async def get_concurrency_stats():
+    """Adaptive concurrency per target class: current limit, in-flight calls and recent decisions"""
+    return {
+        "status": "success",
+        "limiters": limiters.get_stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
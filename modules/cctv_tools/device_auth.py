@@ -0,0 +1,235 @@
+import hashlib
+import random
+import re
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import requests
+    from requests.auth import HTTPDigestAuth, HTTPBasicAuth, AuthBase
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+    # Create a dummy AuthBase if requests is not available
+    class AuthBase:
+        pass
+
+logger = logging.getLogger('cctv_tools')
+
+# Authentication schemes in the order they are tried on a device we know nothing about
+DEFAULT_SCHEMES = ("RobustDigest", "StandardDigest", "BasicAuth")
+ALL_SCHEMES = DEFAULT_SCHEMES + ("NoAuth",)
+
+
+class RobustDigestAuth(AuthBase):
+    """Robust Digest Authentication that handles various header formats.
+
+    The instance keeps the device's last challenge: later requests are signed
+    up front with the same nonce and an incrementing ``nc``, so a device
+    answers one 401 challenge per session instead of one per request. A
+    rejected (e.g. stale) nonce is replaced by the fresh challenge and the
+    request retried once.
+    """
+
+    def __init__(self, username, password):
+        self.username = username
+        self.password = password
+        self._challenge: Optional[Dict] = None
+        self._nc = 0
+        self._lock = threading.Lock()
+        self.challenges = 0
+
+    def __call__(self, r):
+        with self._lock:
+            if self._challenge:
+                self._nc += 1
+                r.headers['Authorization'] = self._build_standard_digest_header(r, self._challenge, self._nc)
+        r.register_hook('response', self._handle_401)
+        return r
+
+    def _handle_401(self, response, **kwargs):
+        if response.status_code == 401:
+            auth_header = response.headers.get('WWW-Authenticate', '')
+            if 'Digest' in auth_header:
+                try:
+                    challenge = self._parse_challenge_robust(auth_header)
+                    if challenge:
+                        with self._lock:
+                            self._challenge = challenge
+                            self._nc = 1
+                            self.challenges += 1
+                        auth_value = self._build_standard_digest_header(response.request, challenge, 1)
+                        # Drain the 401 so its connection can be reused for the retry
+                        response.content
+                        response.close()
+                        new_request = response.request.copy()
+                        new_request.headers['Authorization'] = auth_value
+                        new_response = response.connection.send(new_request, **kwargs)
+                        new_response.history.append(response)
+                        return new_response
+                except Exception:
+                    pass
+        return response
+
+    def _parse_challenge_robust(self, auth_header):
+        try:
+            challenge_str = auth_header.replace('Digest ', '', 1)
+            challenge = {}
+            parts = re.findall(r'(\w+)=(?:"([^"]*)"|([^,\s]+))', challenge_str)
+            for key, quoted_val, unquoted_val in parts:
+                challenge[key] = quoted_val or unquoted_val
+
+            required_fields = ['realm', 'nonce']
+            for field in required_fields:
+                if field not in challenge:
+                    return None
+            return challenge
+        except Exception:
+            return None
+
+    def _build_standard_digest_header(self, request, challenge, nonce_count=1):
+        realm = challenge.get('realm', '')
+        nonce = challenge.get('nonce', '')
+        qop = challenge.get('qop', '')
+        opaque = challenge.get('opaque', '')
+        algorithm = challenge.get('algorithm', 'MD5')
+
+        cnonce = hashlib.md5(f"{random.random()}:{time.time()}".encode()).hexdigest()[:8]
+        uri = request.path_url
+        method = request.method
+
+        ha1 = hashlib.md5(f"{self.username}:{realm}:{self.password}".encode()).hexdigest()
+        ha2 = hashlib.md5(f"{method}:{uri}".encode()).hexdigest()
+
+        if qop and 'auth' in qop:
+            nc = f"{nonce_count:08x}"
+            response_hash = hashlib.md5(f"{ha1}:{nonce}:{nc}:{cnonce}:{qop}:{ha2}".encode()).hexdigest()
+            auth_header = f'Digest username="{self.username}", realm="{realm}", nonce="{nonce}", uri="{uri}", algorithm="{algorithm}", response="{response_hash}", qop="{qop}", nc={nc}, cnonce="{cnonce}"'
+            if opaque:
+                auth_header += f', opaque="{opaque}"'
+        else:
+            response_hash = hashlib.md5(f"{ha1}:{nonce}:{ha2}".encode()).hexdigest()
+            auth_header = f'Digest username="{self.username}", realm="{realm}", nonce="{nonce}", uri="{uri}", algorithm="{algorithm}", response="{response_hash}"'
+            if opaque:
+                auth_header += f', opaque="{opaque}"'
+
+        return auth_header
+
+
+def _status_ok(response) -> bool:
+    return response.status_code == 200
+
+
+class _DeviceAuth:
+    """Auth objects for one device (kept, so digest nonces carry over) and the scheme that last worked"""
+    __slots__ = ("credentials", "auths", "scheme", "lock")
+
+    def __init__(self, username: str, password: str):
+        self.credentials = (username, password)
+        self.auths = {
+            "RobustDigest": RobustDigestAuth(username, password),
+            "StandardDigest": HTTPDigestAuth(username, password),
+            "BasicAuth": HTTPBasicAuth(username, password),
+            "NoAuth": None,
+        }
+        self.scheme: Optional[str] = None
+        self.lock = threading.Lock()
+
+
+class DeviceAuthCache:
+    """Remembers, per device, which authentication scheme works.
+
+    Requests go out with the remembered scheme first; the others are tried
+    (in the usual order) only when it is rejected, and whichever is accepted
+    becomes the new remembered scheme.
+    """
+
+    def __init__(self, sessions=None):
+        # DeviceSessionPool to send through (keep-alive per device); plain requests.request without one
+        self.sessions = sessions
+        self._devices: Dict[str, _DeviceAuth] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fallbacks = 0
+
+    def _device(self, ip: str, username: str, password: str) -> _DeviceAuth:
+        entry = self._devices.get(ip)
+        if entry is None or entry.credentials != (username, password):
+            with self._lock:
+                entry = self._devices.get(ip)
+                if entry is None or entry.credentials != (username, password):
+                    entry = self._devices[ip] = _DeviceAuth(username, password)
+        return entry
+
+    def auth(self, ip: str, username: str, password: str, scheme: str):
+        """The device's long-lived auth object for ``scheme``"""
+        return self._device(ip, username, password).auths[scheme]
+
+    def methods(self, ip: str, username: str, password: str,
+                schemes: Sequence[str] = DEFAULT_SCHEMES) -> List[Tuple[str, object]]:
+        """(name, auth) pairs to try, the scheme that last worked on this device first"""
+        entry = self._device(ip, username, password)
+        order = list(schemes)
+        if entry.scheme in order:
+            order.remove(entry.scheme)
+            order.insert(0, entry.scheme)
+        return [(name, entry.auths[name]) for name in order]
+
+    def request(self, method: str, ip: str, url: str, username: str, password: str,
+                schemes: Sequence[str] = DEFAULT_SCHEMES, accept: Callable = _status_ok,
+                **kwargs) -> Tuple[Optional[str], Optional["requests.Response"]]:
+        """Send the request with the first scheme the device accepts.
+
+        Returns (scheme, response), or (None, last response) when every scheme
+        was rejected. Connection errors and timeouts are raised right away:
+        another scheme would not reach the device either.
+        """
+        entry = self._device(ip, username, password)
+        remembered = entry.scheme
+        response = None
+        for name, auth in self.methods(ip, username, password, schemes):
+            try:
+                if self.sessions is not None:
+                    response = self.sessions.request(method, ip, url, auth=auth, **kwargs)
+                else:
+                    response = requests.request(method, url, auth=auth, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                raise
+            except Exception as e:
+                logger.warning(f"[{ip}] {name} request failed: {e}")
+                continue
+            if accept(response):
+                with entry.lock:
+                    entry.scheme = name
+                if name == remembered:
+                    self.hits += 1
+                else:
+                    if remembered in schemes:
+                        self.fallbacks += 1
+                        logger.info(f"[{ip}] 🔑 {remembered} no longer accepted, now using {name}")
+                return name, response
+        with entry.lock:
+            if entry.scheme == remembered:
+                entry.scheme = None
+        return None, response
+
+    def forget(self, ip: str):
+        with self._lock:
+            self._devices.pop(ip, None)
+
+    def get_stats(self) -> Dict:
+        by_scheme: Dict[str, int] = {}
+        challenges = 0
+        for entry in list(self._devices.values()):
+            name = entry.scheme or "unknown"
+            by_scheme[name] = by_scheme.get(name, 0) + 1
+            challenges += entry.auths["RobustDigest"].challenges
+        return {
+            "devices": len(self._devices),
+            "by_scheme": by_scheme,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "digest_challenges": challenges
+        }
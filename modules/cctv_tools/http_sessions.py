@@ -0,0 +1,116 @@
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+logger = logging.getLogger('cctv_tools')
+
+
+class _DeviceSession:
+    __slots__ = ("session", "last_used")
+
+    def __init__(self, session):
+        self.session = session
+        self.last_used = time.monotonic()
+
+
+class DeviceSessionPool:
+    """One keep-alive ``requests.Session`` per CCTV device.
+
+    The steps of a device operation (factory info, RTMP, TRTC, ...) and the
+    next batch run reuse the device's open connection instead of connecting
+    again for every call. Open sockets stay bounded: each device keeps at
+    most ``connections_per_device`` idle connections, at most
+    ``max_sessions`` devices keep theirs (least recently used closed first),
+    and sessions idle for ``idle_seconds`` are closed before the camera
+    drops the connection on its side.
+    """
+
+    def __init__(self, max_sessions: int = 128, connections_per_device: int = 2, idle_seconds: float = 15):
+        self.max_sessions = max(1, max_sessions)
+        self.connections_per_device = max(1, connections_per_device)
+        self.idle_seconds = idle_seconds
+        self._sessions: "OrderedDict[str, _DeviceSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def _new_session(self):
+        session = requests.Session()
+        # Connections beyond the per-device pool are still opened when needed, but closed after use
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.connections_per_device)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def session(self, ip: str):
+        """The device's session (created on first use)"""
+        now = time.monotonic()
+        closing = []
+        with self._lock:
+            entry = self._sessions.get(ip)
+            if entry is not None and now - entry.last_used > self.idle_seconds:
+                closing.append(self._sessions.pop(ip).session)
+                self.expired += 1
+                entry = None
+            if entry is None:
+                entry = self._sessions[ip] = _DeviceSession(self._new_session())
+                self.created += 1
+                while len(self._sessions) > self.max_sessions:
+                    _, oldest = self._sessions.popitem(last=False)
+                    closing.append(oldest.session)
+                    self.evicted += 1
+            else:
+                self._sessions.move_to_end(ip)
+                self.reused += 1
+            entry.last_used = now
+        # Closing only drops idle connections; a request still running on one finishes normally
+        for session in closing:
+            session.close()
+        return entry.session
+
+    def request(self, method: str, ip: str, url: str, **kwargs):
+        """``requests.request`` over the device's keep-alive session"""
+        return self.session(ip).request(method, url, **kwargs)
+
+    def close_idle(self):
+        """Close the sessions idle for longer than ``idle_seconds``"""
+        now = time.monotonic()
+        with self._lock:
+            idle = [ip for ip, entry in self._sessions.items() if now - entry.last_used > self.idle_seconds]
+            closing = [self._sessions.pop(ip).session for ip in idle]
+            self.expired += len(closing)
+        for session in closing:
+            session.close()
+
+    def close(self):
+        with self._lock:
+            closing = [entry.session for entry in self._sessions.values()]
+            self._sessions.clear()
+        for session in closing:
+            session.close()
+        if closing:
+            logger.info(f"🔌 Closed {len(closing)} CCTV HTTP sessions")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "connections_per_device": self.connections_per_device,
+                "idle_seconds": self.idle_seconds,
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+                "expired": self.expired
+            }
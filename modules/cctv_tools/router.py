@@ -1,15 +1,43 @@
-from fastapi import APIRouter, Request, File, UploadFile, Form, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import APIRouter, Request, File, UploadFile, Form, HTTPException, Depends
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Optional
 import json
 
 from .models import CCTVConfigRequest, CCTVBatchRequest
 from .service import CCTVToolsService
+from .worker_pool import DeviceBatch
+from modules.common.registry import services
+from modules.common.executor import run_blocking, ExecutorBusyError
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
-service = CCTVToolsService()
+# One shared instance per process, resolved from the service registry (app.state.services)
+get_service = services.provider("cctv_tools")
+
+# Blocking service calls run on this module's executor lane
+EXECUTOR_LANE = "cctv_tools"
+
+def _stream_batch(batch: DeviceBatch, operation: str, summarize, service: CCTVToolsService) -> StreamingResponse:
+    """Stream a device batch as NDJSON: one "result" line per device as it finishes, then a "summary" line"""
+    async def lines():
+        results = []
+        try:
+            while len(results) < batch.total:
+                # Awaited on the event loop: open streams hold no executor lane threads
+                result = await batch.next_result_async()
+                results.append(result)
+                yield json.dumps({"event": "result", "done": len(results), "total": batch.total, "result": result}) + "\n"
+            await run_blocking(EXECUTOR_LANE, service.save_results, operation, results)
+            yield json.dumps({"event": "summary", "status": "success", "summary": summarize(results)}) + "\n"
+        except ExecutorBusyError as e:
+            yield json.dumps({"event": "error", "status": "error", "message": str(e)}) + "\n"
+        finally:
+            # Client gone: don't start the devices still queued
+            if len(results) < batch.total:
+                batch.cancel()
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
 
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request):
@@ -33,16 +61,18 @@ async def index(request: Request):
         """)
 
 @router.get("/get-firmware-versions")
-async def get_firmware_versions():
+async def get_firmware_versions(service: CCTVToolsService = Depends(get_service)):
     """Get available firmware versions"""
     try:
-        versions = service.get_firmware_versions()
+        versions = await run_blocking(EXECUTOR_LANE, service.get_firmware_versions)
         return JSONResponse(content={"status": "success", "versions": versions})
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/prepare-configuration")
-async def prepare_configuration(request: Request):
+async def prepare_configuration(request: Request, service: CCTVToolsService = Depends(get_service)):
     """Prepare configuration modal - check device status to show current Room/User/BuildDate"""
     try:
         data = await request.json()
@@ -52,7 +82,7 @@ async def prepare_configuration(request: Request):
             return JSONResponse(content={"status": "error", "message": "No devices provided"})
         
         # Check device status to get current Room, User, BuildDate (like check-status does)
-        status_result = service.check_device_status(devices)
+        status_result = await run_blocking(EXECUTOR_LANE, service.check_device_status, devices)
         
         if status_result.get('status') == 'success':
             results = []
@@ -85,12 +115,14 @@ async def prepare_configuration(request: Request):
                 "message": status_result.get('message', 'Failed to check device status')
             }, status_code=500)
             
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/configure-devices")
-async def configure_devices(request: Request):
-    """Configure multiple CCTV devices with TRTC settings"""
+async def configure_devices(request: Request, service: CCTVToolsService = Depends(get_service)):
+    """Configure multiple CCTV devices with TRTC settings ("stream": true for NDJSON results as they finish)"""
     try:
         data = await request.json()
         devices = data.get('devices', [])
@@ -99,18 +131,23 @@ async def configure_devices(request: Request):
             return JSONResponse(content={"status": "error", "message": "No devices provided"})
         
         # Configuration doesn't need firmware version - it only needs Room/User/UserSig from CSV
-        result = service.configure_devices(devices, '')
+        if data.get('stream'):
+            return _stream_batch(service.start_configuration(devices), 'configure', service.configure_summary, service)
+        
+        result = await run_blocking(EXECUTOR_LANE, service.configure_devices, devices, '')
         
         # Save results
         if result.get('results'):
             service.save_results('configure', result['results'])
         
         return JSONResponse(content=result)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/update-firmware")
-async def update_firmware(request: Request):
+async def update_firmware(request: Request, service: CCTVToolsService = Depends(get_service)):
     """Prepare firmware update modal - check device status and show ready devices"""
     try:
         data = await request.json()
@@ -124,14 +161,16 @@ async def update_firmware(request: Request):
             return JSONResponse(content={"status": "error", "message": "Firmware version is required"})
         
         # Prepare firmware update modal (get device info but don't update yet)
-        result = service.prepare_firmware_update(devices, firmware_version)
+        result = await run_blocking(EXECUTOR_LANE, service.prepare_firmware_update, devices, firmware_version)
         
         return JSONResponse(content=result)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/update-single-firmware")
-async def update_single_firmware(request: Request):
+async def update_single_firmware(request: Request, service: CCTVToolsService = Depends(get_service)):
     """Update firmware on a single CCTV device"""
     try:
         data = await request.json()
@@ -149,14 +188,16 @@ async def update_single_firmware(request: Request):
             'password': password
         }
         
-        result = service.update_single_device_firmware(device, firmware_version)
+        result = await run_blocking(EXECUTOR_LANE, service.update_single_device_firmware, device, firmware_version)
         return JSONResponse(content=result)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/batch-update-firmware")
-async def batch_update_firmware(request: Request):
-    """Batch update firmware on multiple CCTV devices"""
+async def batch_update_firmware(request: Request, service: CCTVToolsService = Depends(get_service)):
+    """Batch update firmware on multiple CCTV devices as a background job; poll /api/jobs/{job_id}"""
     try:
         data = await request.json()
         devices = data.get('devices', [])
@@ -168,19 +209,16 @@ async def batch_update_firmware(request: Request):
         if not firmware_version:
             return JSONResponse(content={"status": "error", "message": "Firmware version is required"})
         
-        result = service.update_firmware(devices, firmware_version)
-        
-        # Save results
-        if result.get('results'):
-            service.save_results('update', result['results'])
-        
+        result = await run_blocking(EXECUTOR_LANE, service.start_firmware_job, devices, firmware_version)
         return JSONResponse(content=result)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/check-status")
-async def check_status(request: Request):
-    """Check status of multiple CCTV devices"""
+async def check_status(request: Request, service: CCTVToolsService = Depends(get_service)):
+    """Check status of multiple CCTV devices ("stream": true for NDJSON results as they finish)"""
     try:
         data = await request.json()
         devices = data.get('devices', [])
@@ -188,18 +226,23 @@ async def check_status(request: Request):
         if not devices:
             return JSONResponse(content={"status": "error", "message": "No devices provided"})
         
-        result = service.check_device_status(devices)
+        if data.get('stream'):
+            return _stream_batch(service.start_status_check(devices), 'status', service.status_summary, service)
+        
+        result = await run_blocking(EXECUTOR_LANE, service.check_device_status, devices)
         
         # Save results
         if result.get('results'):
             service.save_results('status', result['results'])
         
         return JSONResponse(content=result)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/reboot-devices")
-async def reboot_devices(request: Request):
+async def reboot_devices(request: Request, service: CCTVToolsService = Depends(get_service)):
     """Reboot multiple CCTV devices"""
     try:
         data = await request.json()
@@ -208,21 +251,25 @@ async def reboot_devices(request: Request):
         if not devices:
             return JSONResponse(content={"status": "error", "message": "No devices provided"})
         
-        result = service.reboot_devices(devices)
+        result = await run_blocking(EXECUTOR_LANE, service.reboot_devices, devices)
         
         # Save results
         if result.get('results'):
             service.save_results('reboot', result['results'])
         
         return JSONResponse(content=result)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/batch-operation")
-async def batch_operation(request: CCTVBatchRequest):
+async def batch_operation(request: CCTVBatchRequest, service: CCTVToolsService = Depends(get_service)):
     """Perform batch operation on CCTV devices"""
     try:
-        result = service.batch_operation(
+        result = await run_blocking(
+            EXECUTOR_LANE,
+            service.batch_operation,
             request.operation,
             [device.dict() for device in request.devices],
             firmware_version=request.firmware_version
@@ -233,6 +280,8 @@ async def batch_operation(request: CCTVBatchRequest):
             service.save_results(request.operation, result['results'])
         
         return JSONResponse(content=result)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
@@ -311,4 +360,16 @@ async def get_operation_results(operation: str):
             "results": []
         })
     except Exception as e:
-        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
\ No newline at end of file
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
+
+@router.get("/auth-cache")
+async def get_auth_cache(service: CCTVToolsService = Depends(get_service)):
+    """Remembered authentication scheme per device, and the keep-alive HTTP sessions"""
+    try:
+        return JSONResponse(content={
+            "status": "success",
+            "auth_cache": service.auth_cache.get_stats(),
+            "http_sessions": service.http_sessions.get_stats()
+        })
+    except Exception as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
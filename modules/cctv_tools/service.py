@@ -1,100 +1,36 @@
 import os
-import csv
 import json
 import logging
-import hashlib
 import re
 import random
 import time
 import concurrent.futures as futures
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
-import tempfile
 
 try:
     import requests
-    from requests.auth import HTTPDigestAuth, HTTPBasicAuth, AuthBase
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
-    # Create a dummy AuthBase if requests is not available
-    class AuthBase:
-        pass
 
 from config import settings
+from modules.common.registry import services
+from modules.common.jobs import jobs, Job
+from modules.common.concurrency import limiters
+from .worker_pool import DeviceBatch, DeviceWorkerPool, check_deadline, time_left
+from .device_auth import ALL_SCHEMES, DeviceAuthCache
+from .http_sessions import DeviceSessionPool
 
 
-class RobustDigestAuth(AuthBase):
-    """Robust Digest Authentication that handles various header formats"""
-    
-    def __init__(self, username, password):
-        self.username = username
-        self.password = password
-        
-    def __call__(self, r):
-        r.register_hook('response', self._handle_401)
-        return r
-    
-    def _handle_401(self, response, **kwargs):
-        if response.status_code == 401:
-            auth_header = response.headers.get('WWW-Authenticate', '')
-            if 'Digest' in auth_header:
-                try:
-                    challenge = self._parse_challenge_robust(auth_header)
-                    if challenge:
-                        auth_value = self._build_standard_digest_header(response.request, challenge)
-                        new_request = response.request.copy()
-                        new_request.headers['Authorization'] = auth_value
-                        new_response = response.connection.send(new_request, **kwargs)
-                        new_response.history.append(response)
-                        return new_response
-                except Exception as e:
-                    pass
-        return response
-    
-    def _parse_challenge_robust(self, auth_header):
-        try:
-            challenge_str = auth_header.replace('Digest ', '', 1)
-            challenge = {}
-            parts = re.findall(r'(\w+)=(?:"([^"]*)"|([^,\s]+))', challenge_str)
-            for key, quoted_val, unquoted_val in parts:
-                challenge[key] = quoted_val or unquoted_val
-            
-            required_fields = ['realm', 'nonce']
-            for field in required_fields:
-                if field not in challenge:
-                    return None
-            return challenge
-        except Exception:
-            return None
-    
-    def _build_standard_digest_header(self, request, challenge):
-        realm = challenge.get('realm', '')
-        nonce = challenge.get('nonce', '')
-        qop = challenge.get('qop', '')
-        opaque = challenge.get('opaque', '')
-        algorithm = challenge.get('algorithm', 'MD5')
-        
-        cnonce = hashlib.md5(f"{random.random()}:{time.time()}".encode()).hexdigest()[:8]
-        uri = request.path_url
-        method = request.method
-        
-        ha1 = hashlib.md5(f"{self.username}:{realm}:{self.password}".encode()).hexdigest()
-        ha2 = hashlib.md5(f"{method}:{uri}".encode()).hexdigest()
-        
-        if qop and 'auth' in qop:
-            nc = "00000001"
-            response_hash = hashlib.md5(f"{ha1}:{nonce}:{nc}:{cnonce}:{qop}:{ha2}".encode()).hexdigest()
-            auth_header = f'Digest username="{self.username}", realm="{realm}", nonce="{nonce}", uri="{uri}", algorithm="{algorithm}", response="{response_hash}", qop="{qop}", nc={nc}, cnonce="{cnonce}"'
-            if opaque:
-                auth_header += f', opaque="{opaque}"'
-        else:
-            response_hash = hashlib.md5(f"{ha1}:{nonce}:{ha2}".encode()).hexdigest()
-            auth_header = f'Digest username="{self.username}", realm="{realm}", nonce="{nonce}", uri="{uri}", algorithm="{algorithm}", response="{response_hash}"'
-            if opaque:
-                auth_header += f', opaque="{opaque}"'
-        
-        return auth_header
+def _device_call_failed(result: Dict) -> bool:
+    """Error signal for the "cctv_http" limiter: a failed call to a device that was reachable"""
+    return result.get('status') == 'error' and not result.get('message', '').startswith('Device offline')
+
+
+def _firmware_push_failed(result: Dict) -> bool:
+    """Error signal for the "cctv_firmware" limiter: the push raised or the upload timed out"""
+    return not result['success'] or result.get('result', {}).get('status') in ('TIMEOUT', 'ERROR')
 
 
 class CCTVToolsService:
@@ -111,6 +47,19 @@ class CCTVToolsService:
         
         # Load firmware versions from directory
         self.firmware_versions = self._load_firmware_versions()
+        
+        # Status checks and configuration run on one long-lived pool at the adaptive "cctv_http" limit
+        self.worker_pool = DeviceWorkerPool(limiters.get("cctv_http"))
+        
+        # Keep-alive connections per device, reused across the steps of an operation and across batch runs
+        self.http_sessions = DeviceSessionPool(
+            max_sessions=settings.CCTV_HTTP_MAX_SESSIONS,
+            connections_per_device=settings.CCTV_HTTP_CONNECTIONS_PER_DEVICE,
+            idle_seconds=settings.CCTV_HTTP_IDLE_SECONDS
+        )
+        
+        # Which auth scheme each device accepts (and its digest nonce), so requests skip known-bad schemes
+        self.auth_cache = DeviceAuthCache(self.http_sessions)
     
     def _setup_logger(self):
         """Setup dedicated logger for CCTV tools"""
@@ -179,62 +128,53 @@ class CCTVToolsService:
         """Get available firmware versions"""
         return self.firmware_versions
     
-    def configure_devices(self, devices: List[Dict], firmware_version: str = '') -> Dict:
-        """Configure multiple CCTV devices with TRTC settings in batches of 10 (firmware_version not used for configuration)"""
+    def start_configuration(self, devices: List[Dict], firmware_version: str = '') -> DeviceBatch:
+        """Queue TRTC configuration of every device on the worker pool; read results from the returned batch"""
         if not REQUESTS_AVAILABLE:
-            return {"status": "error", "message": "Requests library not available"}
-        
-        self.logger.info(f"🎛️  Starting TRTC configuration for {len(devices)} devices (10 at a time)")
+            raise RuntimeError("Requests library not available")
+        self.logger.info(f"🎛️  Starting TRTC configuration for {len(devices)} devices "
+                         f"({self.worker_pool.limiter.limit} at a time, {settings.CCTV_CONFIGURE_DEADLINE}s per device)")
+        self.http_sessions.close_idle()
         
-        results = []
-        BATCH_SIZE = 10
-        
-        # Process devices in batches of 10
-        for i in range(0, len(devices), BATCH_SIZE):
-            batch = devices[i:i + BATCH_SIZE]
-            batch_num = (i // BATCH_SIZE) + 1
-            total_batches = (len(devices) + BATCH_SIZE - 1) // BATCH_SIZE
-            
-            self.logger.info(f"⚙️  Processing configuration batch {batch_num}/{total_batches} ({len(batch)} devices)")
-            
-            # Process this batch in parallel (10 workers for the batch)
-            with futures.ThreadPoolExecutor(max_workers=10) as executor:
-                future_to_device = {
-                    executor.submit(self._configure_single_device, device, firmware_version): device 
-                    for device in batch
+        def configure(device: Dict, deadline: float) -> Dict:
+            try:
+                result = self._configure_single_device(device, firmware_version, deadline)
+            except Exception as e:
+                result = {
+                    'ip': device['ip'],
+                    'status': 'error',
+                    'message': f'Configuration failed: {str(e)}',
+                    'timestamp': datetime.now().isoformat()
                 }
-                
-                for future in futures.as_completed(future_to_device):
-                    device = future_to_device[future]
-                    try:
-                        result = future.result()
-                        result['device'] = f"{device['room']} ({device['ip']})"
-                        results.append(result)
-                    except Exception as e:
-                        results.append({
-                            'device': f"{device['room']} ({device['ip']})",
-                            'ip': device['ip'],
-                            'status': 'error',
-                        'message': f'Configuration failed: {str(e)}',
-                        'timestamp': datetime.now().isoformat()
-                    })
+            result['device'] = f"{device.get('room', '')} ({device['ip']})"
+            return result
         
+        return self.worker_pool.submit('Configuration', configure, devices, settings.CCTV_CONFIGURE_DEADLINE,
+                                       is_error=_device_call_failed)
+    
+    def configure_summary(self, results: List[Dict]) -> Dict:
         success_count = sum(1 for r in results if r['status'] == 'success')
         failed_count = sum(1 for r in results if r['status'] == 'error')
-        
         self.logger.info(f"✅ Configuration completed. Success: {success_count}, Failed: {failed_count}")
+        return {
+            "total": len(results),
+            "success": success_count,
+            "failed": failed_count
+        }
+    
+    def configure_devices(self, devices: List[Dict], firmware_version: str = '') -> Dict:
+        """Configure multiple CCTV devices with TRTC settings (firmware_version not used for configuration)"""
+        if not REQUESTS_AVAILABLE:
+            return {"status": "error", "message": "Requests library not available"}
         
+        results = list(self.start_configuration(devices, firmware_version))
         return {
             "status": "success",
             "results": results,
-            "summary": {
-                "total": len(results),
-                "success": success_count,
-                "failed": failed_count
-            }
+            "summary": self.configure_summary(results)
         }
     
-    def _configure_single_device(self, device: Dict, firmware_version: str) -> Dict:
+    def _configure_single_device(self, device: Dict, firmware_version: str, deadline: Optional[float] = None) -> Dict:
         """Configure a single CCTV device with TRTC settings - matches old Flask implementation"""
         ip = device['ip']
         room = device.get('room', '')
@@ -262,26 +202,19 @@ class CCTVToolsService:
             device_info_payload = {"Type": 0, "Dev": 1, "Ch": 1, "Data": {}}
             
             try:
-                auth_methods = [
-                    ("RobustDigest", RobustDigestAuth(username, password)),
-                    ("StandardDigest", HTTPDigestAuth(username, password)),
-                    ("BasicAuth", HTTPBasicAuth(username, password)),
-                ]
-                
-                for auth_name, auth in auth_methods:
-                    try:
-                        response = requests.post(device_info_url, json=device_info_payload, auth=auth, timeout=5)
-                        if response.status_code == 200:
-                            data = response.json().get('Data', {})
-                            result['device_name'] = data.get('DeviceName', 'Unknown')
-                            result['build_date'] = data.get('BuildDate', 'Unknown')
-                            break
-                    except Exception:
-                        continue
+                auth_name, response = self.auth_cache.request(
+                    'POST', ip, device_info_url, username, password,
+                    json=device_info_payload, timeout=time_left(deadline, 5)
+                )
+                if auth_name:
+                    data = response.json().get('Data', {})
+                    result['device_name'] = data.get('DeviceName', 'Unknown')
+                    result['build_date'] = data.get('BuildDate', 'Unknown')
             except Exception as e:
                 self.logger.warning(f"[{ip}] Could not get device info: {e}")
             
             # Step 2: Disable RTMP Push (must be done first)
+            check_deadline(deadline)
             rtmp_url = f"http://{ip}/digest/frmRtmpPushCfg"
             rtmp_payload = {
                 "Type": 1,
@@ -302,18 +235,16 @@ class CCTVToolsService:
             
             try:
                 self.logger.info(f"[{ip}] Disabling RTMP push")
-                for auth_name, auth in auth_methods:
-                    try:
-                        response = requests.post(rtmp_url, json=rtmp_payload, auth=auth, timeout=30)
-                        if response.status_code == 200:
-                            self.logger.info(f"[{ip}] RTMP disabled using {auth_name}")
-                            break
-                    except Exception:
-                        continue
+                auth_name, response = self.auth_cache.request(
+                    'POST', ip, rtmp_url, username, password, json=rtmp_payload, timeout=time_left(deadline, 30)
+                )
+                if auth_name:
+                    self.logger.info(f"[{ip}] RTMP disabled using {auth_name}")
             except Exception as e:
                 self.logger.warning(f"[{ip}] RTMP disable failed: {e}")
             
             # Step 3: Configure TRTC
+            check_deadline(deadline)
             trtc_url = f"http://{ip}/digest/frmTrtcConfig"
             trtc_payload = {
                 "Type": 1,
@@ -330,29 +261,22 @@ class CCTVToolsService:
             
             self.logger.info(f"[{ip}] Configuring TRTC: Room={room}, User={user}")
             
-            trtc_success = False
-            for auth_name, auth in auth_methods:
-                try:
-                    response = requests.post(trtc_url, json=trtc_payload, auth=auth, timeout=30)
-                    if response.status_code == 200:
-                        response_json = response.json()
-                        result_code = response_json.get('Result', -1)
-                        error_string = response_json.get('ErrorString', 'Unknown')
-                        
-                        if result_code == 0:
-                            trtc_success = True
-                            result['status'] = 'success'
-                            result['message'] = f'TRTC configured successfully using {auth_name}'
-                            self.logger.info(f"[{ip}] ✅ TRTC configuration successful")
-                            break
-                        else:
-                            result['message'] = f'TRTC API error: {error_string} (Code: {result_code})'
-                            self.logger.warning(f"[{ip}] TRTC API error: {result_code} - {error_string}")
-                            break
-                except Exception as e:
-                    continue
-            
-            if not trtc_success and not result['message']:
+            auth_name, response = self.auth_cache.request(
+                'POST', ip, trtc_url, username, password, json=trtc_payload, timeout=time_left(deadline, 30)
+            )
+            if auth_name:
+                response_json = response.json()
+                result_code = response_json.get('Result', -1)
+                error_string = response_json.get('ErrorString', 'Unknown')
+                
+                if result_code == 0:
+                    result['status'] = 'success'
+                    result['message'] = f'TRTC configured successfully using {auth_name}'
+                    self.logger.info(f"[{ip}] ✅ TRTC configuration successful")
+                else:
+                    result['message'] = f'TRTC API error: {error_string} (Code: {result_code})'
+                    self.logger.warning(f"[{ip}] TRTC API error: {result_code} - {error_string}")
+            else:
                 result['message'] = 'All authentication methods failed for TRTC configuration'
                 
         except Exception as e:
@@ -432,6 +356,50 @@ class CCTVToolsService:
                 'firmware_filename': firmware_version
             }
     
+    def start_firmware_job(self, devices: List[Dict], firmware_version: str) -> Dict:
+        """Push firmware to many devices as a background job; poll /api/jobs/{job_id}"""
+        if not os.path.exists(os.path.join(self.firmware_dir, firmware_version)):
+            return {"status": "error", "message": f"Firmware file not found: {firmware_version}"}
+        
+        job, created = jobs.submit(
+            "cctv.firmware_push", lambda job: self.push_firmware(devices, firmware_version, job),
+            title=f"Firmware {firmware_version} to {len(devices)} devices",
+            total=len(devices),
+            params={"firmware_version": firmware_version},
+            dedupe_key=("cctv.firmware_push", firmware_version, tuple(sorted(d['ip'] for d in devices)))
+        )
+        return {"status": "success", "already_running": not created, "job_id": job.id, "job": job.to_dict()}
+    
+    def push_firmware(self, devices: List[Dict], firmware_version: str, job: Optional[Job] = None) -> Dict:
+        """Send firmware to every device, at the adaptive "cctv_firmware" limit"""
+        self.logger.info(f"📦 Starting batch firmware push of {firmware_version} to {len(devices)} devices")
+        
+        def push_one(device: Dict) -> Dict:
+            if job and job.cancelled:
+                return {'ip': device['ip'], 'success': False, 'error': 'Cancelled'}
+            result = update(device, firmware_version)
+            if job:
+                job.advance({'ip': device['ip'], 'success': result['success'], 'error': result.get('error')},
+                            ok=result['success'])
+            return result
+        
+        limiter = limiters.get("cctv_firmware")
+        update = limiter.wrap(self.update_single_device_firmware, is_error=_firmware_push_failed)
+        with futures.ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+            results = list(executor.map(push_one, devices))
+        
+        success = sum(1 for r in results if r['success'])
+        self.logger.info(f"📦 Batch firmware push completed. Success: {success}, Failed: {len(results) - success}")
+        self.save_results('update', results)
+        return {
+            "status": "success",
+            "summary": {
+                "total": len(results),
+                "success": success,
+                "failed": len(results) - success
+            }
+        }
+    
     def _send_firmware_to_device(self, ip: str, username: str, password: str, firmware_path: str) -> Dict:
         """Send firmware file to device"""
         url = f"http://{ip}/digest/upload"
@@ -460,10 +428,12 @@ class CCTVToolsService:
                     'param': (None, json.dumps({"uploadType": "Update"}), 'application/json')
                 }
                 self.logger.info(f"➡️  Sending firmware to {ip}")
-                response = requests.post(
-                    url,
+                response = self.http_sessions.request(
+                    'POST', ip, url,
                     files=files,
-                    auth=HTTPDigestAuth(username, password),
+                    # Same digest auth as the device info call above, so the upload is signed up front
+                    # with its nonce instead of being sent once unauthenticated and again after the 401
+                    auth=self.auth_cache.auth(ip, username, password, "StandardDigest"),
                     timeout=(30, 600)  # 10 minutes for large firmware
                 )
                 
@@ -508,32 +478,26 @@ class CCTVToolsService:
         payload = {"Type": 0, "Dev": 1, "Ch": 1, "Data": {}}
         
         try:
-            auth_methods = [
-                HTTPDigestAuth(username, password),
-                HTTPBasicAuth(username, password),
-            ]
-            
-            for auth in auth_methods:
+            auth_name, response = self.auth_cache.request(
+                'POST', ip, device_info_url, username, password,
+                schemes=("StandardDigest", "BasicAuth"), json=payload, timeout=10
+            )
+            if auth_name:
+                # Try to parse JSON response
                 try:
-                    response = requests.post(device_info_url, json=payload, auth=auth, timeout=10)
-                    if response.status_code == 200:
-                        # Try to parse JSON response
-                        try:
-                            data = response.json().get('Data', {})
-                            return {
-                                'device_name': data.get('DeviceName', 'Unknown'),
-                                'build_date': data.get('BuildDate', 'Unknown'),
-                                'model': data.get('Model', 'Unknown')
-                            }
-                        except ValueError:
-                            # Response is not JSON (probably HTML error page)
-                            self.logger.warning(f"[{ip}] Device returned non-JSON response (HTML error page)")
-                            return {'device_name': 'Offline', 'build_date': 'Unknown', 'model': 'Unknown'}
-                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
-                    # Device is offline or unreachable
+                    data = response.json().get('Data', {})
+                    return {
+                        'device_name': data.get('DeviceName', 'Unknown'),
+                        'build_date': data.get('BuildDate', 'Unknown'),
+                        'model': data.get('Model', 'Unknown')
+                    }
+                except ValueError:
+                    # Response is not JSON (probably HTML error page)
+                    self.logger.warning(f"[{ip}] Device returned non-JSON response (HTML error page)")
                     return {'device_name': 'Offline', 'build_date': 'Unknown', 'model': 'Unknown'}
-                except Exception:
-                    continue
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            # Device is offline or unreachable
+            return {'device_name': 'Offline', 'build_date': 'Unknown', 'model': 'Unknown'}
         except Exception as e:
             self.logger.warning(f"[{ip}] Could not get device info: {e}")
         
@@ -548,10 +512,12 @@ class CCTVToolsService:
         
         results = []
         
-        # Use thread pool for concurrent operations
-        with futures.ThreadPoolExecutor(max_workers=3) as executor:  # Fewer threads for firmware updates
+        # Firmware updates share the (lower) "cctv_firmware" limit
+        limiter = limiters.get("cctv_firmware")
+        update = limiter.wrap(self._update_single_device, is_error=lambda result: result['status'] == 'error')
+        with futures.ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
             future_to_device = {
-                executor.submit(self._update_single_device, device, firmware_version): device 
+                executor.submit(update, device, firmware_version): device 
                 for device in devices
             }
             
@@ -620,59 +586,51 @@ class CCTVToolsService:
                 'timestamp': datetime.now().isoformat()
             }
     
-    def check_device_status(self, devices: List[Dict]) -> Dict:
-        """Check status of multiple CCTV devices in batches of 10"""
+    def start_status_check(self, devices: List[Dict]) -> DeviceBatch:
+        """Queue a status check of every device on the worker pool; read results from the returned batch"""
         if not REQUESTS_AVAILABLE:
-            return {"status": "error", "message": "Requests library not available"}
-        
-        self.logger.info(f"🔍 Checking status for {len(devices)} devices (10 at a time)")
-        
-        results = []
-        BATCH_SIZE = 10
+            raise RuntimeError("Requests library not available")
+        self.logger.info(f"🔍 Checking status for {len(devices)} devices "
+                         f"({self.worker_pool.limiter.limit} at a time, {settings.CCTV_STATUS_DEADLINE}s per device)")
+        self.http_sessions.close_idle()
         
-        # Process devices in batches of 10
-        for i in range(0, len(devices), BATCH_SIZE):
-            batch = devices[i:i + BATCH_SIZE]
-            batch_num = (i // BATCH_SIZE) + 1
-            total_batches = (len(devices) + BATCH_SIZE - 1) // BATCH_SIZE
-            
-            self.logger.info(f"📊 Processing batch {batch_num}/{total_batches} ({len(batch)} devices)")
-            
-            # Process this batch in parallel (10 workers for the batch)
-            with futures.ThreadPoolExecutor(max_workers=10) as executor:
-                future_to_device = {
-                    executor.submit(self._check_single_device_status, device): device 
-                        for device in batch
+        def check(device: Dict, deadline: float) -> Dict:
+            try:
+                result = self._check_single_device_status(device, deadline)
+            except Exception as e:
+                result = {
+                    'ip': device['ip'],
+                    'status': 'error',
+                    'message': f'Status check failed: {str(e)}',
+                    'timestamp': datetime.now().isoformat()
                 }
-                
-                for future in futures.as_completed(future_to_device):
-                    device = future_to_device[future]
-                    try:
-                        result = future.result()
-                        result['device'] = f"{device['room']} ({device['ip']})"
-                        results.append(result)
-                    except Exception as e:
-                        results.append({
-                            'device': f"{device['room']} ({device['ip']})",
-                            'ip': device['ip'],
-                            'status': 'error',
-                            'message': f'Status check failed: {str(e)}',
-                            'timestamp': datetime.now().isoformat()
-                        })
+            result['device'] = f"{device.get('room', '')} ({device['ip']})"
+            return result
         
+        return self.worker_pool.submit('Status check', check, devices, settings.CCTV_STATUS_DEADLINE,
+                                       is_error=_device_call_failed)
+    
+    def status_summary(self, results: List[Dict]) -> Dict:
         self.logger.info(f"✅ Status check completed for {len(results)} devices")
+        return {
+            "total": len(results),
+            "online": sum(1 for r in results if r['status'] == 'success'),
+            "offline": sum(1 for r in results if r['status'] == 'error')
+        }
+    
+    def check_device_status(self, devices: List[Dict]) -> Dict:
+        """Check status of multiple CCTV devices"""
+        if not REQUESTS_AVAILABLE:
+            return {"status": "error", "message": "Requests library not available"}
         
+        results = list(self.start_status_check(devices))
         return {
             "status": "success",
             "results": results,
-            "summary": {
-                "total": len(results),
-                "online": sum(1 for r in results if r['status'] == 'success'),
-                "offline": sum(1 for r in results if r['status'] == 'error')
-            }
+            "summary": self.status_summary(results)
         }
     
-    def _check_single_device_status(self, device: Dict) -> Dict:
+    def _check_single_device_status(self, device: Dict, deadline: Optional[float] = None) -> Dict:
         """Check status of a single CCTV device - matches original Flask implementation"""
         ip = device['ip']
         
@@ -705,7 +663,7 @@ class CCTVToolsService:
             try:
                 # First check TCP connection to port 80
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(3)
+                sock.settimeout(time_left(deadline, 3))
                 sock.connect((ip, 80))
                 sock.close()
             except (socket.timeout, socket.error, OSError) as e:
@@ -716,44 +674,28 @@ class CCTVToolsService:
             # This catches devices that are rebooting or updating firmware
             try:
                 # Try a simple HTTP GET to verify the web server is responding
-                test_response = requests.get(f"http://{ip}/", timeout=3)
+                self.http_sessions.request('GET', ip, f"http://{ip}/", timeout=time_left(deadline, 3))
                 # If we get here, server is responding (even if 404/401, it's still online)
-            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-                result['message'] = f'Device not responding - may be rebooting or updating firmware'
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                result['message'] = 'Device not responding - may be rebooting or updating firmware'
                 return result
             except Exception:
                 # Other exceptions (like HTTP errors) are fine - server is responding
                 pass
             
             # Step 2: Get device info from /digest/frmGetFactoryInfo
+            check_deadline(deadline)
             device_info_url = f"http://{ip}/digest/frmGetFactoryInfo"
             device_info_payload = {"Type": 0, "Dev": 1, "Ch": 1, "Data": {}}
             
             try:
-                # Try multiple auth methods
-                auth_methods = [
-                    ("RobustDigest", RobustDigestAuth(username, password)),
-                    ("StandardDigest", HTTPDigestAuth(username, password)),
-                    ("BasicAuth", HTTPBasicAuth(username, password)),
-                    ("NoAuth", None)
-                ]
-                
-                response = None
-                for auth_name, auth in auth_methods:
-                    try:
-                        response = requests.post(
-                            device_info_url,
-                            json=device_info_payload,
-                            auth=auth,
-                            timeout=5
-                        )
-                        if response.status_code == 200:
-                            self.logger.info(f"[{ip}] Device info retrieved using {auth_name}")
-                            break
-                    except Exception:
-                        continue
-                
-                if response and response.status_code == 200:
+                # Known-good auth scheme first, the others only if it is rejected
+                auth_name, response = self.auth_cache.request(
+                    'POST', ip, device_info_url, username, password,
+                    schemes=ALL_SCHEMES, json=device_info_payload, timeout=time_left(deadline, 5)
+                )
+                if auth_name:
+                    self.logger.info(f"[{ip}] Device info retrieved using {auth_name}")
                     data = response.json().get('Data', {})
                     result['device_name'] = data.get('DeviceName', 'Unknown')
                     result['build_date'] = data.get('BuildDate', 'Unknown')
@@ -761,33 +703,17 @@ class CCTVToolsService:
                 self.logger.warning(f"[{ip}] Could not get device info: {e}")
             
             # Step 3: Get TRTC config from /digest/frmTrtcConfig
+            check_deadline(deadline)
             trtc_config_url = f"http://{ip}/digest/frmTrtcConfig"
             
             try:
-                # Try multiple auth methods like the original Flask code
-                auth_methods = [
-                    ("RobustDigest", RobustDigestAuth(username, password)),
-                    ("StandardDigest", HTTPDigestAuth(username, password)),
-                    ("BasicAuth", HTTPBasicAuth(username, password)),
-                    ("NoAuth", None)
-                ]
-                
-                response = None
-                last_error = None
-                for auth_name, auth in auth_methods:
-                    try:
-                        response = requests.get(trtc_config_url, auth=auth, timeout=5)
-                        if response.status_code == 200:
-                            self.logger.info(f"[{ip}] TRTC config retrieved using {auth_name}")
-                            break
-                        else:
-                            last_error = f"{auth_name} returned {response.status_code}"
-                    except Exception as e:
-                        last_error = f"{auth_name} failed: {str(e)}"
-                        continue
-                
-                if not response or response.status_code != 200:
-                    raise Exception(f"All auth methods failed. Last: {last_error}")
+                auth_name, response = self.auth_cache.request(
+                    'GET', ip, trtc_config_url, username, password,
+                    schemes=ALL_SCHEMES, timeout=time_left(deadline, 5)
+                )
+                if not auth_name:
+                    raise Exception(f"All auth methods failed. Last: HTTP {response.status_code if response is not None else 'no response'}")
+                self.logger.info(f"[{ip}] TRTC config retrieved using {auth_name}")
                 
                 if response.status_code == 200:
                     data = response.json().get('Data', {})
@@ -825,10 +751,12 @@ class CCTVToolsService:
         
         results = []
         
-        # Use thread pool for concurrent reboots
-        with futures.ThreadPoolExecutor(max_workers=5) as executor:
+        # Concurrent reboots at the adaptive "cctv_http" limit
+        limiter = limiters.get("cctv_http")
+        reboot = limiter.wrap(self._reboot_single_device, is_error=_device_call_failed)
+        with futures.ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
             future_to_device = {
-                executor.submit(self._reboot_single_device, device): device 
+                executor.submit(reboot, device): device 
                 for device in devices
             }
             
@@ -877,47 +805,31 @@ class CCTVToolsService:
         try:
             reboot_url = f"http://{ip}/digest/frmDeviceReboot"
             
-            # Try multiple authentication methods
-            auth_methods = [
-                ("RobustDigest", RobustDigestAuth(username, password)),
-                ("StandardDigest", HTTPDigestAuth(username, password)),
-                ("BasicAuth", HTTPBasicAuth(username, password)),
-            ]
+            # Make POST request without payload (as per curl command), known-good auth scheme first
+            auth_name, response = self.auth_cache.request(
+                'POST', ip, reboot_url, username, password,
+                accept=lambda response: 200 <= response.status_code < 300,
+                headers={"Content-Type": "application/json"},
+                timeout=30
+            )
             
-            for auth_name, auth in auth_methods:
+            if auth_name:
                 try:
-                    self.logger.info(f"[{ip}] Trying {auth_name} authentication for reboot")
-                    
-                    # Make POST request without payload (as per curl command)
-                    response = requests.post(
-                        reboot_url,
-                        headers={"Content-Type": "application/json"},
-                        auth=auth,
-                        timeout=30
-                    )
-                    
-                    if response.status_code >= 200 and response.status_code < 300:
-                        try:
-                            response_json = response.json()
-                            result_code = response_json.get('Result', -1)
-                            if result_code == 0:
-                                result['status'] = 'success'
-                                result['message'] = f'Device reboot command sent successfully using {auth_name}'
-                                self.logger.info(f"[{ip}] ✅ Device reboot successful")
-                                return result
-                            else:
-                                error_string = response_json.get('ErrorString', 'Unknown error')
-                                result['message'] = f'Reboot API error: {error_string} (Code: {result_code})'
-                                self.logger.warning(f"[{ip}] Reboot API error: {result_code} - {error_string}")
-                                return result
-                        except Exception:
-                            # If we can't parse JSON but got 200, assume success
-                            result['status'] = 'success'
-                            result['message'] = f'Device reboot initiated using {auth_name} (HTTP {response.status_code})'
-                            return result
-                except Exception as e:
-                    self.logger.warning(f"[{ip}] {auth_name} auth failed for reboot: {e}")
-                    continue
+                    response_json = response.json()
+                    result_code = response_json.get('Result', -1)
+                    if result_code == 0:
+                        result['status'] = 'success'
+                        result['message'] = f'Device reboot command sent successfully using {auth_name}'
+                        self.logger.info(f"[{ip}] ✅ Device reboot successful")
+                    else:
+                        error_string = response_json.get('ErrorString', 'Unknown error')
+                        result['message'] = f'Reboot API error: {error_string} (Code: {result_code})'
+                        self.logger.warning(f"[{ip}] Reboot API error: {result_code} - {error_string}")
+                except Exception:
+                    # If we can't parse JSON but got 200, assume success
+                    result['status'] = 'success'
+                    result['message'] = f'Device reboot initiated using {auth_name} (HTTP {response.status_code})'
+                return result
             
             result['message'] = 'All authentication methods failed for reboot'
                 
@@ -958,4 +870,8 @@ class CCTVToolsService:
             return filename
         except Exception as e:
             self.logger.error(f"Failed to save results: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+# Shared instance for every router and background task
+services.register("cctv_tools", CCTVToolsService)
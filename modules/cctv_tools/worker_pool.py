@@ -0,0 +1,159 @@
+import asyncio
+import queue
+import threading
+import time
+import logging
+from typing import Callable, Dict, Iterator, List, Optional
+
+from modules.common.concurrency import AdaptiveLimiter
+
+logger = logging.getLogger('cctv_tools')
+
+
+class DeadlineExceeded(TimeoutError):
+    """A device ran out of its per-device time budget"""
+
+
+def check_deadline(deadline: Optional[float]):
+    """Raise DeadlineExceeded once ``deadline`` (a time.monotonic() value, None for no deadline) has passed"""
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded("per-device deadline exceeded")
+
+
+def time_left(deadline: Optional[float], timeout: float) -> float:
+    """``timeout`` capped to what is left before ``deadline``"""
+    check_deadline(deadline)
+    return timeout if deadline is None else min(timeout, deadline - time.monotonic())
+
+
+class DeviceBatch:
+    """Results of one bulk operation, in completion order.
+
+    Iterate it (or call ``next_result()``) to receive each device's result as
+    soon as it finishes; coroutines await ``next_result_async()`` instead, which
+    holds no thread while waiting (use one or the other for a batch).
+    ``cancel()`` skips the devices not started yet - their results still
+    arrive, marked as cancelled, so every reader gets ``total``.
+    """
+
+    def __init__(self, operation: str, total: int, deadline_seconds: float):
+        self.operation = operation
+        self.total = total
+        self.deadline_seconds = deadline_seconds
+        self.cancelled = False
+        self.started_at = time.monotonic()
+        self._results: queue.Queue = queue.Queue()
+        self._received = 0
+        # Set by the first next_result_async(): results are then handed to that event loop
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_results: Optional[asyncio.Queue] = None
+
+    def cancel(self):
+        self.cancelled = True
+
+    def next_result(self) -> Dict:
+        """Block until the next device finishes and return its result"""
+        result = self._results.get()
+        self._received += 1
+        return result
+
+    async def next_result_async(self) -> Dict:
+        """Wait (without blocking a thread) for the next device to finish and return its result"""
+        if self._async_results is None:
+            with self._lock:
+                self._loop, self._async_results = asyncio.get_running_loop(), asyncio.Queue()
+                # Results that arrived before the first await
+                while True:
+                    try:
+                        self._async_results.put_nowait(self._results.get_nowait())
+                    except queue.Empty:
+                        break
+        result = await self._async_results.get()
+        self._received += 1
+        return result
+
+    def __iter__(self) -> Iterator[Dict]:
+        while self._received < self.total:
+            yield self.next_result()
+
+    def _put(self, result: Dict):
+        """Deliver one device's result (called from the worker threads)"""
+        with self._lock:
+            if self._loop is None:
+                self._results.put(result)
+                return
+            loop, results = self._loop, self._async_results
+        try:
+            loop.call_soon_threadsafe(results.put_nowait, result)
+        except RuntimeError:
+            # Event loop already closed: nobody is reading any more
+            pass
+
+
+class DeviceWorkerPool:
+    """Long-lived worker threads fed by one queue, shared by the CCTV bulk operations.
+
+    Each device is one work item, so a slow device holds one worker while the
+    others keep taking the next device (a sliding window instead of fixed
+    batches that wait for their slowest member). Workers run calls inside a
+    slot of ``limiter``, which decides how many run at once; the pool only
+    needs as many threads as the limiter's maximum.
+    """
+
+    def __init__(self, limiter: AdaptiveLimiter, workers: Optional[int] = None):
+        self.limiter = limiter
+        self.workers = workers or limiter.max_limit
+        self._tasks: queue.Queue = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"cctv-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"🧵 CCTV worker pool started ({self.workers} workers)")
+
+    def submit(self, operation: str, fn: Callable[[Dict, float], Dict], devices: List[Dict],
+               deadline_seconds: float, is_error: Optional[Callable[[Dict], bool]] = None) -> DeviceBatch:
+        """Queue ``fn(device, deadline)`` for every device and return the batch to read results from.
+
+        ``fn`` must return a result dict (errors included); ``deadline`` is the
+        time.monotonic() value by which the device has to be done, counted from
+        when a worker picks it up.
+        """
+        self._start()
+        batch = DeviceBatch(operation, len(devices), deadline_seconds)
+        for device in devices:
+            self._tasks.put((batch, fn, device, is_error))
+        return batch
+
+    def _run(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            batch, fn, device, is_error = task
+            if batch.cancelled:
+                batch._put({'ip': device.get('ip'), 'status': 'error', 'message': 'Cancelled'})
+                continue
+            try:
+                with self.limiter.slot() as outcome:
+                    result = fn(device, time.monotonic() + batch.deadline_seconds)
+                    outcome.error = bool(is_error and is_error(result))
+            except Exception as e:
+                result = {'ip': device.get('ip'), 'status': 'error', 'message': f'{batch.operation} failed: {str(e)}'}
+            batch._put(result)
+
+    def get_stats(self) -> Dict:
+        return {"workers": self.workers, "started": bool(self._threads), "queued": self._tasks.qsize()}
+
+    def shutdown(self):
+        with self._lock:
+            for _ in self._threads:
+                self._tasks.put(None)
+            self._threads = []
@@ -0,0 +1,182 @@
+import asyncio
+import time
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+try:
+    import asyncssh
+    ASYNCSSH_AVAILABLE = True
+except ImportError:
+    ASYNCSSH_AVAILABLE = False
+
+from config import settings
+from .ssh_keys import cached_key_load
+
+logger = logging.getLogger(__name__)
+
+# Connection key: (host, port, username, key_path)
+ConnKey = Tuple[str, int, str, Optional[str]]
+
+
+class CommandTimeoutError(TimeoutError):
+    """The remote command ran past its timeout (the connection itself was fine)"""
+
+
+def use_async_ssh() -> bool:
+    """True when the asyncssh backend is selected in settings and installed"""
+    return settings.SSH_BACKEND == "asyncssh" and ASYNCSSH_AVAILABLE
+
+
+def _load_asyncssh_key(key_path: str):
+    return cached_key_load(key_path, asyncssh.read_private_key, "asyncssh")
+
+
+class AsyncSSHRunner:
+    """asyncio-native remote execution on top of asyncssh.
+
+    Connections are cached per host/port/user/key and multiplex one session
+    per command. A global semaphore bounds how many commands run at once and
+    every command gets its own per-host timeout, so a dead host only costs
+    its own slot.
+    """
+
+    def __init__(self, max_concurrency: int = 50, idle_timeout: int = 300):
+        self.max_concurrency = max_concurrency
+        self.idle_timeout = idle_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self._connections: Dict[ConnKey, Tuple[object, float]] = {}
+        self._locks: Dict[ConnKey, asyncio.Lock] = {}
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop that first uses them
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _get_connection(self, key: ConnKey, password: Optional[str], connect_timeout: int):
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self._connections.get(key)
+            if cached:
+                conn, last_used = cached
+                is_closed = getattr(conn, "is_closed", lambda: False)()
+                if not is_closed and time.time() - last_used < self.idle_timeout:
+                    self._connections[key] = (conn, time.time())
+                    return conn
+                conn.close()
+                del self._connections[key]
+
+            conn = await self._connect(key, password, connect_timeout)
+            self._connections[key] = (conn, time.time())
+            return conn
+
+    async def _connect(self, key: ConnKey, password: Optional[str], connect_timeout: int):
+        host, port, username, key_path = key
+        connect_kwargs = {
+            "port": port,
+            "username": username,
+            "known_hosts": None,
+            "connect_timeout": connect_timeout,
+        }
+        if key_path:
+            connect_kwargs["client_keys"] = [_load_asyncssh_key(key_path)]
+        else:
+            connect_kwargs["client_keys"] = None
+        if password:
+            connect_kwargs["password"] = password
+
+        return await asyncssh.connect(host, **connect_kwargs)
+
+    def _drop_connection(self, key: ConnKey):
+        cached = self._connections.pop(key, None)
+        if cached:
+            cached[0].close()
+
+    async def run(self, host: str, username: str, command: str, key_path: Optional[str] = None,
+                  password: Optional[str] = None, port: int = 22, timeout: Optional[int] = None,
+                  connect_timeout: int = 10, keep_connection: bool = True) -> Tuple[int, str, str]:
+        """Run a command and return (exit_status, stdout, stderr).
+
+        ``keep_connection=False`` closes the connection afterwards, for one-off
+        probes across large fleets where caching every connection isn't worth it.
+        """
+        if not ASYNCSSH_AVAILABLE:
+            raise RuntimeError("Async SSH backend not available. Install asyncssh package.")
+
+        key = (host, port, username, key_path)
+        timeout = timeout or settings.ASYNC_SSH_HOST_TIMEOUT
+
+        async with self._get_semaphore():
+            try:
+                conn = await asyncio.wait_for(self._get_connection(key, password, connect_timeout), connect_timeout + 5)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Connection to {host} timed out after {connect_timeout}s")
+
+            try:
+                result = await asyncio.wait_for(conn.run(command, check=False), timeout)
+            except asyncio.TimeoutError:
+                raise CommandTimeoutError(f"Command timed out on {host} after {timeout}s")
+            except (asyncssh.Error, OSError):
+                # Connection may be broken - make the next call reconnect
+                self._drop_connection(key)
+                raise
+            finally:
+                if not keep_connection:
+                    self._drop_connection(key)
+
+        exit_status = result.exit_status if result.exit_status is not None else -1
+        return exit_status, result.stdout or "", result.stderr or ""
+
+    async def stream(self, host: str, username: str, command: str, key_path: Optional[str] = None,
+                     password: Optional[str] = None, port: int = 22,
+                     connect_timeout: int = 10) -> AsyncIterator[str]:
+        """Run a long-lived command (e.g. ``journalctl -f``) and yield its stdout line by line.
+
+        Streams use their own connection and don't take a command slot, so an
+        open tail never blocks regular commands. Closing the generator closes
+        the channel and the connection.
+        """
+        if not ASYNCSSH_AVAILABLE:
+            raise RuntimeError("Async SSH backend not available. Install asyncssh package.")
+
+        key = (host, port, username, key_path)
+        try:
+            conn = await asyncio.wait_for(self._connect(key, password, connect_timeout), connect_timeout + 5)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Connection to {host} timed out after {connect_timeout}s")
+
+        try:
+            async with conn.create_process(command) as process:
+                async for line in process.stdout:
+                    yield line.rstrip("\n")
+        finally:
+            conn.close()
+
+    async def run_many(self, hosts: List[str], username: str, command: str, **kwargs) -> Dict[str, object]:
+        """Run the same command on many hosts concurrently.
+
+        Returns {host: (exit_status, stdout, stderr) or Exception}.
+        """
+        outcomes = await asyncio.gather(
+            *(self.run(host, username, command, **kwargs) for host in hosts),
+            return_exceptions=True
+        )
+        return dict(zip(hosts, outcomes))
+
+    async def close_all(self):
+        """Close every cached connection"""
+        for conn, _ in list(self._connections.values()):
+            conn.close()
+        for conn, _ in list(self._connections.values()):
+            try:
+                await conn.wait_closed()
+            except Exception:
+                pass
+        self._connections.clear()
+
+
+# Process-wide runner shared by services that opt into the asyncssh backend
+async_ssh_runner = AsyncSSHRunner(max_concurrency=settings.ASYNC_SSH_MAX_CONCURRENCY)
@@ -0,0 +1,271 @@
+import asyncio
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Target classes: (initial, min, max) concurrent calls; overridable with ADAPTIVE_CONCURRENCY_LIMITS
+DEFAULT_LIMITS: Dict[str, Tuple[int, int, int]] = {
+    "osm_ssh": (20, 4, 64),           # OSMachine SSH status logins
+    "osm_restart": (3, 1, 10),        # OSMachine restarts
+    "cctv_http": (10, 2, 32),         # CCTV configure / status / reboot calls
+    "cctv_firmware": (3, 1, 10),      # CCTV firmware uploads
+    "image_recon_ssh": (10, 2, 32),   # image recon server snapshots (versions, status)
+}
+
+# Decisions kept per limiter for the metrics endpoint
+DECISION_HISTORY = 50
+# Share of a slower healthy window taken into the baseline: it follows faster windows at once and
+# slower ones only gradually, so it stays near the no-load latency instead of following the load up
+BASELINE_DRIFT = 0.05
+# A latency back-off also needs the mean this far above the baseline (ignores jitter on very fast calls)
+MIN_LATENCY_MARGIN_MS = 50
+
+
+class Outcome:
+    """Handed to the caller inside a limiter slot; set ``error`` when the call failed"""
+    __slots__ = ("error",)
+
+    def __init__(self):
+        self.error = False
+
+
+class AdaptiveLimiter:
+    """Concurrency limit for one class of targets, tuned by AIMD on latency and errors.
+
+    Calls run inside ``slot()`` (threads) or ``slot_async()`` (coroutines).
+    Each window of about ``limit`` finished calls is judged once:
+
+    - error rate above ``error_threshold``, or mean latency of the successful
+      calls above ``latency_tolerance`` x the baseline: multiply the limit by
+      ``backoff`` (never below ``min_limit``)
+    - otherwise, if the limit was reached during the window: add one slot
+      (never above ``max_limit``)
+
+    The baseline estimates the no-load latency from the healthy windows. With
+    ``adaptive=False`` the limit stays at ``initial`` and only metrics are kept.
+    """
+
+    def __init__(self, name: str, initial: int, min_limit: int, max_limit: int, adaptive: bool = True,
+                 latency_tolerance: float = 2.0, error_threshold: float = 0.2, backoff: float = 0.7,
+                 min_window: int = 5):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.initial = min(max(initial, self.min_limit), self.max_limit)
+        self.adaptive = adaptive
+        self.latency_tolerance = latency_tolerance
+        self.error_threshold = error_threshold
+        self.backoff = backoff
+        self.min_window = min_window
+
+        self._limit = float(self.initial)
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._async_waiters: deque = deque()
+
+        # Current window
+        self._window_calls = 0
+        self._window_errors = 0
+        self._window_latency = 0.0
+        self._window_saturated = False
+
+        self.baseline_ms: Optional[float] = None
+        self.calls = 0
+        self.errors = 0
+        self.increases = 0
+        self.decreases = 0
+        self.decisions: deque = deque(maxlen=DECISION_HISTORY)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def _try_acquire(self) -> bool:
+        with self._cond:
+            if self._in_flight >= int(self._limit):
+                self._window_saturated = True
+                return False
+            self._in_flight += 1
+            if self._in_flight >= int(self._limit):
+                self._window_saturated = True
+            return True
+
+    def _release(self, latency: float, error: bool):
+        with self._cond:
+            self._in_flight -= 1
+            self._record(latency, error)
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, deque()
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(lambda w=waiter: w.done() or w.set_result(None))
+
+    def _record(self, latency: float, error: bool):
+        """Add one finished call to the window; judge the window once it is full (lock held)"""
+        self.calls += 1
+        self._window_calls += 1
+        if error:
+            self.errors += 1
+            self._window_errors += 1
+        else:
+            self._window_latency += latency
+
+        if self._window_calls < max(self.min_window, int(self._limit)):
+            return
+
+        successes = self._window_calls - self._window_errors
+        error_rate = self._window_errors / self._window_calls
+        mean_ms = self._window_latency / successes * 1000 if successes else None
+        saturated = self._window_saturated
+        self._window_calls = self._window_errors = 0
+        self._window_latency = 0.0
+        self._window_saturated = False
+
+        if not self.adaptive:
+            return
+
+        old = self._limit
+        if error_rate > self.error_threshold:
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+            reason = f"error rate {error_rate:.0%}"
+        elif (mean_ms is not None and self.baseline_ms is not None
+              and mean_ms > max(self.baseline_ms * self.latency_tolerance, self.baseline_ms + MIN_LATENCY_MARGIN_MS)):
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+            reason = f"latency {mean_ms:.0f} ms > {self.latency_tolerance:g}x baseline {self.baseline_ms:.0f} ms"
+        else:
+            if mean_ms is not None:
+                if self.baseline_ms is None or mean_ms < self.baseline_ms:
+                    self.baseline_ms = mean_ms
+                else:
+                    self.baseline_ms += (mean_ms - self.baseline_ms) * BASELINE_DRIFT
+            if not saturated:
+                return
+            self._limit = min(self.max_limit, self._limit + 1)
+            reason = "healthy at the limit"
+
+        if int(self._limit) == int(old):
+            return
+        if self._limit > old:
+            self.increases += 1
+        else:
+            self.decreases += 1
+        self.decisions.append({
+            "time": time.time(),
+            "from": int(old),
+            "to": int(self._limit),
+            "reason": reason,
+            "error_rate": round(error_rate, 3),
+            "mean_latency_ms": round(mean_ms, 1) if mean_ms is not None else None
+        })
+        logger.info(f"{'📈' if self._limit > old else '📉'} [{self.name}] concurrency {int(old)} -> {int(self._limit)} ({reason})")
+
+    @contextmanager
+    def slot(self):
+        """Hold one slot for a blocking call; an exception counts as an error"""
+        with self._cond:
+            while not self._try_acquire():
+                self._cond.wait()
+        outcome = Outcome()
+        start = time.monotonic()
+        try:
+            yield outcome
+        except BaseException:
+            outcome.error = True
+            raise
+        finally:
+            self._release(time.monotonic() - start, outcome.error)
+
+    @asynccontextmanager
+    async def slot_async(self):
+        """``slot()`` for coroutines (shares the limit with the threads using ``slot()``)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._try_acquire():
+                    break
+                # Registered under the lock, so the next release is sure to wake it
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+        outcome = Outcome()
+        start = time.monotonic()
+        try:
+            yield outcome
+        except BaseException:
+            outcome.error = True
+            raise
+        finally:
+            self._release(time.monotonic() - start, outcome.error)
+
+    def wrap(self, fn: Callable, is_error: Optional[Callable[[object], bool]] = None) -> Callable:
+        """``fn`` run inside a slot; ``is_error(result)`` marks failed results (for thread pool fan-outs)"""
+        def run(*args, **kwargs):
+            with self.slot() as outcome:
+                result = fn(*args, **kwargs)
+                outcome.error = bool(is_error and is_error(result))
+                return result
+        return run
+
+    def wrap_async(self, fn: Callable, is_error: Optional[Callable[[object], bool]] = None) -> Callable:
+        """``wrap()`` for coroutine functions (for asyncio.gather fan-outs)"""
+        async def run(*args, **kwargs):
+            async with self.slot_async() as outcome:
+                result = await fn(*args, **kwargs)
+                outcome.error = bool(is_error and is_error(result))
+                return result
+        return run
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                "adaptive": self.adaptive,
+                "limit": int(self._limit),
+                "min": self.min_limit,
+                "max": self.max_limit,
+                "in_flight": self._in_flight,
+                "baseline_latency_ms": round(self.baseline_ms, 1) if self.baseline_ms is not None else None,
+                "calls": self.calls,
+                "errors": self.errors,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "decisions": list(self.decisions)
+            }
+
+
+class ConcurrencyLimiters:
+    """One AdaptiveLimiter per target class, created on first use"""
+
+    def __init__(self, limits: Dict[str, Tuple[int, int, int]], **options):
+        self.limits = limits
+        self.options = options
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> AdaptiveLimiter:
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(name)
+                if limiter is None:
+                    initial, min_limit, max_limit = self.limits.get(name, DEFAULT_LIMITS.get(name, (10, 1, 32)))
+                    limiter = self._limiters[name] = AdaptiveLimiter(name, initial, min_limit, max_limit, **self.options)
+        return limiter
+
+    def get_stats(self) -> Dict:
+        return {name: limiter.get_stats() for name, limiter in list(self._limiters.items())}
+
+
+# Shared by every module, so all fan-outs to the same kind of target share one limit
+limiters = ConcurrencyLimiters(
+    {**DEFAULT_LIMITS, **settings.ADAPTIVE_CONCURRENCY_LIMITS},
+    adaptive=settings.ADAPTIVE_CONCURRENCY_ENABLED,
+    latency_tolerance=settings.ADAPTIVE_LATENCY_TOLERANCE,
+    error_threshold=settings.ADAPTIVE_ERROR_THRESHOLD,
+    backoff=settings.ADAPTIVE_BACKOFF,
+)
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorBusyError(RuntimeError):
+    """A module's lane is full (all workers busy and its queue at the limit)"""
+
+
+class _Lane:
+    """Bounded thread pool for one module, with queue depth and timing metrics"""
+
+    def __init__(self, name: str, max_workers: int, queue_limit: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+
+        self.pending = 0  # queued + running
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            if self.pending >= self.max_workers + self.queue_limit:
+                self.rejected += 1
+                raise ExecutorBusyError(
+                    f"{self.name} is busy ({self.pending - self.running} requests queued), try again shortly"
+                )
+            self.pending += 1
+            self.submitted += 1
+
+        enqueued_at = time.monotonic()
+
+        def task():
+            started_at = time.monotonic()
+            wait = started_at - enqueued_at
+            with self._lock:
+                self.running += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.pending -= 1
+                    self.total_run += time.monotonic() - started_at
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        try:
+            return self._executor.submit(task)
+        except RuntimeError:
+            # Executor already shut down
+            with self._lock:
+                self.pending -= 1
+            raise
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            finished = self.completed + self.failed
+            started = finished + self.running
+            return {
+                "workers": self.max_workers,
+                "queue_limit": self.queue_limit,
+                "running": self.running,
+                "queued": self.pending - self.running,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait / started * 1000, 1) if started else 0,
+                "max_wait_ms": round(self.max_wait * 1000, 1),
+                "avg_run_ms": round(self.total_run / finished * 1000, 1) if finished else 0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BlockingExecutor:
+    """Per-module thread lanes for blocking service calls made from async routes.
+
+    Each module gets its own bounded pool and queue, so a slow firmware upload
+    in cctv_tools can only exhaust the cctv_tools lane - the event loop and the
+    other modules keep serving requests.
+    """
+
+    def __init__(self, lanes: Dict[str, int], queue_limit: int, default_workers: int = 4):
+        self.queue_limit = queue_limit
+        self.default_workers = default_workers
+        self._lanes: Dict[str, _Lane] = {
+            name: _Lane(name, workers, queue_limit) for name, workers in lanes.items()
+        }
+        self._lock = threading.Lock()
+
+    def _get_lane(self, module: str) -> _Lane:
+        lane = self._lanes.get(module)
+        if lane is None:
+            with self._lock:
+                lane = self._lanes.get(module)
+                if lane is None:
+                    lane = _Lane(module, self.default_workers, self.queue_limit)
+                    self._lanes[module] = lane
+        return lane
+
+    async def run(self, module: str, fn: Callable, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on the module's lane and await the result.
+
+        Raises ExecutorBusyError straight away if the lane's queue is full.
+        """
+        future = self._get_lane(module).submit(fn, *args, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    def get_stats(self) -> Dict:
+        """Per-module queue depth, wait and run time metrics"""
+        return {name: lane.get_stats() for name, lane in list(self._lanes.items())}
+
+    def shutdown(self):
+        for lane in list(self._lanes.values()):
+            lane.shutdown()
+
+
+# Process-wide executor shared by every router
+blocking_executor = BlockingExecutor(
+    lanes={
+        "image_recon_service": settings.EXECUTOR_IMAGE_RECON_WORKERS,
+        "osmachine": settings.EXECUTOR_OSMACHINE_WORKERS,
+        "cctv_tools": settings.EXECUTOR_CCTV_TOOLS_WORKERS,
+    },
+    queue_limit=settings.EXECUTOR_QUEUE_LIMIT,
+)
+
+
+async def run_blocking(module: str, fn: Callable, *args, **kwargs):
+    """Shortcut for blocking_executor.run()"""
+    return await blocking_executor.run(module, fn, *args, **kwargs)
@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import settings
+
+try:
+    import watchfiles
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Per candidate: (path, inode, mtime_ns, size), or (path, None, None, None) while it doesn't exist
+Signature = Tuple[Tuple[str, Optional[int], Optional[int], Optional[int]], ...]
+
+
+def _signature(paths: Sequence[str]) -> Signature:
+    """Signature of ``paths`` (missing ones included, so their appearance is a change too)"""
+    entries = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            entries.append((path, None, None, None))
+            continue
+        entries.append((path, stat.st_ino, stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+class WatchedFile:
+    """The parsed contents of one config file, kept current by the FileWatcher.
+
+    ``paths`` are candidate locations in order of preference; the first one
+    that exists and parses with ``parser(path)`` is used. While none exists,
+    ``value`` is ``default``. If every existing candidate fails to parse, the
+    previous value is kept (``path`` still names the preferred file, so
+    readers don't mistake a broken file for a missing one).
+    Only the loaded candidate and the ones preferred over it are watched:
+    a fallback copy written by a subscriber doesn't trigger another load.
+    Subscribers are called with every newly parsed value.
+    """
+
+    def __init__(self, name: str, paths: Sequence[str], parser: Callable[[str], object], default=None):
+        self.name = name
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.parser = parser
+        self.default = default
+        self.value = default
+        self.path: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self.reloads = 0
+        self.error: Optional[str] = None
+        self._signature: Signature = ()
+        # Leading candidates whose changes matter: up to the loaded one (all while none is loaded)
+        self._watched = len(self.paths)
+        self._loaded = False
+        self._subscribers: List[Callable[[object], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[object], None]):
+        """Call ``callback(value)`` whenever the file is re-parsed"""
+        self._subscribers.append(callback)
+
+    def check(self, force: bool = False) -> bool:
+        """Re-parse if the active file changed (or ``force``); returns True when the value was replaced"""
+        with self._lock:
+            signature = _signature(self.paths)
+            if self._loaded and not force and signature[:self._watched] == self._signature:
+                return False
+
+            errors = []
+            existing = [entry[0] for entry in signature if entry[1] is not None]
+            if not existing:
+                value, path = self.default, None
+                logger.warning(f"⚠️ [{self.name}] none of the watched files exist: {self.paths}")
+            else:
+                for path in existing:
+                    try:
+                        value = self.parser(path)
+                        break
+                    except Exception as e:
+                        # Fall through to the next candidate, like reading them in order would
+                        errors.append(f"{path}: {e}")
+                        logger.error(f"❌ [{self.name}] failed to parse {path}: {e}")
+                else:
+                    # Keep serving the last good value; retry once a file changes again
+                    self._watched = len(self.paths)
+                    self._signature, self._loaded = signature, True
+                    self.path = self.path or existing[0]
+                    self.error = "; ".join(errors)
+                    return False
+
+            self._watched = self.paths.index(path) + 1 if path else len(self.paths)
+            self.value, self.path = value, path
+            self._signature, self._loaded = signature[:self._watched], True
+            self.loaded_at = time.time()
+            self.reloads += 1
+            self.error = "; ".join(errors) or None
+            logger.info(f"📂 [{self.name}] loaded {path or 'defaults'}")
+
+        for callback in list(self._subscribers):
+            try:
+                callback(value)
+            except Exception as e:
+                logger.error(f"❌ [{self.name}] subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+        return True
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "path": self.path,
+            "paths": self.paths,
+            "reloads": self.reloads,
+            "loaded_at": self.loaded_at,
+            "error": self.error,
+            "subscribers": len(self._subscribers)
+        }
+
+
+class FileWatcher:
+    """Watches config files and re-parses them once per change, off the request path.
+
+    A single background thread waits for inotify events on the watched
+    files' directories (via ``watchfiles``, when installed) and otherwise
+    polls every ``interval`` seconds, comparing inode, mtime and size. The
+    poll also runs after every inotify wait, so files in directories that
+    did not exist yet are still picked up.
+
+    Readers use ``WatchedFile.value`` and never stat or parse anything.
+    Code that writes a watched file itself calls ``reload(name)`` afterwards
+    so the next read sees the new contents without waiting for the thread.
+    """
+
+    def __init__(self, interval: float = 2, use_inotify: bool = True):
+        self.interval = interval
+        self.use_inotify = use_inotify and INOTIFY_AVAILABLE
+        self._files: Dict[str, WatchedFile] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # Set to make the watcher thread rebuild its inotify watch (new file registered) or exit
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, name: str, paths: Sequence[str], parser: Callable[[str], object], default=None) -> WatchedFile:
+        """Register (or return the already registered) watched file ``name``, parsed immediately"""
+        with self._lock:
+            watched = self._files.get(name)
+            if watched is not None:
+                return watched
+            watched = self._files[name] = WatchedFile(name, paths, parser, default)
+        watched.check()
+        self._wake.set()
+        self.start()
+        return watched
+
+    def get(self, name: str) -> Optional[WatchedFile]:
+        return self._files.get(name)
+
+    def reload(self, name: str, force: bool = False) -> object:
+        """Pick up a change right away (e.g. after writing the file) and return the current value"""
+        watched = self._files[name]
+        watched.check(force=force)
+        return watched.value
+
+    def check_all(self):
+        with self._lock:
+            watched_files = list(self._files.values())
+        for watched in watched_files:
+            watched.check()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+            self._thread.start()
+        logger.info(f"👀 File watcher started ({'inotify' if self.use_inotify else 'polling'}, {self.interval:g}s poll)")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _watched_dirs(self) -> Tuple[List[str], set]:
+        with self._lock:
+            paths = {path for watched in self._files.values() for path in watched.paths}
+        return sorted({os.path.dirname(path) for path in paths if os.path.isdir(os.path.dirname(path))}), paths
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            dirs, paths = self._watched_dirs()
+            try:
+                if self.use_inotify and dirs:
+                    for _ in watchfiles.watch(
+                        *dirs,
+                        watch_filter=lambda change, path: path in paths,
+                        debounce=200,
+                        stop_event=self._wake,
+                        rust_timeout=int(self.interval * 1000),
+                        yield_on_timeout=True,
+                        recursive=False,
+                        raise_interrupt=False
+                    ):
+                        self.check_all()
+                else:
+                    self._wake.wait(self.interval)
+                self.check_all()
+            except Exception as e:
+                logger.error(f"❌ File watcher error: {e}")
+                self._stop.wait(self.interval)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            watched_files = list(self._files.values())
+        return {
+            "mode": "inotify" if self.use_inotify else "polling",
+            "interval": self.interval,
+            "files": [watched.to_dict() for watched in watched_files]
+        }
+
+
+# Shared watcher for the app's config files
+file_watcher = FileWatcher(interval=settings.FILE_WATCH_INTERVAL, use_inotify=settings.FILE_WATCH_INOTIFY)
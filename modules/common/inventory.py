@@ -0,0 +1,279 @@
+import hashlib
+import json
+import os
+import threading
+import logging
+from functools import partial
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from lxml import etree
+
+from config import settings
+from modules.common.file_watch import file_watcher, WatchedFile
+
+logger = logging.getLogger(__name__)
+
+# Prometheus target files listing the image recon servers, in order of preference
+IMAGE_RECON_JSON_PATHS = [
+    '/opt/compose-conf/prometheus/config/conf.d/node/image-recon.json',
+    '/opt/compose-conf/prometheus/image-recon.json',
+    '/opt/compose-conf/image-recon.json',
+    os.path.join(settings.TYPE_DIR, 'ir.json')  # Fallback for local dev
+]
+
+# lognavigator.xml locations, in order of preference; the local copy (kept by OSMachine) is the last resort
+LOGNAV_LOCAL_DIR = "./config/lognavigator"
+LOGNAV_LOCAL_FILE = os.path.join(LOGNAV_LOCAL_DIR, 'lognavigator.xml')
+LOGNAV_PATHS = [
+    "/opt/compose-conf/lognavigator/lognavigator.xml",
+    "/compose-conf/lognavigator/lognavigator.xml",
+    "/opt/compose-conf/web/config/lognavigator/lognavigator.xml",
+    "/var/log/lognavigator/lognavigator.xml",
+    "/etc/lognavigator/lognavigator.xml",
+    LOGNAV_LOCAL_FILE
+]
+
+# Inventory sources (file watcher names) and the fields each one is indexed by
+IMAGE_RECON = "image-recon.json"
+LOGNAVIGATOR = "lognavigator.xml"
+IMAGE_RECON_FIELDS = ("ip", "hostname", "label")
+OSMACHINE_FIELDS = ("ip", "display_group")
+
+
+class ImageReconServer:
+    """One image recon server from image-recon.json"""
+    __slots__ = ("ip", "hostname", "label")
+
+    def __init__(self, ip: str, hostname: str, label: str):
+        self.ip = ip
+        self.hostname = hostname
+        self.label = label
+
+    def to_dict(self) -> Dict:
+        return {"ip": self.ip, "hostname": self.hostname, "label": self.label, "status": "unknown"}
+
+
+class OSMachine:
+    """One OSM machine (log-access-config entry) from lognavigator.xml"""
+    __slots__ = ("ip", "config_id", "display_group", "url")
+
+    def __init__(self, ip: str, config_id: str, display_group: str, url: str):
+        self.ip = ip
+        self.config_id = config_id
+        self.display_group = display_group
+        self.url = url
+
+    def to_dict(self) -> Dict:
+        return {
+            "ip": self.ip,
+            "config_id": self.config_id,
+            "display_group": self.display_group,
+            "url": self.url,
+            "status": "unknown"
+        }
+
+
+class Inventory:
+    """Immutable list of records with O(1) lookups on the indexed fields.
+
+    Every lookup returns prebuilt lists of records or of the records' dict
+    form (as the API returns them), so nothing is scanned or copied per
+    call. The lists and dicts are shared between callers and must not be
+    mutated.
+    """
+
+    def __init__(self, records: Iterable, fields: Sequence[str], stats: Optional[Dict] = None):
+        self.records: Tuple = tuple(records)
+        # Source-specific load statistics (e.g. entries skipped while parsing)
+        self.stats: Dict = stats or {}
+        self._dicts: List[Dict] = [record.to_dict() for record in self.records]
+        self._records_by: Dict[str, Dict[str, List]] = {}
+        self._dicts_by: Dict[str, Dict[str, List[Dict]]] = {}
+        for field in fields:
+            records_by: Dict[str, List] = {}
+            dicts_by: Dict[str, List[Dict]] = {}
+            for record, as_dict in zip(self.records, self._dicts):
+                key = getattr(record, field)
+                found = records_by.get(key)
+                if found is None:
+                    records_by[key] = [record]
+                    dicts_by[key] = [as_dict]
+                else:
+                    found.append(record)
+                    dicts_by[key].append(as_dict)
+            self._records_by[field] = records_by
+            self._dicts_by[field] = dicts_by
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.records)
+
+    def get(self, ip: str):
+        """The record for ``ip`` (the first one if listed more than once), or None"""
+        found = self._records_by["ip"].get(ip)
+        return found[0] if found else None
+
+    def find(self, field: str, value: str) -> List:
+        """Records whose ``field`` equals ``value`` (shared - do not mutate)"""
+        return self._records_by[field].get(value, [])
+
+    def find_dicts(self, field: str, value: str) -> List[Dict]:
+        """Dict form of ``find`` (shared - do not mutate)"""
+        return self._dicts_by[field].get(value, [])
+
+    def keys(self, field: str) -> List[str]:
+        """Distinct values of ``field``, in file order"""
+        return list(self._records_by[field])
+
+    def dicts(self) -> List[Dict]:
+        """Every record in dict form (shared - do not mutate)"""
+        return self._dicts
+
+
+def parse_image_recon_json(path: str) -> Inventory:
+    """Load a prometheus target file (image-recon.json) into an Inventory of ImageReconServer.
+
+    The address comes from ``targets`` (``ip:port``), or ``labels.instance`` for
+    entries without targets; SRS servers are left out.
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    servers = []
+    if isinstance(data, list):
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            labels = item.get('labels') or {}
+            hostname = labels.get('hostname', 'Unknown Host')
+            label = hostname.split('-')[0]
+            if label.upper() == 'SRS':
+                continue
+            targets = item.get('targets') or ([labels['instance']] if labels.get('instance') else [])
+            for target in targets:
+                servers.append(ImageReconServer(str(target).split(':')[0], hostname, label))
+
+    logger.info(f"✅ Loaded {len(servers)} image recon servers from: {path}")
+    return Inventory(servers, IMAGE_RECON_FIELDS)
+
+
+# (sha1 of the file, groups filter) -> Inventory of the last lognavigator.xml parse
+_lognav_cache: Dict[Tuple[str, Optional[frozenset]], Inventory] = {}
+
+
+def _file_sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_lognavigator(path: str, groups: Optional[Collection[str]] = None) -> Inventory:
+    """Load lognavigator.xml into an Inventory of OSMachine, keeping only ``groups`` (None: every display group).
+
+    The file is streamed with ``iterparse``: each log-access-config element is
+    read, filtered and then freed, so only the kept records stay in memory.
+    A rewrite with the same content (same sha1) reuses the previous result.
+    """
+    group_filter = frozenset(groups) if groups is not None else None
+    cache_key = (_file_sha1(path), group_filter)
+    cached = _lognav_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"📋 lognavigator.xml content unchanged, reusing {len(cached)} machines")
+        return cached
+
+    machines = []
+    total = 0
+    no_ip = 0
+    group_counts: Dict[str, int] = {}
+    for _, config in etree.iterparse(path, events=("end",), tag="log-access-config"):
+        total += 1
+        display_group = (
+            config.get('display-group') or config.get('displayGroup') or config.get('display_group') or 'Unknown'
+        )
+        group_counts[display_group] = group_counts.get(display_group, 0) + 1
+
+        if group_filter is None or display_group in group_filter:
+            config_id = config.get('id', 'Unknown')
+            url = config.get('url', '')
+
+            # Extract IP from URL
+            ip = url.replace('http://', '').replace('https://', '').replace(':80', '').replace(':443', '')
+            if ':' in ip:
+                ip = ip.split(':')[0]
+            if ip and ip != 'Unknown':
+                machines.append(OSMachine(ip, config_id, display_group, url))
+            else:
+                no_ip += 1
+
+        # Free the element and the already processed siblings before the next one
+        config.clear(keep_tail=False)
+        parent = config.getparent()
+        if parent is not None:
+            while config.getprevious() is not None:
+                del parent[0]
+
+    logger.info(f"✅ Loaded {len(machines)} of {total} machines from: {path}" + (f" ({no_ip} without a valid IP)" if no_ip else ""))
+    result = Inventory(machines, OSMACHINE_FIELDS, stats={"total_entries": total, "no_ip": no_ip, "group_counts": group_counts})
+    _lognav_cache.clear()
+    _lognav_cache[cache_key] = result
+    return result
+
+
+SOURCES: Dict[str, Tuple[List[str], Callable[[str], Inventory], Tuple[str, ...]]] = {
+    IMAGE_RECON: (IMAGE_RECON_JSON_PATHS, parse_image_recon_json, IMAGE_RECON_FIELDS),
+    LOGNAVIGATOR: (LOGNAV_PATHS, partial(parse_lognavigator, groups=settings.OSMACHINE_ALLOWED_GROUPS), OSMACHINE_FIELDS),
+}
+
+
+class FleetInventory:
+    """The fleet inventory shared by all modules, one Inventory per source file.
+
+    Each source is parsed once per change by the file watcher; readers get
+    the current Inventory and query its indexes.
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, WatchedFile] = {}
+        self._lock = threading.Lock()
+
+    def source(self, name: str) -> WatchedFile:
+        """The watched source file ``name`` (IMAGE_RECON or LOGNAVIGATOR), registered on first use"""
+        watched = self._sources.get(name)
+        if watched is None:
+            with self._lock:
+                watched = self._sources.get(name)
+                if watched is None:
+                    paths, parser, fields = SOURCES[name]
+                    watched = self._sources[name] = file_watcher.watch(name, paths, parser, default=Inventory((), fields))
+        return watched
+
+    def get(self, name: str) -> Inventory:
+        return self.source(name).value
+
+    @property
+    def image_recon(self) -> Inventory:
+        """Image recon servers - indexed by ip, hostname and label"""
+        return self.get(IMAGE_RECON)
+
+    @property
+    def os_machines(self) -> Inventory:
+        """OSM machines - indexed by ip, config_id and display_group"""
+        return self.get(LOGNAVIGATOR)
+
+    def subscribe(self, name: str, callback: Callable[[Inventory], None]):
+        self.source(name).subscribe(callback)
+
+    def reload(self, name: str, force: bool = False) -> Inventory:
+        self.source(name)
+        return file_watcher.reload(name, force=force)
+
+    def path(self, name: str) -> Optional[str]:
+        """The file the current Inventory was loaded from (None when no candidate exists)"""
+        return self.source(name).path
+
+
+inventory = FleetInventory()
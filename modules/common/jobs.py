@@ -0,0 +1,397 @@
+import asyncio
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+# Was queued or running when the process stopped
+INTERRUPTED = "interrupted"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class JobCancelled(Exception):
+    """Raised by Job.check_cancelled() once cancellation was requested"""
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+class Job:
+    """One long-running operation and its progress.
+
+    The job function receives the Job and reports through it: ``set_total``,
+    ``set_current`` and one ``advance`` per finished item. Cancellation is
+    cooperative - the function calls ``check_cancelled()`` (or ``wait()``)
+    between items, and cancel hooks let it forward the request to whatever
+    it is driving. ``details`` is an optional callable whose output is
+    included verbatim in ``to_dict()`` for operation-specific progress.
+    """
+
+    def __init__(self, kind: str, title: str = "", total: int = 0, params: Optional[Dict] = None,
+                 dedupe_key: Optional[Hashable] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.title = title or kind
+        self.params = params or {}
+        self.dedupe_key = dedupe_key
+        self.state = QUEUED
+        self.total = total
+        self.done = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.current = ""
+        self.results: List[Dict] = []
+        self.result = None
+        self.error: Optional[str] = None
+        self.details: Optional[Callable[[], Dict]] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._cancel_hooks: List[Callable[[], None]] = []
+        self._on_change: Callable[["Job", bool], None] = lambda job, force: None
+        self._saved: Optional[Dict] = None  # to_dict() of a job restored from the state file
+
+    # Reporting API for the job function
+
+    def set_total(self, total: int):
+        with self._lock:
+            self.total = total
+        self._on_change(self, False)
+
+    def set_current(self, current: str):
+        with self._lock:
+            self.current = current
+        self._on_change(self, False)
+
+    def advance(self, item: Optional[Dict] = None, ok: bool = True):
+        """Count one finished item, keeping ``item`` (if given) in the results"""
+        with self._lock:
+            self.done += 1
+            if ok:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            if item is not None:
+                self.results.append(item)
+        self._on_change(self, False)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.id} was cancelled")
+
+    def wait(self, seconds: float):
+        """Sleep up to ``seconds``, raising JobCancelled as soon as the job is cancelled"""
+        if self._cancel.wait(seconds):
+            raise JobCancelled(f"Job {self.id} was cancelled")
+
+    def add_cancel_hook(self, hook: Callable[[], None]):
+        self._cancel_hooks.append(hook)
+        if self._cancel.is_set():
+            hook()
+
+    def cancel(self) -> bool:
+        """Request cancellation; False if the job already finished"""
+        if self.state not in ACTIVE_STATES:
+            return False
+        self._cancel.set()
+        for hook in list(self._cancel_hooks):
+            try:
+                hook()
+            except Exception as e:
+                logger.error(f"❌ Cancel hook of job {self.id} failed: {e}")
+        return True
+
+    def to_dict(self) -> Dict:
+        if self._saved is not None:
+            return dict(self._saved)
+        with self._lock:
+            now = time.time()
+            elapsed = (self.finished_at or now) - self.started_at if self.started_at else 0.0
+            eta = None
+            if self.state == RUNNING and self.done and self.total > self.done:
+                # Same estimate as the Flask update progress: average time per item so far
+                eta = round(elapsed / self.done * (self.total - self.done), 1)
+            data = {
+                "job_id": self.id,
+                "kind": self.kind,
+                "title": self.title,
+                "state": self.state,
+                "params": self.params,
+                "cancel_requested": self._cancel.is_set(),
+                "total": self.total,
+                "done": self.done,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "current": self.current,
+                "progress_percent": round(self.done / self.total * 100, 1) if self.total else 0.0,
+                "elapsed_seconds": round(elapsed, 1),
+                "eta_seconds": eta,
+                "created_at": _isoformat(self.created_at),
+                "started_at": _isoformat(self.started_at),
+                "finished_at": _isoformat(self.finished_at),
+                "error": self.error,
+                "results": list(self.results),
+                "result": self.result,
+            }
+        if self.details is not None:
+            try:
+                data["details"] = self.details()
+            except Exception as e:
+                data["details"] = {"error": str(e)}
+        return data
+
+    @classmethod
+    def restore(cls, data: Dict) -> "Job":
+        """Read-only Job for an entry of the state file; unfinished ones become interrupted"""
+        job = cls(data.get("kind", "unknown"), data.get("title", ""))
+        job.id = data["job_id"]
+        job.state = data.get("state", INTERRUPTED)
+        if job.state in ACTIVE_STATES:
+            job.state = INTERRUPTED
+            data = {
+                **data,
+                "state": INTERRUPTED,
+                "eta_seconds": None,
+                "error": data.get("error") or "Server restarted while the job was running",
+                "finished_at": data.get("finished_at") or datetime.now().isoformat(),
+            }
+        job._saved = data
+        return job
+
+
+class JobManager:
+    """Runs long operations in the background and keeps their state across restarts.
+
+    ``submit()`` returns immediately with the Job; callers poll its progress
+    by id. A ``dedupe_key`` makes a repeated submission (a browser retry or a
+    second click) return the job that is already queued or running instead
+    of starting the operation again.
+
+    Plain functions run on a bounded thread pool; coroutine functions run as
+    tasks on the event loop of the caller. Job state is written atomically
+    to ``store_path`` on every state change and at most every
+    ``persist_interval`` seconds while progress is reported. Jobs found
+    unfinished in the file at startup are marked interrupted.
+    """
+
+    def __init__(self, store_path: str, max_workers: int = 4, history: int = 100,
+                 persist_interval: float = 2.0):
+        self.store_path = store_path
+        self.history = history
+        self.persist_interval = persist_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active_keys: Dict[Hashable, str] = {}
+        self._lock = threading.RLock()
+        self._persist_lock = threading.Lock()
+        self._last_persist = 0.0
+        self._load()
+
+    def submit(self, kind: str, fn: Callable, title: str = "", total: int = 0, params: Optional[Dict] = None,
+               dedupe_key: Optional[Hashable] = None,
+               details: Optional[Callable[[], Dict]] = None) -> Tuple[Job, bool]:
+        """Start ``fn(job)`` in the background; returns (job, created).
+
+        ``created`` is False when an active job with the same ``dedupe_key``
+        was returned instead.
+        """
+        is_async = inspect.iscoroutinefunction(fn)
+        loop = asyncio.get_running_loop() if is_async else None
+        with self._lock:
+            if dedupe_key is not None:
+                existing = self._jobs.get(self._active_keys.get(dedupe_key, ""))
+                if existing is not None and existing.state in ACTIVE_STATES:
+                    logger.info(f"♻️ Job {existing.id} ({kind}) already active, not starting another")
+                    return existing, False
+            job = Job(kind, title, total, params, dedupe_key)
+            job.details = details
+            job._on_change = self._changed
+            self._jobs[job.id] = job
+            if dedupe_key is not None:
+                self._active_keys[dedupe_key] = job.id
+            self._trim()
+
+        logger.info(f"🧵 Job {job.id} queued: {job.title}")
+        if is_async:
+            task = loop.create_task(self._run_async(job, fn))
+            job.add_cancel_hook(lambda: loop.call_soon_threadsafe(task.cancel))
+        else:
+            self._executor.submit(self._run, job, fn)
+        self._persist(force=True)
+        return job, True
+
+    def _start(self, job: Job) -> bool:
+        with job._lock:
+            if job._cancel.is_set():
+                return False
+            job.state = RUNNING
+            job.started_at = time.time()
+        self._persist(force=True)
+        return True
+
+    def _finish(self, job: Job, state: str, result=None, error: Optional[str] = None):
+        with job._lock:
+            if state == COMPLETED and job._cancel.is_set():
+                state = CANCELLED
+            job.state = state
+            job.result = result
+            job.error = error
+            job.current = ""
+            job.finished_at = time.time()
+        with self._lock:
+            if self._active_keys.get(job.dedupe_key) == job.id:
+                del self._active_keys[job.dedupe_key]
+        icon = {COMPLETED: "✅", CANCELLED: "🛑"}.get(state, "❌")
+        logger.info(f"{icon} Job {job.id} {state} after {job.finished_at - (job.started_at or job.finished_at):.1f}s"
+                    f" ({job.done}/{job.total}){f': {error}' if error else ''}")
+        self._persist(force=True)
+
+    def _run(self, job: Job, fn: Callable):
+        if not self._start(job):
+            self._finish(job, CANCELLED)
+            return
+        try:
+            self._finish(job, COMPLETED, fn(job))
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            logger.exception(f"❌ Job {job.id} ({job.kind}) failed")
+            self._finish(job, FAILED, error=str(e))
+
+    async def _run_async(self, job: Job, fn: Callable):
+        if not self._start(job):
+            self._finish(job, CANCELLED)
+            return
+        try:
+            self._finish(job, COMPLETED, await fn(job))
+        except (JobCancelled, asyncio.CancelledError):
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            logger.exception(f"❌ Job {job.id} ({job.kind}) failed")
+            self._finish(job, FAILED, error=str(e))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, kind: Optional[str] = None) -> List[Dict]:
+        """Summaries (without per-item results) of every known job, newest first"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        summaries = []
+        for job in reversed(jobs):
+            if kind and job.kind != kind:
+                continue
+            data = job.to_dict()
+            data.pop("results", None)
+            data.pop("result", None)
+            data.pop("details", None)
+            summaries.append(data)
+        return summaries
+
+    def latest(self, kind: str) -> Optional[Job]:
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.kind == kind:
+                    return job
+        return None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is not None and job.cancel():
+            logger.info(f"🛑 Cancellation requested for job {job.id}")
+            self._persist(force=True)
+        return job
+
+    def _trim(self):
+        """Drop the oldest finished jobs beyond ``history`` (active ones are always kept)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.state not in ACTIVE_STATES]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def _changed(self, job: Job, force: bool):
+        self._persist(force)
+
+    def _persist(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_persist < self.persist_interval:
+            return
+        with self._persist_lock:
+            self._last_persist = now
+            with self._lock:
+                jobs = list(self._jobs.values())
+            data = [job.to_dict() for job in jobs]
+            directory = os.path.dirname(self.store_path) or "."
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".jobs-", suffix=".tmp")
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f, default=str)
+                os.replace(tmp_path, self.store_path)
+            except (OSError, TypeError, ValueError) as e:
+                logger.error(f"❌ Could not save job state to {self.store_path}: {e}")
+
+    def _load(self):
+        if not os.path.exists(self.store_path):
+            return
+        try:
+            with open(self.store_path, "r") as f:
+                data = json.load(f)
+            for entry in data[-self.history:]:
+                job = Job.restore(entry)
+                self._jobs[job.id] = job
+            interrupted = sum(1 for job in self._jobs.values() if job.state == INTERRUPTED)
+            logger.info(f"📂 Loaded {len(self._jobs)} jobs from {self.store_path} ({interrupted} interrupted)")
+        except (json.JSONDecodeError, OSError, KeyError, TypeError) as e:
+            logger.error(f"❌ Invalid job state file {self.store_path}: {e}")
+
+    def shutdown(self):
+        """Ask running jobs to stop and save their state (application shutdown)"""
+        with self._lock:
+            active = [job for job in self._jobs.values() if job.state in ACTIVE_STATES]
+        for job in active:
+            job.cancel()
+        self._persist(force=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            states: Dict[str, int] = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+        return {"count": sum(states.values()), "states": states}
+
+
+# Process-wide job manager
+jobs = JobManager(
+    settings.JOBS_STATE_FILE,
+    max_workers=settings.JOBS_MAX_WORKERS,
+    history=settings.JOBS_HISTORY,
+    persist_interval=settings.JOBS_PERSIST_INTERVAL,
+)
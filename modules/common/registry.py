@@ -0,0 +1,54 @@
+import threading
+import logging
+from typing import Callable, Dict
+
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """Owns exactly one instance of each service for the whole process.
+
+    Services register a factory under a name when their module is imported,
+    and the instance is built on first use. Routers get it through
+    ``Depends(services.provider(name))``, while background tasks and other
+    services call ``services.get(name)``. Either way they share the same
+    object, and with it the same caches.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], object]] = {}
+        self._instances: Dict[str, object] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], object]):
+        with self._lock:
+            self._factories[name] = factory
+
+    def get(self, name: str):
+        """Return the shared instance for ``name``, creating it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                if name not in self._factories:
+                    raise KeyError(f"No service registered under '{name}'")
+                instance = self._factories[name]()
+                self._instances[name] = instance
+                logger.info(f"🧩 Created shared service instance: {name}")
+            return instance
+
+    def provider(self, name: str) -> Callable[[Request], object]:
+        """FastAPI dependency that resolves ``name`` from the app's registry (app.state.services)"""
+        def provide(request: Request):
+            registry = getattr(request.app.state, "services", self)
+            return registry.get(name)
+        provide.__name__ = f"get_{name}"
+        return provide
+
+
+# Process-wide registry; main.py also exposes it as app.state.services
+services = ServiceRegistry()
@@ -0,0 +1,71 @@
+import os
+import threading
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import paramiko
+    SSH_AVAILABLE = True
+except ImportError:
+    SSH_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# {(abs_path, loader_name): ((mtime_ns, size), key)}
+_key_cache: Dict[Tuple[str, str], Tuple[Tuple[int, int], object]] = {}
+_key_cache_lock = threading.Lock()
+
+
+def cached_key_load(key_path: str, loader: Callable[[str], object], loader_name: str):
+    """Load a key through ``loader`` once per file version (path + mtime + size).
+
+    The key is only re-parsed when the file on disk changes, so callers can
+    ask for it on every connection without paying the parse cost again.
+    """
+    abs_path = os.path.abspath(key_path)
+    stat = os.stat(abs_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cache_key = (abs_path, loader_name)
+
+    with _key_cache_lock:
+        cached = _key_cache.get(cache_key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+    key = loader(abs_path)
+
+    with _key_cache_lock:
+        _key_cache[cache_key] = (version, key)
+    logger.info(f"🔑 Loaded SSH key {abs_path} ({type(key).__name__})")
+    return key
+
+
+def _load_paramiko_key(key_path: str, password: Optional[str] = None):
+    """Parse a private key file trying Ed25519, ECDSA and RSA in that order"""
+    key_classes = [paramiko.Ed25519Key, paramiko.ECDSAKey, paramiko.RSAKey]
+    last_error = None
+    for key_class in key_classes:
+        try:
+            return key_class.from_private_key_file(key_path, password=password)
+        except paramiko.PasswordRequiredException:
+            raise
+        except (paramiko.SSHException, ValueError) as e:
+            last_error = e
+            continue
+    raise paramiko.SSHException(f"Unsupported or invalid private key {key_path}: {last_error}")
+
+
+def load_private_key(key_path: str, password: Optional[str] = None):
+    """Return a cached paramiko PKey for ``key_path`` (Ed25519, ECDSA or RSA)"""
+    if not SSH_AVAILABLE:
+        raise RuntimeError("SSH functionality not available. Install paramiko package.")
+    if not os.path.exists(key_path):
+        raise ValueError(f"Private key file does not exist at path: {key_path}")
+
+    return cached_key_load(key_path, lambda path: _load_paramiko_key(path, password), "paramiko")
+
+
+def clear_key_cache():
+    """Forget every cached key (next use re-reads from disk)"""
+    with _key_cache_lock:
+        _key_cache.clear()
@@ -0,0 +1,247 @@
+import select
+import socket
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import paramiko
+    SSH_AVAILABLE = True
+except ImportError:
+    SSH_AVAILABLE = False
+
+from config import settings
+from .ssh_keys import load_private_key
+
+logger = logging.getLogger(__name__)
+
+# Pool key: (host, port, username, key_path)
+PoolKey = Tuple[str, int, str, Optional[str]]
+
+
+class _PooledConnection:
+    """An authenticated SSHClient plus the bookkeeping the pool needs"""
+
+    def __init__(self, client, key: PoolKey):
+        self.client = client
+        self.key = key
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+    def is_healthy(self) -> bool:
+        """Check that the underlying transport is still up and authenticated"""
+        transport = self.client.get_transport()
+        if transport is None or not transport.is_active() or not transport.is_authenticated():
+            return False
+        try:
+            # Cheap round-trip-free probe: fails immediately if the socket is dead
+            transport.send_ignore()
+        except Exception:
+            return False
+        return True
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+class SSHConnectionPool:
+    """Keyed pool of persistent SSH connections (per host/port/user/key).
+
+    Each borrowed connection runs one command at a time on its own channel,
+    so a host never sees more than ``max_per_host`` concurrent sessions from us.
+    Idle connections are health-checked before reuse and evicted after
+    ``idle_timeout`` seconds.
+    """
+
+    def __init__(self, max_per_host: int = 4, idle_timeout: int = 300, keepalive_interval: int = 30):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+
+        self._lock = threading.Condition()
+        self._idle: Dict[PoolKey, List[_PooledConnection]] = {}
+        self._in_use: Dict[PoolKey, int] = {}
+        self._stats = {"created": 0, "reused": 0, "evicted": 0, "discarded": 0}
+
+    def _connect(self, key: PoolKey, password: Optional[str], timeout: int):
+        host, port, username, key_path = key
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+        connect_kwargs = {
+            "port": port,
+            "username": username,
+            "timeout": timeout,
+            "banner_timeout": timeout,
+            "auth_timeout": timeout,
+        }
+        if key_path:
+            connect_kwargs["pkey"] = load_private_key(key_path)
+        if password:
+            connect_kwargs["password"] = password
+
+        client.connect(host, **connect_kwargs)
+        transport = client.get_transport()
+        if transport is not None and self.keepalive_interval:
+            transport.set_keepalive(self.keepalive_interval)
+
+        with self._lock:
+            self._stats["created"] += 1
+        return _PooledConnection(client, key)
+
+    def _evict_idle_locked(self, now: float):
+        """Close idle connections past their idle timeout (caller holds the lock)"""
+        for key in list(self._idle.keys()):
+            keep = []
+            for conn in self._idle[key]:
+                if now - conn.last_used > self.idle_timeout:
+                    conn.close()
+                    self._stats["evicted"] += 1
+                else:
+                    keep.append(conn)
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+
+    def _acquire(self, key: PoolKey, password: Optional[str], timeout: int) -> _PooledConnection:
+        deadline = time.time() + timeout
+        with self._lock:
+            self._evict_idle_locked(time.time())
+
+            while True:
+                # Reuse an idle healthy connection if we have one
+                idle = self._idle.get(key, [])
+                while idle:
+                    conn = idle.pop()
+                    if conn.is_healthy():
+                        self._in_use[key] = self._in_use.get(key, 0) + 1
+                        self._stats["reused"] += 1
+                        return conn
+                    conn.close()
+                    self._stats["discarded"] += 1
+
+                # Otherwise open a new one if the per-host limit allows it
+                if self._in_use.get(key, 0) < self.max_per_host:
+                    self._in_use[key] = self._in_use.get(key, 0) + 1
+                    break
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timed out waiting for a free SSH connection to {key[0]}")
+                self._lock.wait(remaining)
+
+        # Connect outside the lock so slow hosts don't block the whole pool
+        try:
+            return self._connect(key, password, timeout)
+        except Exception:
+            with self._lock:
+                self._in_use[key] -= 1
+                self._lock.notify_all()
+            raise
+
+    def _release(self, conn: _PooledConnection, reusable: bool):
+        with self._lock:
+            self._in_use[conn.key] = max(0, self._in_use.get(conn.key, 1) - 1)
+            if reusable and conn.is_healthy():
+                conn.last_used = time.time()
+                self._idle.setdefault(conn.key, []).append(conn)
+            else:
+                conn.close()
+                self._stats["discarded"] += 1
+            self._lock.notify_all()
+
+    @contextmanager
+    def connection(self, host: str, username: str, key_path: Optional[str] = None,
+                   password: Optional[str] = None, port: int = 22, timeout: int = 30):
+        """Borrow an authenticated SSHClient for the duration of the block.
+
+        The connection goes back to the pool on success and is discarded if
+        the block raises, since the transport may be in an unknown state.
+        """
+        if not SSH_AVAILABLE:
+            raise RuntimeError("SSH functionality not available. Install paramiko package.")
+
+        key = (host, port, username, key_path)
+        conn = self._acquire(key, password, timeout)
+        try:
+            yield conn.client
+        except Exception:
+            self._release(conn, reusable=False)
+            raise
+        else:
+            self._release(conn, reusable=True)
+
+    def exec_command(self, host: str, username: str, command: str, key_path: Optional[str] = None,
+                     password: Optional[str] = None, port: int = 22, timeout: int = 30,
+                     command_timeout: Optional[int] = None, deadline: Optional[float] = None) -> Tuple[int, str, str]:
+        """Run a command on a pooled connection and return (exit_status, stdout, stderr).
+
+        With ``deadline`` (a time.monotonic() value) the whole call, connecting
+        included, raises socket.timeout once it is reached.
+        """
+        if deadline is not None:
+            timeout = max(0.1, min(timeout, deadline - time.monotonic()))
+        with self.connection(host, username, key_path=key_path, password=password,
+                             port=port, timeout=timeout) as client:
+            stdin, stdout, stderr = client.exec_command(command, timeout=command_timeout)
+            if deadline is not None:
+                output, error = self._read_until(stdout.channel, deadline)
+            else:
+                output = stdout.read()
+                error = stderr.read()
+            exit_status = stdout.channel.recv_exit_status()
+            return exit_status, output.decode('utf-8', errors='ignore'), error.decode('utf-8', errors='ignore')
+
+    @staticmethod
+    def _read_until(channel, deadline: float) -> Tuple[bytes, bytes]:
+        """Read stdout and stderr until the command exits; socket.timeout once ``deadline`` passes"""
+        output, error = [], []
+        while True:
+            while channel.recv_ready():
+                output.append(channel.recv(65536))
+            while channel.recv_stderr_ready():
+                error.append(channel.recv_stderr(65536))
+            if channel.exit_status_ready() and not channel.recv_ready() and not channel.recv_stderr_ready():
+                return b"".join(output), b"".join(error)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                channel.close()
+                raise socket.timeout("command deadline exceeded")
+            select.select([channel], [], [], min(remaining, 1.0))
+
+    def evict_idle(self):
+        """Close connections that have been idle longer than the idle timeout"""
+        with self._lock:
+            self._evict_idle_locked(time.time())
+
+    def close_all(self):
+        """Close every idle connection (in-use ones are closed when released)"""
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+            self._lock.notify_all()
+
+    def get_stats(self) -> Dict:
+        """Snapshot of pool usage for diagnostics"""
+        with self._lock:
+            return {
+                **self._stats,
+                "idle": sum(len(c) for c in self._idle.values()),
+                "in_use": sum(self._in_use.values()),
+                "hosts": len(set(k[0] for k in list(self._idle.keys()) + list(self._in_use.keys()))),
+            }
+
+
+# Process-wide pool shared by every module that talks SSH
+ssh_pool = SSHConnectionPool(
+    max_per_host=settings.SSH_POOL_MAX_PER_HOST,
+    idle_timeout=settings.SSH_POOL_IDLE_TIMEOUT,
+)
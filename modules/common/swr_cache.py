@@ -0,0 +1,135 @@
+import random
+import threading
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+class StaleWhileRevalidateCache:
+    """In-memory cache that serves stale values while refreshing them in the background.
+
+    - Younger than ``ttl``: returned as is.
+    - Older than ``ttl`` but within ``ttl + max_stale``: returned immediately and
+      a background revalidation is started.
+    - Missing or older than that: the caller loads it.
+
+    Loads are single-flight per key, so concurrent misses for the same key
+    share one loader call. A loader that raises leaves the previous value in place.
+    """
+
+    def __init__(self, ttl: float, max_stale: float, name: str = "cache", refresh_workers: int = 4):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.name = name
+        self._entries: Dict[Hashable, Tuple[object, float]] = {}
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix=f"{name}-revalidate")
+        self._stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "loads": 0, "load_errors": 0, "coalesced": 0}
+
+    def lookup(self, key: Hashable) -> Tuple[Optional[object], str]:
+        """Return (value, FRESH | STALE | MISS) without loading anything"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None, MISS
+        value, stored_at = entry
+        age = time.time() - stored_at
+        if age < self.ttl:
+            return value, FRESH
+        if age < self.ttl + self.max_stale:
+            return value, STALE
+        return None, MISS
+
+    def get(self, key: Hashable, loader: Callable[[], object]):
+        """Return the cached value, revalidating or loading it through ``loader`` as needed"""
+        value, state = self.lookup(key)
+        if state == FRESH:
+            self._count("fresh_hits")
+            return value
+        if state == STALE:
+            self._count("stale_hits")
+            self.load(key, loader, background=True)
+            return value
+        self._count("misses")
+        return self.load(key, loader).result()
+
+    def load(self, key: Hashable, loader: Callable[[], object], background: bool = False) -> Future:
+        """Start (or join) the single in-flight load for ``key`` and return its future"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future
+            future = Future()
+            self._inflight[key] = future
+
+        if background:
+            self._executor.submit(self._run_load, key, loader, future)
+        else:
+            self._run_load(key, loader, future)
+        return future
+
+    def _run_load(self, key: Hashable, loader: Callable[[], object], future: Future):
+        try:
+            value = loader()
+        except Exception as e:
+            self._count("load_errors")
+            logger.warning(f"⚠️ [{self.name}] Failed to load {key}: {e}")
+            future.set_exception(e)
+        else:
+            self.set(key, value)
+            self._count("loads")
+            future.set_result(value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def set(self, key: Hashable, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one key, or everything when ``key`` is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def refresh_many(self, keys: Iterable[Hashable], loader_for: Callable[[Hashable], Callable[[], object]],
+                     parallelism: int = 10, jitter: float = 0.0) -> Dict[Hashable, object]:
+        """Reload many keys in parallel, each after a random 0..``jitter`` second delay.
+
+        Blocks until every load finishes. Returns {key: value or Exception}.
+        """
+        def refresh_one(key):
+            if jitter:
+                time.sleep(random.uniform(0, jitter))
+            return self.load(key, loader_for(key)).result()
+
+        results = {}
+        keys = list(keys)
+        with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix=f"{self.name}-refresh") as executor:
+            futures = {key: executor.submit(refresh_one, key) for key in keys}
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    results[key] = e
+        return results
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "inflight": len(self._inflight)}
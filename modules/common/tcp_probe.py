@@ -0,0 +1,78 @@
+import asyncio
+import time
+import logging
+from typing import Dict, Iterable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Probe outcomes
+SSH_READY = "ssh_ready"        # TCP connect ok and an SSH identification banner was received
+NO_BANNER = "no_banner"        # connected, but no (or a non-SSH) banner before the timeout
+UNREACHABLE = "unreachable"    # refused, timed out or no route
+
+# RFC 4253 lets the server send other lines before its "SSH-" identification line
+MAX_BANNER_LINES = 5
+
+
+class ProbeResult(NamedTuple):
+    host: str
+    state: str
+    latency_ms: float
+    banner: Optional[str] = None
+    error: Optional[str] = None
+
+
+async def probe_ssh(host: str, port: int = 22, timeout: float = 2) -> ProbeResult:
+    """TCP connect to ``host:port`` and read the SSH banner - no key exchange, no login"""
+    start = time.monotonic()
+    deadline = start + timeout
+
+    def elapsed_ms() -> float:
+        return round((time.monotonic() - start) * 1000, 1)
+
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except asyncio.TimeoutError:
+        return ProbeResult(host, UNREACHABLE, elapsed_ms(), error="Connection timeout")
+    except OSError as e:
+        return ProbeResult(host, UNREACHABLE, elapsed_ms(), error=e.strerror or str(e))
+
+    banner = None
+    try:
+        for _ in range(MAX_BANNER_LINES):
+            line = await asyncio.wait_for(reader.readline(), max(0.01, deadline - time.monotonic()))
+            if not line:
+                break
+            if line.startswith(b"SSH-"):
+                banner = line.decode("ascii", "replace").strip()
+                break
+    except (asyncio.TimeoutError, OSError, ValueError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    if banner:
+        return ProbeResult(host, SSH_READY, elapsed_ms(), banner=banner)
+    return ProbeResult(host, NO_BANNER, elapsed_ms(), error="No SSH banner")
+
+
+async def probe_many(hosts: Iterable[str], port: int = 22, timeout: float = 2,
+                     concurrency: int = 256) -> Dict[str, ProbeResult]:
+    """Probe every host concurrently (at most ``concurrency`` sockets open at once)"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def probe_one(host: str) -> ProbeResult:
+        async with semaphore:
+            return await probe_ssh(host, port, timeout)
+
+    unique_hosts = list(dict.fromkeys(hosts))
+    start = time.monotonic()
+    results = await asyncio.gather(*(probe_one(host) for host in unique_hosts))
+    ready = sum(1 for result in results if result.state == SSH_READY)
+    logger.info(f"📡 Probed {len(unique_hosts)} hosts on port {port} in {time.monotonic() - start:.2f}s "
+                f"({ready} with an SSH banner)")
+    return {result.host: result for result in results}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Request, File, UploadFile, Form, HTTPException
+from fastapi import APIRouter, Request, File, UploadFile, Form, HTTPException, Depends
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from typing import Optional
@@ -6,10 +6,12 @@ import json
 
 from .models import JsonGeneratorRequest, MachineTypeRequest, SendJsonRequest
 from .service import ImageReconJsonService
+from modules.common.registry import services
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
-service = ImageReconJsonService()
+# One shared instance per process, resolved from the service registry (app.state.services)
+get_service = services.provider("image_recon_json")
 
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request):
@@ -41,7 +43,8 @@ async def generate_json(
     machineType: str = Form(...),
     poolType: Optional[int] = Form(0),
     screenType: Optional[str] = Form("DUAL"),
-    streams_file: UploadFile = File(...)
+    streams_file: UploadFile = File(...),
+    service: ImageReconJsonService = Depends(get_service)
 ):
     """Generate JSON configuration"""
     try:
@@ -70,7 +73,8 @@ async def generate_json(
 @router.post("/add-machine-type")
 async def add_machine_type(
     machineType: str = Form(...),
-    gameType: int = Form(...)
+    gameType: int = Form(...),
+    service: ImageReconJsonService = Depends(get_service)
 ):
     """Add a new machine type"""
     try:
@@ -81,7 +85,8 @@ async def add_machine_type(
 
 @router.post("/remove-machine-type")
 async def remove_machine_type(
-    machineType: str = Form(...)
+    machineType: str = Form(...),
+    service: ImageReconJsonService = Depends(get_service)
 ):
     """Remove a machine type"""
     try:
@@ -91,7 +96,7 @@ async def remove_machine_type(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/get-machine-types")
-async def get_machine_types():
+async def get_machine_types(service: ImageReconJsonService = Depends(get_service)):
     """Get list of machine types"""
     try:
         machine_types = service.load_machine_types()
@@ -187,7 +192,7 @@ async def get_channel_id(environment: str, location: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/get-image-recon-json")
-async def get_image_recon_json():
+async def get_image_recon_json(service: ImageReconJsonService = Depends(get_service)):
     """Get image-recon.json file content"""
     try:
         result = service.read_image_recon_json()
@@ -196,7 +201,7 @@ async def get_image_recon_json():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/get-servers-for-send")
-async def get_servers_for_send():
+async def get_servers_for_send(service: ImageReconJsonService = Depends(get_service)):
     """Get list of servers for file sending"""
     try:
         servers = service.get_image_recon_servers()
@@ -205,7 +210,7 @@ async def get_servers_for_send():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/send-json-to-servers")
-async def send_json_to_servers(request: SendJsonRequest):
+async def send_json_to_servers(request: SendJsonRequest, service: ImageReconJsonService = Depends(get_service)):
     """Send generated JSON to selected servers"""
     try:
         result = service.send_json_to_servers(
@@ -218,7 +223,7 @@ async def send_json_to_servers(request: SendJsonRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/fetch-json-from-server")
-async def fetch_json_from_server(request: dict):
+async def fetch_json_from_server(request: dict, service: ImageReconJsonService = Depends(get_service)):
     """Fetch JSON file from server via SSH"""
     try:
         server_ip = request.get('server_ip')
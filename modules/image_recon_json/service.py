@@ -13,48 +13,56 @@ try:
 except ImportError:
     SSH_AVAILABLE = False
 from config import settings
+from modules.common.ssh_keys import load_private_key
+from modules.common.registry import services
+from modules.common.file_watch import file_watcher
+from modules.common.inventory import inventory, IMAGE_RECON
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
+IMAGE_RECON_JSON_FILE = '/opt/compose-conf/prometheus/config/conf.d/node/image-recon.json'
+
+
+def _load_json(path: str):
+    with open(path, 'r') as f:
+        return json.load(f)
+
 class ImageReconJsonService:
-    def __init__(self):
+    def __init__(self, server_manager=None):
+        # ImageReconServiceManager whose cached server list we reuse (optional)
+        self.server_manager = server_manager
         self.type_dir = settings.TYPE_DIR
         self.machine_types_file = os.path.join(self.type_dir, 'machine_types.json')
         self.game_types_file = os.path.join(self.type_dir, 'game_types.json')
         
         # Ensure type directory exists
         os.makedirs(self.type_dir, exist_ok=True)
+        
+        # Parsed by the file watcher once per change; reads never touch the disk
+        self._machine_types = file_watcher.watch("machine_types.json", [self.machine_types_file], _load_json, default={})
+        self._game_types = file_watcher.watch("game_types.json", [self.game_types_file], _load_json, default={})
+        self._image_recon_json = file_watcher.watch("image-recon.json (raw)", [IMAGE_RECON_JSON_FILE], _load_json)
     
     def load_machine_types(self) -> Dict:
-        """Load machine types from JSON file"""
-        if os.path.exists(self.machine_types_file):
-            try:
-                with open(self.machine_types_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-        return {}
+        """Load machine types (copy of the watched machine_types.json)"""
+        return dict(self._machine_types.value or {})
     
     def load_game_types(self) -> Dict:
-        """Load game types from JSON file"""
-        if os.path.exists(self.game_types_file):
-            try:
-                with open(self.game_types_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-        return {}
+        """Load game types (copy of the watched game_types.json)"""
+        return dict(self._game_types.value or {})
     
     def save_machine_types(self, machine_types: Dict) -> None:
         """Save machine types to JSON file"""
         with open(self.machine_types_file, 'w') as f:
             json.dump(machine_types, f, indent=4)
+        file_watcher.reload("machine_types.json")
     
     def save_game_types(self, game_types: Dict) -> None:
         """Save game types to JSON file"""
         with open(self.game_types_file, 'w') as f:
             json.dump(game_types, f, indent=4)
+        file_watcher.reload("game_types.json")
     
     def add_machine_type(self, machine_type: str, game_type: int) -> str:
         """Add a new machine type"""
@@ -267,65 +275,25 @@ class ImageReconJsonService:
         }
     
     def read_image_recon_json(self) -> Dict:
-        """Read image-recon.json file"""
-        json_file_path = '/opt/compose-conf/prometheus/config/conf.d/node/image-recon.json'
-        
-        try:
-            with open(json_file_path, 'r') as f:
-                data = json.load(f)
-            return {"status": "success", "data": data}
-        except FileNotFoundError:
+        """Read image-recon.json file (as last parsed by the file watcher)"""
+        watched = self._image_recon_json
+        if watched.error:
+            return {"status": "error", "message": f"Error reading file: {watched.error}"}
+        if watched.path is None:
             return {"status": "error", "message": "File not found"}
-        except json.JSONDecodeError as e:
-            return {"status": "error", "message": f"Invalid JSON format: {str(e)}"}
-        except Exception as e:
-            return {"status": "error", "message": f"Error reading file: {str(e)}"}
+        return {"status": "success", "data": watched.value}
     
     def get_image_recon_servers(self) -> List[Dict]:
         """Get list of server IPs from image-recon.json (same as Image Recon Service)"""
-        # Try multiple possible paths for the image-recon.json file
-        json_file_paths = [
-            '/opt/compose-conf/prometheus/config/conf.d/node/image-recon.json',
-            '/opt/compose-conf/prometheus/image-recon.json',
-            '/opt/compose-conf/image-recon.json',
-            os.path.join(settings.TYPE_DIR, 'ir.json')  # Fallback for local dev
-        ]
+        if self.server_manager is not None:
+            # Same shared inventory the service manager uses (mock data included in local dev)
+            return self.server_manager.get_image_recon_servers()
         
-        for json_file_path in json_file_paths:
-            if not os.path.exists(json_file_path):
-                logger.info(f"⏭️  Skipping (not found): {json_file_path}")
-                continue
-        
-            try:
-                with open(json_file_path, 'r') as f:
-                    data = json.load(f)
-            
-                servers = []
-                if isinstance(data, list):
-                    for item in data:
-                        targets = item.get('targets', [])
-                        for target in targets:
-                            ip = target.split(':')[0]
-                            hostname = item.get('labels', {}).get('hostname', 'Unknown Host')
-                            label = hostname.split('-')[0]
-                        
-                            # Filter out SRS servers
-                            if label.upper() != 'SRS':
-                                servers.append({
-                                    "ip": ip,
-                                    "hostname": hostname,
-                                    "label": label
-                                })
-            
-                logger.info(f"✅ Loaded {len(servers)} servers from: {json_file_path}")
-                return servers
-            except Exception as e:
-                logger.error(f"❌ Error reading {json_file_path}: {e}")
-                continue
-        
-        # If no config files found, use mock data for local development
-        logger.warning("⚠️ No config files found in any location - using mock data for development")
-        return self._get_mock_servers()
+        if inventory.path(IMAGE_RECON) is None:
+            # If no config files found, use mock data for local development
+            logger.warning("⚠️ No config files found in any location - using mock data for development")
+            return self._get_mock_servers()
+        return inventory.image_recon.dicts()
     
     def _get_mock_servers(self) -> List[Dict]:
         """Return mock server data for development/testing"""
@@ -349,10 +317,7 @@ class ImageReconJsonService:
             ssh = paramiko.SSHClient()
             ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             
-            if not os.path.exists(ssh_key_path):
-                raise ValueError(f"Private key file does not exist at path: {ssh_key_path}")
-            
-            private_key = paramiko.RSAKey.from_private_key_file(ssh_key_path)
+            private_key = load_private_key(ssh_key_path)
             ssh.connect(server_ip, username=ssh_username, pkey=private_key, timeout=30)
             
             # Execute cat command to read file
@@ -384,10 +349,7 @@ class ImageReconJsonService:
             ssh = paramiko.SSHClient()
             ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             
-            if not os.path.exists(ssh_key_path):
-                raise ValueError(f"Private key file does not exist at path: {ssh_key_path}")
-            
-            private_key = paramiko.RSAKey.from_private_key_file(ssh_key_path)
+            private_key = load_private_key(ssh_key_path)
             ssh.connect(server_ip, username=ssh_username, pkey=private_key, timeout=30)
             
             scp = SCPClient(ssh.get_transport())
@@ -449,3 +411,10 @@ class ImageReconJsonService:
             "results": results,
             "timestamp": datetime.now().isoformat()
         }
+
+
+# Shares the Image Recon Service manager's server list instead of re-reading image-recon.json
+services.register(
+    "image_recon_json",
+    lambda: ImageReconJsonService(server_manager=services.get("image_recon_service"))
+)
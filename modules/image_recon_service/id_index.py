@@ -0,0 +1,107 @@
+from typing import Dict, List, NamedTuple, Set
+
+# Gram lengths indexed: 3-grams for normal queries, 2-grams for the 2-character minimum
+GRAM_SIZES = (2, 3)
+
+# Rank of a match kind (lower is better)
+EXACT, PREFIX, SUBSTRING = 0, 1, 2
+
+
+class ServerRef(NamedTuple):
+    hostname: str
+    ip: str
+    label: str
+
+
+class MachineIdIndex:
+    """In-memory n-gram index over the machine IDs in ir.json.
+
+    Every distinct ID (lowercased) is split into its 2- and 3-grams; a query
+    intersects the posting sets of its own grams, smallest first, and only
+    the surviving candidates are checked with a real substring test. Results
+    are ranked exact > prefix > substring, then by match position and ID length.
+
+    The index is immutable once built, so lookups need no locking.
+    """
+
+    def __init__(self, server_groups: Dict[str, List[Dict]]):
+        self._ids: List[str] = []              # original spelling
+        self._keys: List[str] = []             # lowercased, same order
+        self._servers: List[List[ServerRef]] = []
+        self._grams: Dict[str, Set[int]] = {}
+        positions: Dict[str, int] = {}
+        self.server_count = 0
+
+        for label, servers in server_groups.items():
+            if not isinstance(servers, list):
+                continue
+            for server in servers:
+                self.server_count += 1
+                ref = ServerRef(server.get('hostname', 'Unknown Host'), server.get('ip', 'Unknown IP'), label)
+                for id_obj in server.get('ids', []):
+                    machine_id = str(id_obj.get('id', '')) if isinstance(id_obj, dict) else str(id_obj)
+                    if not machine_id:
+                        continue
+                    key = machine_id.lower()
+                    position = positions.get(key)
+                    if position is None:
+                        position = positions[key] = len(self._keys)
+                        self._ids.append(machine_id)
+                        self._keys.append(key)
+                        self._servers.append([])
+                        for size in GRAM_SIZES:
+                            for start in range(len(key) - size + 1):
+                                self._grams.setdefault(key[start:start + size], set()).add(position)
+                    if ref not in self._servers[position]:
+                        self._servers[position].append(ref)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _candidates(self, query: str) -> Set[int]:
+        """IDs containing every gram of ``query`` (a superset of the real matches)"""
+        size = max(s for s in GRAM_SIZES if s <= len(query))
+        postings = sorted(
+            (self._grams.get(query[i:i + size], set()) for i in range(len(query) - size + 1)), key=len
+        )
+        if not postings or not postings[0]:
+            return set()
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query: str, max_servers: int = 5) -> List[Dict]:
+        """Servers with an ID containing ``query``, best match first (Flask search_machines result shape)"""
+        query = query.lower().strip()
+        if len(query) < min(GRAM_SIZES):
+            return []
+
+        ranked = []
+        for position in self._candidates(query):
+            key = self._keys[position]
+            offset = key.find(query)
+            if offset == -1:
+                continue
+            kind = EXACT if key == query else PREFIX if offset == 0 else SUBSTRING
+            ranked.append(((kind, offset, len(key), key), position))
+        ranked.sort()
+
+        results: Dict[ServerRef, Dict] = {}
+        for (kind, _, _, _), position in ranked:
+            for ref in self._servers[position]:
+                entry = results.get(ref)
+                if entry is None:
+                    if len(results) >= max_servers:
+                        continue
+                    entry = results[ref] = {
+                        "hostname": ref.hostname,
+                        "ip": ref.ip,
+                        "matching_ids": [],
+                        "label": ref.label,
+                        "best_match": ("exact", "prefix", "substring")[kind]
+                    }
+                entry["matching_ids"].append(self._ids[position])
+        return list(results.values())
@@ -0,0 +1,151 @@
+import re
+import shlex
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .logger import logger
+
+# Trailing line printed by journalctl --show-cursor
+CURSOR_PREFIX = "-- cursor: "
+
+# journalctl banner lines that are not log entries
+_BANNER_PATTERN = re.compile(r'^-- (Logs begin at|Journal begins at|No entries) ')
+
+
+class _UnitJournal:
+    """Local copy of one server's unit journal: ring buffer of lines plus the read cursor"""
+
+    def __init__(self, max_lines: int):
+        self.lines: Deque[str] = deque(maxlen=max_lines)
+        self.cursor: Optional[str] = None
+        self.version: Optional[str] = None
+        self.last_read = 0.0
+        self.lock = threading.Lock()
+
+
+class JournalTail:
+    """Incremental journalctl reader that keeps the recent lines of each server locally.
+
+    The first read pulls the last ``initial_lines`` entries; every later read
+    passes ``--after-cursor`` and only transfers entries logged since, so an
+    idle server costs one indexed seek and an empty reply. Log views and
+    version extraction are both served from the buffer. The latest version
+    line seen is remembered even after it scrolls out of the buffer.
+    """
+
+    def __init__(self, version_pattern, buffer_lines: int = 2000, initial_lines: int = 500,
+                 min_interval: float = 1.0):
+        self.version_pattern = version_pattern
+        self.buffer_lines = buffer_lines
+        self.initial_lines = min(initial_lines, buffer_lines)
+        self.min_interval = min_interval
+        self._journals: Dict[Tuple[str, str], _UnitJournal] = {}
+        self._lock = threading.Lock()
+        self._stats = {"reads": 0, "skipped": 0, "full_reads": 0, "lines_received": 0, "cursor_resets": 0}
+
+    def _journal(self, server_ip: str, unit: str) -> _UnitJournal:
+        key = (server_ip, unit)
+        with self._lock:
+            journal = self._journals.get(key)
+            if journal is None:
+                journal = self._journals[key] = _UnitJournal(self.buffer_lines)
+            return journal
+
+    def build_command(self, server_ip: str, unit: str = "osm", lines: int = 0) -> Tuple[str, Optional[str]]:
+        """Return (journalctl command, cursor it reads after) for the next incremental read.
+
+        ``lines`` raises the size of a first read when the caller wants to show more.
+        """
+        cursor = self._journal(server_ip, unit).cursor
+        if cursor:
+            return f"journalctl -u {unit} --no-pager --show-cursor --after-cursor={shlex.quote(cursor)}", cursor
+        count = min(max(lines, self.initial_lines), self.buffer_lines)
+        return f"journalctl -u {unit} --no-pager --show-cursor -n {count}", None
+
+    def ingest(self, server_ip: str, unit: str, output: str, read_after: Optional[str]) -> int:
+        """Append the entries of a read started at ``read_after``, returns how many were added.
+
+        A read whose starting cursor has been overtaken by a concurrent read is
+        dropped: the other read already covered it, and the next one resumes
+        from the newer cursor, so nothing is lost or duplicated.
+        """
+        journal = self._journal(server_ip, unit)
+        new_lines = []
+        cursor = None
+        for line in output.splitlines():
+            if line.startswith(CURSOR_PREFIX):
+                cursor = line[len(CURSOR_PREFIX):].strip()
+            elif line.strip() and not _BANNER_PATTERN.match(line):
+                new_lines.append(line)
+
+        with self._lock:
+            if journal.cursor != read_after:
+                self._stats["skipped"] += 1
+                return 0
+            if read_after is None:
+                journal.lines.clear()
+                self._stats["full_reads"] += 1
+            journal.lines.extend(new_lines)
+            if cursor:
+                journal.cursor = cursor
+            for line in reversed(new_lines):
+                match = self.version_pattern.search(line)
+                if match:
+                    journal.version = match.group(1)
+                    break
+            journal.last_read = time.time()
+            self._stats["reads"] += 1
+            self._stats["lines_received"] += len(new_lines)
+        return len(new_lines)
+
+    def reset_cursor(self, server_ip: str, unit: str = "osm"):
+        """Forget the cursor (e.g. the journal was rotated past it) so the next read starts over"""
+        journal = self._journal(server_ip, unit)
+        with self._lock:
+            if journal.cursor is not None:
+                journal.cursor = None
+                self._stats["cursor_resets"] += 1
+
+    def read(self, server_ip: str, run_command: Callable[[str], Tuple[int, str, str]], unit: str = "osm",
+             lines: int = 0) -> int:
+        """Fetch new entries through ``run_command(cmd) -> (exit_status, stdout, stderr)``.
+
+        Reads within ``min_interval`` of the previous one are coalesced into it.
+        """
+        journal = self._journal(server_ip, unit)
+        with journal.lock:
+            if time.time() - journal.last_read < self.min_interval:
+                return 0
+            command, read_after = self.build_command(server_ip, unit, lines)
+            exit_status, output, error = run_command(command)
+            if exit_status != 0 and read_after:
+                # Cursor no longer valid on the server, start again from the tail
+                logger.warning(f"[{server_ip}] ⚠️ Journal cursor rejected, re-reading the last {self.initial_lines} lines")
+                self.reset_cursor(server_ip, unit)
+                command, read_after = self.build_command(server_ip, unit, lines)
+                exit_status, output, error = run_command(command)
+            if exit_status != 0:
+                raise Exception(f"Error fetching logs: {error.strip() or f'journalctl exited with {exit_status}'}")
+            return self.ingest(server_ip, unit, output, read_after)
+
+    def tail(self, server_ip: str, lines: int, unit: str = "osm") -> List[str]:
+        """Last ``lines`` buffered lines"""
+        journal = self._journal(server_ip, unit)
+        with self._lock:
+            if lines <= 0:
+                return []
+            return list(journal.lines)[-lines:]
+
+    def get_version(self, server_ip: str, unit: str = "osm") -> Optional[str]:
+        """Latest version line seen in the unit's journal, or None"""
+        return self._journal(server_ip, unit).version
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "servers": len(self._journals),
+                "buffered_lines": sum(len(j.lines) for j in self._journals.values()),
+            }
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, List, Set, Tuple
+
+from .logger import logger
+
+# (event, data) pairs produced by LogSubscriber.events()
+StreamEvent = Tuple[str, object]
+
+
+class LogSubscriber:
+    """One browser watching a server's log stream.
+
+    Lines are buffered in a bounded queue; when the client reads slower than
+    the server logs, the oldest lines are dropped and reported as a count
+    instead of letting memory grow. Delivery is capped at ``max_rate`` lines
+    per second (token bucket, one second of burst).
+    """
+
+    def __init__(self, queue_size: int, max_rate: float):
+        self.max_rate = max_rate
+        self._buffer: Deque[str] = deque(maxlen=queue_size)
+        self._statuses: List[str] = []
+        self._event = asyncio.Event()
+        self.dropped = 0
+        self.delivered = 0
+
+    def push(self, line: str):
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(line)
+        self._event.set()
+
+    def push_status(self, message: str):
+        self._statuses.append(message)
+        self._event.set()
+
+    async def events(self, heartbeat: float) -> AsyncIterator[StreamEvent]:
+        """Yield ("lines", {"lines"}), ("dropped", {"count"}), ("status", {"message"}) and ("heartbeat", None)"""
+        tokens = self.max_rate
+        last_refill = time.monotonic()
+        while True:
+            if not self._buffer and not self._statuses:
+                self._event.clear()
+                try:
+                    await asyncio.wait_for(self._event.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield "heartbeat", None
+                continue
+
+            while self._statuses:
+                yield "status", {"message": self._statuses.pop(0)}
+
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                yield "dropped", {"count": dropped}
+
+            now = time.monotonic()
+            tokens = min(self.max_rate, tokens + (now - last_refill) * self.max_rate)
+            last_refill = now
+            if tokens < 1:
+                await asyncio.sleep((1 - tokens) / self.max_rate)
+                continue
+
+            count = min(int(tokens), len(self._buffer))
+            if count:
+                batch = [self._buffer.popleft() for _ in range(count)]
+                tokens -= count
+                self.delivered += count
+                yield "lines", {"lines": batch}
+
+
+class LogStreamHub:
+    """Fans one live log channel per server out to every subscriber watching it.
+
+    The first subscriber for a server starts ``source(server_ip)`` (an async
+    line iterator, e.g. ``journalctl -f`` over SSH); the last one to leave
+    cancels it, which closes the remote channel. A channel that drops while
+    subscribers remain is reopened after ``retry_delay`` seconds.
+    """
+
+    def __init__(self, source: Callable[[str], AsyncIterator[str]], queue_size: int = 1000,
+                 max_rate: float = 50, heartbeat: float = 15, retry_delay: float = 5):
+        self.source = source
+        self.queue_size = queue_size
+        self.max_rate = max_rate
+        self.heartbeat = heartbeat
+        self.retry_delay = retry_delay
+        self._subscribers: Dict[str, Set[LogSubscriber]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._stats = {"channels_opened": 0, "lines_received": 0}
+
+    def subscribe(self, server_ip: str) -> LogSubscriber:
+        """Register a subscriber, opening the server's channel if it's the first one"""
+        subscriber = LogSubscriber(self.queue_size, self.max_rate)
+        self._subscribers.setdefault(server_ip, set()).add(subscriber)
+        if server_ip not in self._tasks:
+            self._stats["channels_opened"] += 1
+            self._tasks[server_ip] = asyncio.create_task(self._pump(server_ip))
+            logger.info(f"[{server_ip}] 📡 Opened live log channel")
+        return subscriber
+
+    def unsubscribe(self, server_ip: str, subscriber: LogSubscriber):
+        """Remove a subscriber; closes the channel when nobody is watching any more"""
+        subscribers = self._subscribers.get(server_ip)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[server_ip]
+            task = self._tasks.pop(server_ip, None)
+            if task:
+                task.cancel()
+                logger.info(f"[{server_ip}] 📴 Closed live log channel (no viewers left)")
+
+    async def _pump(self, server_ip: str):
+        while self._subscribers.get(server_ip):
+            try:
+                async for line in self.source(server_ip):
+                    self._stats["lines_received"] += 1
+                    for subscriber in list(self._subscribers.get(server_ip, ())):
+                        subscriber.push(line)
+                message = "Log stream ended"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                message = f"Log stream error: {e}"
+            logger.warning(f"[{server_ip}] ⚠️ {message}, reconnecting in {self.retry_delay}s")
+            for subscriber in list(self._subscribers.get(server_ip, ())):
+                subscriber.push_status(f"{message}, reconnecting in {self.retry_delay:g}s")
+            await asyncio.sleep(self.retry_delay)
+
+    async def close_all(self):
+        """Cancel every open channel (application shutdown)"""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        self._subscribers.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict:
+        return {
+            **self._stats,
+            "channels": len(self._tasks),
+            "subscribers": {ip: len(subs) for ip, subs in self._subscribers.items()},
+        }
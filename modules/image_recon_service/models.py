@@ -11,6 +11,10 @@ class RestartRequest(BaseModel):
     service_name: Optional[str] = "image-recognition"
     restart_type: Optional[str] = "service"
     initiated_by: Optional[str] = "Unknown"  # Track who initiated the restart
+    # Rolling restart policy (settings defaults when omitted)
+    wave_size: Optional[int] = None
+    max_down_percent: Optional[float] = None
+    failure_threshold: Optional[float] = None
 
 class RestartResponse(BaseModel):
     status: str
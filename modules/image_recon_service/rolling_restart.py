@@ -0,0 +1,200 @@
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .logger import logger
+
+# restart_one(server) -> result dict with "status" in success / warning / error
+RestartFn = Callable[[Dict], Dict]
+# check_health(server_ip) -> (healthy, detail, version)
+HealthFn = Callable[[str], Tuple[bool, str, Optional[str]]]
+
+
+class RollingRestart:
+    """Restarts (or updates) a set of servers in waves, gating each wave on health.
+
+    - With ``canary_size`` set, the first wave is only that many servers and
+      any failure among them aborts the run before the fleet is touched.
+    - A wave is at most ``wave_size`` servers, and never more than
+      ``max_down_percent`` of the fleet, so only that many are down at once.
+    - After a wave's restart commands return, each restarted server is polled
+      with ``check_health`` until it is healthy or ``health_timeout`` runs out.
+      The next wave only starts once the whole wave is settled.
+    - Once the failure rate so far exceeds ``failure_threshold``, the run
+      aborts and the remaining servers are skipped.
+
+    ``progress()`` can be read from other threads while ``run()`` is going,
+    and ``on_result`` (if set) is called with each settled server's result.
+    """
+
+    def __init__(self, servers: List[Dict], service_name: str, initiated_by: str,
+                 restart_one: RestartFn, check_health: HealthFn, fleet_size: int = 0,
+                 wave_size: int = 5, max_down_percent: float = 20, failure_threshold: float = 0.3,
+                 health_timeout: float = 120, health_interval: float = 5, canary_size: int = 0,
+                 action: str = "restarted"):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.servers = list(servers)
+        self.service_name = service_name
+        self.initiated_by = initiated_by
+        self.restart_one = restart_one
+        self.check_health = check_health
+        self.failure_threshold = failure_threshold
+        self.health_timeout = health_timeout
+        self.health_interval = health_interval
+        self.action = action
+        self.on_result: Optional[Callable[[Dict], None]] = None
+
+        fleet_size = max(fleet_size, len(self.servers))
+        max_down = max(1, math.floor(fleet_size * max_down_percent / 100))
+        self.wave_size = max(1, min(wave_size, max_down))
+        self.canary_size = min(max(0, canary_size), self.wave_size, len(self.servers))
+        rest = self.servers[self.canary_size:]
+        self.waves = [self.servers[:self.canary_size]] if self.canary_size else []
+        self.waves += [rest[i:i + self.wave_size] for i in range(0, len(rest), self.wave_size)]
+
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._results: List[Dict] = []
+        self._state = "pending"
+        self._current_wave = 0
+        self._abort_reason: Optional[str] = None
+        self._started_at: Optional[str] = None
+        self._finished_at: Optional[str] = None
+
+    def cancel(self):
+        """Stop before the next wave (the running wave is allowed to settle)"""
+        self._cancel.set()
+
+    def run(self) -> Dict:
+        with self._lock:
+            self._state = "running"
+            self._started_at = datetime.now().isoformat()
+        logger.info(f"🌊 Rolling restart {self.job_id}: {len(self.servers)} servers in "
+                    f"{len(self.waves)} waves of up to {self.wave_size}"
+                    f"{f', canary of {self.canary_size}' if self.canary_size else ''}")
+
+        try:
+            for index, wave in enumerate(self.waves, start=1):
+                if self._cancel.is_set():
+                    self._stop(index, "Cancelled", state="cancelled")
+                    break
+                with self._lock:
+                    self._current_wave = index
+                logger.info(f"🌊 Wave {index}/{len(self.waves)}: {[s.get('ip') for s in wave]}")
+
+                with ThreadPoolExecutor(max_workers=len(wave), thread_name_prefix=f"restart-{self.job_id}") as executor:
+                    wave_results = list(executor.map(self._restart_and_gate, wave))
+                for result in wave_results:
+                    result["wave"] = index
+                    if self.on_result:
+                        self.on_result(result)
+                with self._lock:
+                    self._results.extend(wave_results)
+                    processed = len(self._results)
+                    failed = sum(1 for r in self._results if r["status"] == "error")
+
+                failure_rate = failed / processed
+                remaining = index < len(self.waves)
+                if remaining and index == 1 and self.canary_size and failed:
+                    self._stop(index + 1, f"Canary failed on {failed} of {self.canary_size} server(s)")
+                    break
+                if remaining and failure_rate > self.failure_threshold:
+                    self._stop(index + 1, f"Failure rate {failure_rate:.0%} exceeded "
+                                          f"{self.failure_threshold:.0%} after wave {index}")
+                    break
+            else:
+                with self._lock:
+                    self._state = "completed"
+        except Exception as e:
+            logger.error(f"❌ Rolling restart {self.job_id} failed: {e}")
+            with self._lock:
+                self._state = "failed"
+                self._abort_reason = str(e)
+        finally:
+            with self._lock:
+                self._finished_at = datetime.now().isoformat()
+
+        return self.progress()
+
+    def _stop(self, next_wave: int, reason: str, state: str = "aborted"):
+        """Abort: mark every server from ``next_wave`` on as skipped"""
+        logger.error(f"🛑 Rolling restart {self.job_id} {state}: {reason}")
+        skipped = [
+            {
+                "hostname": server.get('hostname', server.get('ip')),
+                "ip": server.get('ip'),
+                "status": "skipped",
+                "message": f"Not {self.action}: {reason}",
+                "wave": wave_index
+            }
+            for wave_index, wave in enumerate(self.waves[next_wave - 1:], start=next_wave)
+            for server in wave
+        ]
+        with self._lock:
+            self._results.extend(skipped)
+            self._state = state
+            self._abort_reason = reason
+
+    def _restart_and_gate(self, server: Dict) -> Dict:
+        """Restart one server, then wait for it to pass the health gate"""
+        result = self.restart_one(server)
+        if result.get("status") == "error":
+            return result
+
+        server_ip = server.get('ip')
+        deadline = time.monotonic() + self.health_timeout
+        detail = "no health check ran"
+        while True:
+            try:
+                healthy, detail, version = self.check_health(server_ip)
+            except Exception as e:
+                healthy, detail, version = False, str(e), None
+            if healthy:
+                result.update({
+                    "status": "success",
+                    "healthy": True,
+                    "version": version,
+                    "message": f"Service {self.action} and passed the health gate ({detail})."
+                })
+                return result
+            if time.monotonic() + self.health_interval > deadline:
+                break
+            time.sleep(self.health_interval)
+
+        logger.error(f"🚦 {server_ip} failed the health gate: {detail}")
+        result.update({
+            "status": "error",
+            "healthy": False,
+            "message": f"Health gate failed after {self.health_timeout:g}s: {detail}"
+        })
+        return result
+
+    def progress(self) -> Dict:
+        with self._lock:
+            results = [dict(r) for r in self._results]
+            state = self._state
+            current_wave = self._current_wave
+            abort_reason = self._abort_reason
+            started_at, finished_at = self._started_at, self._finished_at
+        return {
+            "job_id": self.job_id,
+            "state": state,
+            "service_name": self.service_name,
+            "initiated_by": self.initiated_by,
+            "total": len(self.servers),
+            "wave_size": self.wave_size,
+            "canary_size": self.canary_size,
+            "waves_total": len(self.waves),
+            "current_wave": current_wave,
+            "success": sum(1 for r in results if r["status"] == "success"),
+            "failed": sum(1 for r in results if r["status"] == "error"),
+            "skipped": sum(1 for r in results if r["status"] == "skipped"),
+            "abort_reason": abort_reason,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "results": results
+        }
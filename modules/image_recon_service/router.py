@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Request, File, UploadFile, Form, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import APIRouter, Request, File, UploadFile, Form, HTTPException, Depends
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Optional
+import asyncio
 import json
 
 from .models import RestartRequest, ServerStatusRequest
 from .service import ImageReconServiceManager
+from modules.common.registry import services
+from modules.common.async_ssh import use_async_ssh
+from modules.common.executor import run_blocking, ExecutorBusyError
+from modules.common.concurrency import limiters
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
-service_manager = ImageReconServiceManager()
+# One shared instance per process, resolved from the service registry (app.state.services)
+get_service_manager = services.provider("image_recon_service")
+
+# Blocking service calls run on this module's executor lane
+EXECUTOR_LANE = "image_recon_service"
 
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request):
@@ -33,22 +42,30 @@ async def index(request: Request):
         """)
 
 @router.get("/get-servers")
-async def get_servers():
-    """Get list of servers for service management"""
+async def get_servers(label: Optional[str] = None, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
+    """Get list of servers for service management (optionally only one label group)"""
     try:
-        servers = service_manager.get_image_recon_servers()
+        if label:
+            servers = service_manager.get_servers_by_label(label)
+        else:
+            servers = service_manager.get_image_recon_servers()
         return JSONResponse(content={"status": "success", "servers": servers})
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.get("/get-all-server-versions")
-async def get_all_server_versions():
+async def get_all_server_versions(service_manager: ImageReconServiceManager = Depends(get_service_manager)):
     """Get current versions and status for all servers - PARALLEL for speed"""
     from concurrent.futures import ThreadPoolExecutor, as_completed
     
     try:
         servers = service_manager.get_image_recon_servers()
         version_results = []
+        # Snapshots run at the adaptive "image_recon_ssh" limit; errors and timeouts make it back off
+        limiter = limiters.get("image_recon_ssh")
+        
+        def snapshot_failed(result):
+            return result.get('snapshot_status') == 'error' or result['version'] in ('Error', 'Timeout')
         
         def fetch_server_info(server):
             """Fetch version and status for a single server"""
@@ -56,18 +73,17 @@ async def get_all_server_versions():
             hostname = server['hostname']
             
             try:
-                # Get version (from cache if available)
-                version = service_manager._get_server_version(ip)
-                
-                # Get logs and analyze status
-                logs = service_manager._get_logs_from_server(ip, lines=100)
-                status_analysis = service_manager._analyze_server_status(logs, ip)
+                # Version, logs and service state in one remote exec, 10 second budget
+                snapshot = service_manager.get_server_snapshot(ip, lines=100, budget=10)
+                version = 'Timeout' if snapshot.get('timed_out') else snapshot['version']
+                status_analysis = service_manager._analyze_snapshot(snapshot)
                 
                 return {
                     'ip': ip,
                     'hostname': hostname,
                     'version': version,
-                    'success': version != "Unknown",
+                    'success': snapshot['status'] == 'success' and version != "Unknown",
+                    'snapshot_status': snapshot['status'],
                     'status_color': status_analysis['status_color'],
                     'status_text': status_analysis['status_text']
                 }
@@ -82,68 +98,155 @@ async def get_all_server_versions():
                     'status_text': 'Error'
                 }
         
-        # Fetch all servers in parallel (10 at a time for speed)
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {executor.submit(fetch_server_info, server): server for server in servers}
-            
-            for future in as_completed(futures):
+        if use_async_ssh():
+            # One coroutine per server on the asyncssh runner, 10 second budget each
+            async def fetch_server_info_async(server):
                 try:
-                    result = future.result(timeout=10)  # 10 second timeout per server
-                    version_results.append(result)
-                except Exception as e:
-                    server = futures[future]
-                    version_results.append({
+                    snapshot = await asyncio.wait_for(
+                        service_manager.get_server_snapshot_async(server['ip'], lines=100), 10
+                    )
+                except asyncio.TimeoutError:
+                    return {
                         'ip': server['ip'],
                         'hostname': server['hostname'],
                         'version': 'Timeout',
                         'success': False,
                         'status_color': 'black',
                         'status_text': 'Timeout'
-                    })
+                    }
+                status_analysis = service_manager._analyze_snapshot(snapshot)
+                return {
+                    'ip': server['ip'],
+                    'hostname': server['hostname'],
+                    'version': snapshot['version'],
+                    'success': snapshot['status'] == 'success' and snapshot['version'] != "Unknown",
+                    'snapshot_status': snapshot['status'],
+                    'status_color': status_analysis['status_color'],
+                    'status_text': status_analysis['status_text']
+                }
+            
+            fetch_async = limiter.wrap_async(fetch_server_info_async, is_error=snapshot_failed)
+            version_results = await asyncio.gather(*(fetch_async(server) for server in servers))
+            return JSONResponse(content={
+                "status": "success",
+                "results": list(version_results)
+            })
+        
+        def fetch_all_servers():
+            # Fetch all servers in parallel (as many at a time as the limiter allows)
+            fetch = limiter.wrap(fetch_server_info, is_error=snapshot_failed)
+            with ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+                futures = [executor.submit(fetch, server) for server in servers]
+                
+                # fetch_server_info handles its own errors and time budget
+                for future in as_completed(futures):
+                    version_results.append(future.result())
+            return version_results
+        
+        version_results = await run_blocking(EXECUTOR_LANE, fetch_all_servers)
         
         return JSONResponse(content={
             "status": "success",
             "results": version_results
         })
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/restart-service")
-async def restart_service(restart_req: RestartRequest, request: Request):
-    """Restart service on selected servers"""
+async def restart_service(restart_req: RestartRequest, request: Request, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
+    """Start a rolling restart of the service on selected servers (background job)"""
     try:
         # Get client IP for logging (use initiated_by from request, or fallback to client IP)
         client_ip = request.client.host if request.client else "Unknown"
         initiated_by = restart_req.initiated_by or client_ip
         
-        result = service_manager.restart_service(
-            [server.dict() for server in restart_req.servers],
+        servers = [server.dict() for server in restart_req.servers]
+        result = await run_blocking(
+            EXECUTOR_LANE,
+            service_manager.start_restart_job,
+            servers,
             restart_req.service_name,
-            initiated_by
+            initiated_by,
+            wave_size=restart_req.wave_size,
+            max_down_percent=restart_req.max_down_percent,
+            failure_threshold=restart_req.failure_threshold
         )
         return JSONResponse(content=result)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
+@router.get("/restart-status/{job_id}")
+async def restart_status(job_id: str, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
+    """Progress of a rolling restart: waves, per-server results, abort reason"""
+    progress = service_manager.get_restart_job(job_id)
+    if progress is None:
+        return JSONResponse(content={"status": "error", "message": f"Unknown restart job: {job_id}"}, status_code=404)
+    return JSONResponse(content={"status": "success", **progress})
+
+@router.post("/restart-cancel/{job_id}")
+async def restart_cancel(job_id: str, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
+    """Stop a rolling restart before its next wave"""
+    progress = service_manager.cancel_restart_job(job_id)
+    if progress is None:
+        return JSONResponse(content={"status": "error", "message": f"Unknown restart job: {job_id}"}, status_code=404)
+    return JSONResponse(content={"status": "success", **progress})
+
 @router.post("/check-status")
-async def check_status(request: ServerStatusRequest):
+async def check_status(request: ServerStatusRequest, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
     """Check service status on selected servers"""
     try:
-        result = service_manager.check_service_status(
-            [server.dict() for server in request.servers]
-        )
+        servers = [server.dict() for server in request.servers]
+        if use_async_ssh():
+            result = await service_manager.check_service_status_async(servers)
+        else:
+            result = await run_blocking(EXECUTOR_LANE, service_manager.check_service_status, servers)
         return JSONResponse(content=result)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/restart-machine")
-async def restart_machine(request: RestartRequest):
+async def restart_machine(request: RestartRequest, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
     """Restart entire machine on selected servers"""
     try:
-        result = service_manager.restart_machine(
+        result = await run_blocking(
+            EXECUTOR_LANE,
+            service_manager.restart_machine,
             [server.dict() for server in request.servers]
         )
         return JSONResponse(content=result)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
+    except Exception as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
+
+@router.post("/start-update-process")
+async def start_update_process(request: Request, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
+    """Start an update rollout (canary, then waves) on selected servers as a background job; poll /api/jobs/{job_id}"""
+    try:
+        data = await request.json()
+        servers = data.get('servers', [])
+        client_ip = request.client.host if request.client else "Unknown"
+        result = await run_blocking(
+            EXECUTOR_LANE,
+            service_manager.start_update_job,
+            servers,
+            data.get('update_file'),
+            data.get('initiated_by') or client_ip,
+            data.get('target_version'),
+            canary_size=data.get('canary_size'),
+            wave_size=data.get('wave_size'),
+            failure_threshold=data.get('failure_threshold')
+        )
+        status_code = 409 if result.get("job_id") and result["status"] == "error" else 200
+        return JSONResponse(content=result, status_code=status_code)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
@@ -152,7 +255,7 @@ async def restart_machine(request: RestartRequest):
 # =====================
 
 @router.post("/search-machines")
-async def search_machines(request: Request):
+async def search_machines(request: Request, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
     """Search for machines by hostname, IP, or label"""
     try:
         data = await request.json()
@@ -161,13 +264,15 @@ async def search_machines(request: Request):
         if not query or len(query) < 2:
             return JSONResponse(content={"status": "error", "message": "Query must be at least 2 characters"})
         
-        results = service_manager.search_machines(query)
+        results = await run_blocking(EXECUTOR_LANE, service_manager.search_machines, query)
         return JSONResponse(content={"status": "success", "results": results})
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/get-logs")
-async def get_logs(request: Request):
+async def get_logs(request: Request, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
     """Get logs from a specific server - matches Flask version"""
     try:
         data = await request.json()
@@ -177,29 +282,73 @@ async def get_logs(request: Request):
         if not server_ip:
             return JSONResponse(content={"status": "error", "message": "Server IP is required"}, status_code=400)
         
-        logs = service_manager._get_logs_from_server(server_ip, lines)
+        logs = await run_blocking(EXECUTOR_LANE, service_manager._get_logs_from_server, server_ip, lines)
         
         if "Error:" in logs:
             return JSONResponse(content={"status": "error", "message": logs}, status_code=500)
         
         return JSONResponse(content={"status": "success", "logs": logs})
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/stream-logs")
+async def stream_logs(server_ip: str, lines: int = 50,
+                      service_manager: ImageReconServiceManager = Depends(get_service_manager)):
+    """Live log tail over Server-Sent Events - one shared journalctl -f channel per server"""
+    hub = service_manager.log_stream
+    
+    async def events():
+        subscriber = hub.subscribe(server_ip)
+        try:
+            # Start with the recent lines, then follow
+            try:
+                logs = await run_blocking(EXECUTOR_LANE, service_manager._get_logs_from_server, server_ip, lines)
+            except ExecutorBusyError as e:
+                logs = f"Error: {e}"
+            yield _sse("backlog", {"logs": logs})
+            
+            async for event, data in subscriber.events(hub.heartbeat):
+                if event == "heartbeat":
+                    yield ": keepalive\n\n"
+                else:
+                    yield _sse(event, data)
+        finally:
+            hub.unsubscribe(server_ip, subscriber)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/refresh-servers")
-async def refresh_servers():
-    """Refresh server list by fetching IDs from each server - matches Flask version"""
+async def refresh_servers(service_manager: ImageReconServiceManager = Depends(get_service_manager)):
+    """Start a server list refresh (fetch IDs from each server) as a background job; poll /api/jobs/{job_id}"""
     try:
-        result = service_manager.refresh_servers()
+        result = service_manager.start_refresh_job(async_mode=use_async_ssh())
         return JSONResponse(content=result)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
+@router.get("/refresh-status")
+async def refresh_status(service_manager: ImageReconServiceManager = Depends(get_service_manager)):
+    """Progress of the running (or last) server refresh, with partial results"""
+    try:
+        return JSONResponse(content={"status": "success", "progress": service_manager.get_refresh_progress()})
+    except Exception as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
+
 @router.get("/get-email-settings")
-async def get_email_settings():
+async def get_email_settings(service_manager: ImageReconServiceManager = Depends(get_service_manager)):
     """Get current email configuration - matches Flask version"""
     try:
-        config = service_manager.load_email_config()
+        config = await run_blocking(EXECUTOR_LANE, service_manager.load_email_config)
         
         # Calculate next run time if schedule is enabled
         if config.get("schedule", {}).get("enabled", False):
@@ -224,11 +373,13 @@ async def get_email_settings():
             "status": "success",
             "config": config
         })
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/add-email-recipient")
-async def add_email_recipient(request: Request):
+async def add_email_recipient(request: Request, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
     """Add new email recipient - matches Flask version"""
     try:
         data = await request.json()
@@ -249,7 +400,7 @@ async def add_email_recipient(request: Request):
                 "message": "Please enter a valid email address"
             }, status_code=400)
         
-        success, message = service_manager.add_email_recipient(email)
+        success, message = await run_blocking(EXECUTOR_LANE, service_manager.add_email_recipient, email)
         
         if success:
             return JSONResponse(content={
@@ -262,11 +413,13 @@ async def add_email_recipient(request: Request):
                 "message": message
             }, status_code=400)
             
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/remove-email-recipient")
-async def remove_email_recipient(request: Request):
+async def remove_email_recipient(request: Request, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
     """Remove email recipient - matches Flask version"""
     try:
         data = await request.json()
@@ -278,7 +431,7 @@ async def remove_email_recipient(request: Request):
                 "message": "Email address is required"
             }, status_code=400)
         
-        success, message = service_manager.remove_email_recipient(email)
+        success, message = await run_blocking(EXECUTOR_LANE, service_manager.remove_email_recipient, email)
         
         if success:
             return JSONResponse(content={
@@ -291,17 +444,19 @@ async def remove_email_recipient(request: Request):
                 "message": message
             }, status_code=400)
             
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/toggle-schedule")
-async def toggle_schedule(request: Request):
+async def toggle_schedule(request: Request, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
     """Enable or disable scheduled version check - matches Flask version"""
     try:
         data = await request.json()
         enabled = data.get('enabled', False)
         
-        success, message = service_manager.toggle_schedule(enabled)
+        success, message = await run_blocking(EXECUTOR_LANE, service_manager.toggle_schedule, enabled)
         
         if success:
             return JSONResponse(content={
@@ -314,25 +469,32 @@ async def toggle_schedule(request: Request):
                 "message": message
             }, status_code=400)
             
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/test-scheduled-version-check")
-async def test_scheduled_version_check(request: Request):
+async def test_scheduled_version_check(request: Request, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
     """Test the scheduled version check by running it immediately - matches Flask version"""
     try:
-        result = service_manager.test_scheduled_version_check()
+        if use_async_ssh():
+            result = await service_manager.test_scheduled_version_check_async()
+        else:
+            result = await run_blocking(EXECUTOR_LANE, service_manager.test_scheduled_version_check)
         
         if result.get('status') == 'success':
             return JSONResponse(content=result)
         else:
             return JSONResponse(content=result, status_code=500)
             
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/send-batch-email")
-async def send_batch_email(request: Request):
+async def send_batch_email(request: Request, service_manager: ImageReconServiceManager = Depends(get_service_manager)):
     """Send batch email notification"""
     try:
         data = await request.json()
@@ -342,10 +504,12 @@ async def send_batch_email(request: Request):
         results = data.get('results', [])
         
         if not recipients:
-            config = service_manager.load_email_config()
+            config = await run_blocking(EXECUTOR_LANE, service_manager.load_email_config)
             recipients = config.get('recipients', [])
         
-        result = service_manager.send_batch_email(recipients, subject, message, results)
+        result = await run_blocking(EXECUTOR_LANE, service_manager.send_batch_email, recipients, subject, message, results)
         return JSONResponse(content=result)
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
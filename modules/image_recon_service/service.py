@@ -1,22 +1,52 @@
+import asyncio
 import json
 import os
 import tempfile
 import time
 import re
 import logging
+import threading
 import smtplib
-from typing import Dict, List, Tuple, Optional
+import socket
+import uuid
+from concurrent import futures
+from typing import AsyncIterator, Callable, Dict, List, Tuple, Optional
 from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from config import settings
+from modules.common.ssh_pool import ssh_pool, SSH_AVAILABLE
+from modules.common.async_ssh import async_ssh_runner
+from modules.common.swr_cache import StaleWhileRevalidateCache, FRESH, STALE
+from modules.common.registry import services
+from modules.common.file_watch import file_watcher
+from modules.common.inventory import inventory, IMAGE_RECON
+from .journal import JournalTail
+from .log_stream import LogStreamHub
+from .status_analyzer import StatusAnalyzer
+from .rolling_restart import RollingRestart
+from .id_index import MachineIdIndex
+from modules.common.jobs import jobs, Job, FAILED, INTERRUPTED
 from .logger import logger
 
-try:
-    import paramiko
-    SSH_AVAILABLE = True
-except ImportError:
-    SSH_AVAILABLE = False
+# Version string as logged by the osm service, e.g. version[3.1.2335-1]
+VERSION_PATTERN = re.compile(r'version\[([0-9]+\.[0-9]+\.[0-9]+-[0-9]+)\]')
+
+# journalctl one-liner used to find the running version (exactly like Flask)
+VERSION_COMMAND = 'journalctl --since "10 minutes ago" | grep -o "version\\[[0-9]\\+\\.[0-9]\\+\\.[0-9]\\+-[0-9]\\+]" | tail -1'
+
+# Machine IDs configured on a server, read from list.json
+SERVER_IDS_COMMAND = "cat /usr/bin/OSMWatcher/list.json | grep -oP '\"id\": \"[^\"]+'"
+
+# On-server update script run by the update process (same as Flask restart_ir.py)
+UPDATE_SCRIPT = "/bak/bin/update_image_recon.sh"
+# Bytes of the update script's stderr kept for the error message
+UPDATE_STDERR_TAIL = 2000
+
+# Background job kinds (see modules/common/jobs.py)
+RESTART_JOB_KIND = "image_recon.restart"
+REFRESH_JOB_KIND = "image_recon.refresh"
+UPDATE_JOB_KIND = "image_recon.update"
 
 try:
     import requests
@@ -85,91 +115,70 @@ class ImageReconServiceManager:
         self.ssh_key_filename = "image-recon-prod.pem"
         self.ssh_key_path = os.path.join('static', 'keys', self.ssh_key_filename)
         
-        # Version cache: {server_ip: {'version': str, 'timestamp': datetime}}
-        self._version_cache = {}
-        self._version_cache_duration = 600  # 10 minutes in seconds
+        # Version cache: fresh for VERSION_CACHE_TTL, then served stale while it revalidates
+        self._version_cache = StaleWhileRevalidateCache(
+            ttl=settings.VERSION_CACHE_TTL,
+            max_stale=settings.VERSION_CACHE_MAX_STALE,
+            name="version-cache"
+        )
+        
+        # Recent journal lines per server, fetched incrementally with journalctl cursors
+        self._journal = JournalTail(
+            VERSION_PATTERN,
+            buffer_lines=settings.JOURNAL_BUFFER_LINES,
+            initial_lines=settings.JOURNAL_INITIAL_LINES,
+            min_interval=settings.JOURNAL_MIN_READ_INTERVAL
+        )
+        
+        # Offline / error indicators matched in server logs (type/log_indicators.json)
+        self.status_analyzer = StatusAnalyzer.load(os.path.join(settings.TYPE_DIR, 'log_indicators.json'))
+        
+        # Live log tails: one journalctl -f channel per watched server, shared by all viewers
+        self.log_stream = LogStreamHub(
+            self.follow_logs,
+            queue_size=settings.LOG_STREAM_QUEUE_SIZE,
+            max_rate=settings.LOG_STREAM_MAX_LINES_PER_SEC,
+            heartbeat=settings.LOG_STREAM_HEARTBEAT
+        )
         self.email_config_path = os.path.join(settings.TYPE_DIR, 'email.json')
-        self.server_cache = {}
-        self.last_cache_update = 0
-        self.cache_ttl = 300  # 5 minutes cache
+        # Machine ID search index over ir.json, rebuilt by the file watcher when the file changes
+        self._ir_json = file_watcher.watch(
+            "ir.json", [os.path.join(settings.TYPE_DIR, 'ir.json')], self._build_id_index
+        )
+        
+        # Servers come from the shared fleet inventory (image-recon.json); mock data while there is no file
+        self._mock_servers = self._get_mock_servers()
         
-        # Server list cache (to avoid re-reading image-recon.json every time)
-        self._server_list_cache = None
-        self._server_list_cache_time = 0
-        self._server_list_cache_ttl = 60  # 1 minute cache for server list
+        # Progress of the running (or last) server refresh, readable while it runs
+        self._refresh_lock = threading.Lock()
+        self._refresh_progress = {"running": False}
         
         # Ensure email config exists
         self._ensure_email_config()
     
+    def _ssh_connection(self, server_ip: str, timeout: int = 30):
+        """Borrow a pooled SSH connection to an Image Recon server"""
+        return ssh_pool.connection(server_ip, self.ssh_username, key_path=self.ssh_key_path, timeout=timeout)
+    
+    def _run_ssh_command(self, server_ip: str, command: str, timeout: int = 30,
+                         command_timeout: Optional[int] = None, deadline: Optional[float] = None) -> Tuple[int, str, str]:
+        """Run a command over a pooled SSH connection, returns (exit_status, stdout, stderr)"""
+        return ssh_pool.exec_command(
+            server_ip, self.ssh_username, command,
+            key_path=self.ssh_key_path, timeout=timeout, command_timeout=command_timeout, deadline=deadline
+        )
+    
     def get_image_recon_servers(self) -> List[Dict]:
-        """Get list of server IPs from image-recon.json with caching"""
-        import time
-        
-        # Check cache first
-        current_time = time.time()
-        if (self._server_list_cache is not None and 
-            current_time - self._server_list_cache_time < self._server_list_cache_ttl):
-            print(f"✅ Using cached server list ({len(self._server_list_cache)} servers)")
-            return self._server_list_cache
-        
-        print("🔄 Loading server list from file...")
-        
-        # Try multiple possible paths for the image-recon.json file
-        json_file_paths = [
-            '/opt/compose-conf/prometheus/config/conf.d/node/image-recon.json',
-            '/opt/compose-conf/prometheus/image-recon.json',
-            '/opt/compose-conf/image-recon.json',
-            os.path.join(settings.TYPE_DIR, 'ir.json')  # Fallback for local dev
-        ]
-        
-        for json_file_path in json_file_paths:
-            if not os.path.exists(json_file_path):
-                print(f"⏭️  Skipping (not found): {json_file_path}")
-                continue
-            
-            try:
-                with open(json_file_path, 'r') as f:
-                    data = json.load(f)
-                
-                servers = []
-                if isinstance(data, list):
-                    for item in data:
-                        targets = item.get('targets', [])
-                        for target in targets:
-                            ip = target.split(':')[0]
-                            hostname = item.get('labels', {}).get('hostname', 'Unknown Host')
-                            label = hostname.split('-')[0]
-                            
-                            # Filter out SRS servers for restart operations
-                            if label.upper() != 'SRS':
-                                servers.append({
-                                    "ip": ip,
-                                    "hostname": hostname,
-                                    "label": label,
-                                    "status": "unknown"
-                                })
-                
-                print(f"✅ Loaded {len(servers)} servers from: {json_file_path}")
-                
-                # Cache the result
-                self._server_list_cache = servers
-                self._server_list_cache_time = current_time
-                
-                return servers
-            except Exception as e:
-                print(f"❌ Error reading {json_file_path}: {e}")
-                continue
-        
-        # If no config files found, use mock data
-        print("⚠️ No config files found in any location - using mock data for development")
-        mock_servers = self._get_mock_servers()
-        
-        # Cache mock data too
-        self._server_list_cache = mock_servers
-        self._server_list_cache_time = current_time
-        
-        return mock_servers
-
+        """Get list of servers from image-recon.json (shared inventory dicts - do not mutate)"""
+        if inventory.path(IMAGE_RECON) is None:
+            return self._mock_servers
+        return inventory.image_recon.dicts()
+    
+    def get_servers_by_label(self, label: str) -> List[Dict]:
+        """Servers of one label group, e.g. NP (indexed lookup)"""
+        if inventory.path(IMAGE_RECON) is None:
+            return [server for server in self._mock_servers if server['label'] == label]
+        return inventory.image_recon.find_dicts("label", label)
     
     def _get_mock_servers(self) -> List[Dict]:
         """Return mock server data for development/testing"""
@@ -315,171 +324,212 @@ class ImageReconServiceManager:
         try:
             logger.info("🕘 Running test version check...")
             
-            # Get current recipients
-            config = self.load_email_config()
-            recipients = config.get("recipients", [])
-            
-            if not recipients:
-                return {
-                    "status": "error",
-                    "message": "No recipients configured for version check"
-                }
-            
-            logger.info(f"📧 Test version check will send to: {', '.join(recipients)}")
-            
-            # Get all servers
-            servers = self.get_image_recon_servers()
-            if not servers:
-                return {
-                    "status": "error",
-                    "message": "No servers found"
-                }
-            
-            # Check versions on all servers
-            version_results = []
-            target_version_count = 0
-            different_version_count = 0
-            error_count = 0
+            config, servers, error = self._prepare_version_check()
+            if error:
+                return error
             
-            logger.info(f"🔍 Checking versions on {len(servers)} servers")
+            # One concurrent pass over the fleet, bounded by the runtime budget
+            versions = self._collect_versions(servers)
             
-            # First pass: collect all versions to find the most common one (target version)
-            all_versions = []
-            for server in servers:
-                try:
-                    version = self._get_server_version(server.get('ip'))
-                    if version and version != 'N/A' and version != 'Error' and version != 'Offline' and version != 'Unknown':
-                        all_versions.append(version)
-                except Exception:
-                    pass
-            
-            # Determine target version (most common version)
-            from collections import Counter
-            if all_versions:
-                version_counts = Counter(all_versions)
-                target_version = version_counts.most_common(1)[0][0]
-                logger.info(f"🎯 Auto-detected target version: {target_version}")
-            else:
-                target_version = "Auto-Detect"
-            
-            # Second pass: check each server and categorize
-            for server in servers:
+            return self._finish_version_check(config, servers, versions)
+                
+        except Exception as e:
+            logger.error(f"❌ Error testing scheduled version check: {str(e)}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+    
+    def _prepare_version_check(self) -> tuple:
+        """Return (config, servers, error_response) for a version check run"""
+        # Get current recipients
+        config = self.load_email_config()
+        recipients = config.get("recipients", [])
+        
+        if not recipients:
+            return config, [], {
+                "status": "error",
+                "message": "No recipients configured for version check"
+            }
+        
+        logger.info(f"📧 Test version check will send to: {', '.join(recipients)}")
+        
+        # Get all servers
+        servers = self.get_image_recon_servers()
+        if not servers:
+            return config, [], {
+                "status": "error",
+                "message": "No servers found"
+            }
+        
+        logger.info(f"🔍 Checking versions on {len(servers)} servers")
+        return config, servers, None
+    
+    def _collect_versions(self, servers: List[Dict]) -> Dict[str, object]:
+        """Fetch every server's version once, concurrently, within VERSION_CHECK_BUDGET.
+        
+        Returns {ip: version string or the Exception that stopped us getting one}.
+        """
+        budget = settings.VERSION_CHECK_BUDGET
+        versions = {}
+        executor = futures.ThreadPoolExecutor(max_workers=max(1, settings.VERSION_CHECK_PARALLELISM))
+        try:
+            future_map = {
+                executor.submit(self._get_server_version, server.get('ip')): server.get('ip')
+                for server in servers
+            }
+            done, not_done = futures.wait(future_map, timeout=budget)
+            for future in done:
                 try:
-                    # Get version directly using _get_server_version (only takes server_ip)
-                    version = self._get_server_version(server.get('ip'))
-                    
-                    if version and version != 'N/A' and version != 'Error' and version != 'Offline' and version != 'Unknown':
-                        # Check if this version matches the target
-                        if version == target_version:
-                            target_version_count += 1
-                            version_results.append({
-                                'success': True,
-                                'category': 'target',
-                                'hostname': server.get('hostname', 'Unknown'),
-                                'ip': server.get('ip', 'Unknown'),
-                                'version': version,
-                                'status': 'Found'
-                            })
-                            logger.info(f"✅ {server.get('hostname')}: {version}")
-                        else:
-                            # Different version found (NOT an error!)
-                            different_version_count += 1
-                            version_results.append({
-                                'success': True,  # It's successful, just different
-                                'category': 'different',
-                                'hostname': server.get('hostname', 'Unknown'),
-                                'ip': server.get('ip', 'Unknown'),
-                                'version': version,
-                                'expected_version': target_version,
-                                'status': f'Different version: {version} (expected {target_version})'
-                            })
-                            logger.warning(f"⚠️ {server.get('hostname')}: Different version {version} (expected {target_version})")
-                    else:
-                        # Actual error - version not found
-                        error_count += 1
-                        version_results.append({
-                            'success': False,
-                            'category': 'error',
-                            'hostname': server.get('hostname', 'Unknown'),
-                            'ip': server.get('ip', 'Unknown'),
-                            'version': version or 'N/A',
-                            'error': 'Version not found or error',
-                            'status': 'Error'
-                        })
-                        logger.warning(f"❌ {server.get('hostname')}: Version not found")
+                    versions[future_map[future]] = future.result()
                 except Exception as e:
-                    error_count += 1
-                    version_results.append({
-                        'success': False,
-                        'category': 'error',
-                        'hostname': server.get('hostname', 'Unknown'),
-                        'ip': server.get('ip', 'Unknown'),
-                        'version': 'N/A',
-                        'error': str(e),
-                        'status': 'Error'
-                    })
-                    logger.error(f"❌ {server.get('hostname')}: {str(e)}")
-            
-            # Send email report (use the auto-detected target version)
-            email_result = self.send_version_report_email(
-                version_results, 
-                target_version_count, 
-                different_version_count,
-                error_count,
-                target_version  # Use the most common version detected above
+                    versions[future_map[future]] = e
+            for future in not_done:
+                versions[future_map[future]] = TimeoutError(f"No answer within the {budget}s version check budget")
+            if not_done:
+                logger.warning(f"⏰ Version check budget of {budget}s reached, {len(not_done)} servers unanswered")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return versions
+    
+    def _categorize_versions(self, servers: List[Dict], versions: Dict[str, object]) -> tuple:
+        """Pick the most common version as target and categorize each server against it.
+        
+        Returns (version_results, target_count, different_count, error_count, target_version).
+        """
+        from collections import Counter
+        
+        def is_valid(version) -> bool:
+            return isinstance(version, str) and version not in ('', 'N/A', 'Error', 'Offline', 'Unknown')
+        
+        # Determine target version (most common version)
+        all_versions = [versions.get(server.get('ip')) for server in servers]
+        version_counts = Counter(version for version in all_versions if is_valid(version))
+        if version_counts:
+            target_version = version_counts.most_common(1)[0][0]
+            logger.info(f"🎯 Auto-detected target version: {target_version}")
+        else:
+            target_version = "Auto-Detect"
+        
+        version_results = []
+        target_version_count = 0
+        different_version_count = 0
+        error_count = 0
+        
+        for server in servers:
+            version = versions.get(server.get('ip'))
+            
+            if isinstance(version, Exception):
+                error_count += 1
+                version_results.append({
+                    'success': False,
+                    'category': 'error',
+                    'hostname': server.get('hostname', 'Unknown'),
+                    'ip': server.get('ip', 'Unknown'),
+                    'version': 'N/A',
+                    'error': str(version),
+                    'status': 'Error'
+                })
+                logger.error(f"❌ {server.get('hostname')}: {str(version)}")
+            elif not is_valid(version):
+                # Actual error - version not found
+                error_count += 1
+                version_results.append({
+                    'success': False,
+                    'category': 'error',
+                    'hostname': server.get('hostname', 'Unknown'),
+                    'ip': server.get('ip', 'Unknown'),
+                    'version': version or 'N/A',
+                    'error': 'Version not found or error',
+                    'status': 'Error'
+                })
+                logger.warning(f"❌ {server.get('hostname')}: Version not found")
+            elif version == target_version:
+                target_version_count += 1
+                version_results.append({
+                    'success': True,
+                    'category': 'target',
+                    'hostname': server.get('hostname', 'Unknown'),
+                    'ip': server.get('ip', 'Unknown'),
+                    'version': version,
+                    'status': 'Found'
+                })
+                logger.info(f"✅ {server.get('hostname')}: {version}")
+            else:
+                # Different version found (NOT an error!)
+                different_version_count += 1
+                version_results.append({
+                    'success': True,  # It's successful, just different
+                    'category': 'different',
+                    'hostname': server.get('hostname', 'Unknown'),
+                    'ip': server.get('ip', 'Unknown'),
+                    'version': version,
+                    'expected_version': target_version,
+                    'status': f'Different version: {version} (expected {target_version})'
+                })
+                logger.warning(f"⚠️ {server.get('hostname')}: Different version {version} (expected {target_version})")
+        
+        return version_results, target_version_count, different_version_count, error_count, target_version
+    
+    def _finish_version_check(self, config: Dict, servers: List[Dict], versions: Dict[str, object]) -> Dict:
+        """Build the report from collected versions, email it and notify Lark"""
+        recipients = config.get("recipients", [])
+        (version_results, target_version_count, different_version_count,
+         error_count, target_version) = self._categorize_versions(servers, versions)
+        
+        # Send email report (use the auto-detected target version)
+        email_result = self.send_version_report_email(
+            version_results, 
+            target_version_count, 
+            different_version_count,
+            error_count,
+            target_version  # Use the most common version detected above
+        )
+        
+        if email_result.get('status') == 'success':
+            # Update last_run in config
+            config["schedule"]["last_run"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.save_email_config(config)
+            
+            # Send Lark notification
+            success_rate = (target_version_count / len(version_results) * 100) if len(version_results) > 0 else 0
+            lark_message = (
+                f"📧 **Version Check Email Sent**\n\n"
+                f"✅ Recipients: {len(recipients)}\n"
+                f"📊 Servers Checked: {len(version_results)}\n"
+                f"✅ Target Version Found: {target_version_count}\n"
+                f"⚠️ Different Versions: {different_version_count}\n"
+                f"❌ Errors/Not Found: {error_count}\n"
+                f"📈 Success Rate: {success_rate:.1f}%\n\n"
+                f"Email report has been sent to:\n{', '.join(recipients)}"
             )
+            self._send_simple_lark_notification(lark_message)
             
-            if email_result.get('status') == 'success':
-                # Update last_run in config
-                config["schedule"]["last_run"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.save_email_config(config)
-                
-                # Send Lark notification
-                success_rate = (target_version_count / len(version_results) * 100) if len(version_results) > 0 else 0
-                lark_message = (
-                    f"📧 **Version Check Email Sent**\n\n"
-                    f"✅ Recipients: {len(recipients)}\n"
-                    f"📊 Servers Checked: {len(version_results)}\n"
-                    f"✅ Target Version Found: {target_version_count}\n"
-                    f"⚠️ Different Versions: {different_version_count}\n"
-                    f"❌ Errors/Not Found: {error_count}\n"
-                    f"📈 Success Rate: {success_rate:.1f}%\n\n"
-                    f"Email report has been sent to:\n{', '.join(recipients)}"
-                )
-                self._send_simple_lark_notification(lark_message)
-                
-                return {
-                    "status": "success",
-                    "message": f"Test version check completed. Email sent to {len(recipients)} recipients.",
-                    "results": {
-                        "total": len(version_results),
-                        "target_version": target_version_count,
-                        "different_version": different_version_count,
-                        "errors": error_count
-                    }
-                }
-            else:
-                # Send Lark notification for failure
-                lark_message = (
-                    f"❌ **Version Check Email Failed**\n\n"
-                    f"📊 Servers Checked: {len(version_results)}\n"
-                    f"✅ Target Version: {target_version_count}\n"
-                    f"⚠️ Different Versions: {different_version_count}\n"
-                    f"❌ Errors: {error_count}\n\n"
-                    f"Error: {email_result.get('message')}"
-                )
-                self._send_simple_lark_notification(lark_message)
-                
-                return {
-                    "status": "error",
-                    "message": f"Version check completed but email failed: {email_result.get('message')}"
+            return {
+                "status": "success",
+                "message": f"Test version check completed. Email sent to {len(recipients)} recipients.",
+                "results": {
+                    "total": len(version_results),
+                    "target_version": target_version_count,
+                    "different_version": different_version_count,
+                    "errors": error_count
                 }
-                
-        except Exception as e:
-            logger.error(f"❌ Error testing scheduled version check: {str(e)}")
+            }
+        else:
+            # Send Lark notification for failure
+            lark_message = (
+                f"❌ **Version Check Email Failed**\n\n"
+                f"📊 Servers Checked: {len(version_results)}\n"
+                f"✅ Target Version: {target_version_count}\n"
+                f"⚠️ Different Versions: {different_version_count}\n"
+                f"❌ Errors: {error_count}\n\n"
+                f"Error: {email_result.get('message')}"
+            )
+            self._send_simple_lark_notification(lark_message)
+            
             return {
                 "status": "error",
-                "message": str(e)
+                "message": f"Version check completed but email failed: {email_result.get('message')}"
             }
     
     def _send_simple_lark_notification(self, message: str):
@@ -649,78 +699,38 @@ class ImageReconServiceManager:
             return {"status": "error", "message": str(e)}
     
     def search_machines(self, query: str) -> List[Dict]:
-        """Search for machines in ir.json by machine ID - matches Flask version"""
+        """Search for machines in ir.json by machine ID (substring, ranked) - Flask result shape"""
         if not query or len(query.strip()) < 2:
             return []
         
-        # Read server data from ir.json with caching
-        server_groups = self._get_cached_server_data_from_ir_json()
-        
-        if not server_groups:
-            logger.warning("No server data available in ir.json for search")
+        index = self._get_id_index()
+        if index is None or not len(index):
+            logger.warning("No server data available in ir.json for search. Run refresh to create it.")
             return []
         
-        matching_servers = []
-        query_lower = query.lower().strip()
-        max_results = 5  # Limit results for faster response (matches Flask)
-        
-        # Search for the query in machine IDs
-        for label, servers in server_groups.items():
-            if len(matching_servers) >= max_results:
-                break
-        
-        for server in servers:
-                if len(matching_servers) >= max_results:
-                    break
-                
-                hostname = server.get('hostname', 'Unknown Host')
-                ip = server.get('ip', 'Unknown IP')  # Get the IP address
-                ids = server.get('ids', [])
-                
-                # Search for the query in the ids list (case-insensitive)
-                matching_ids = [id_obj['id'] for id_obj in ids if query_lower in id_obj['id'].lower()]
-                
-                if matching_ids:
-                    matching_servers.append({
-                        "hostname": hostname,
-                        "ip": ip,  # Include IP address in results
-                        "matching_ids": matching_ids,
-                        "label": label
-                    })
-        
-        logger.info(f"🔍 Search for '{query}': Found {len(matching_servers)} matching servers")
+        start_time = time.perf_counter()
+        matching_servers = index.search(query, max_servers=5)  # Limit results for faster response (matches Flask)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(f"🔍 Search for '{query}': Found {len(matching_servers)} matching servers in {elapsed_ms:.2f}ms")
         return matching_servers
     
-    def _get_cached_server_data_from_ir_json(self) -> Dict:
-        """Get server data from ir.json with caching"""
-        current_time = time.time()
-        
-        # Check if cache is still valid
-        if self.server_cache and (current_time - self.last_cache_update < self.cache_ttl):
-            return self.server_cache
-        
-        # Cache miss or expired - read from file
-        json_file_path = os.path.join(settings.TYPE_DIR, 'ir.json')
+    def _get_id_index(self) -> Optional[MachineIdIndex]:
+        """Machine ID index of the current ir.json (None until a refresh has created it)"""
+        return self._ir_json.value
+    
+    def _build_id_index(self, json_file_path: str) -> Optional[MachineIdIndex]:
+        """Parse ir.json and index its machine IDs (file watcher parser)"""
+        with open(json_file_path, 'r') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            logger.error("ir.json structure is not a dictionary")
+            return None
         
-        try:
-            with open(json_file_path, 'r') as f:
-                data = json.load(f)
-            
-            # Ensure data is a dictionary with labels as keys
-            if isinstance(data, dict):
-                self.server_cache = data
-                self.last_cache_update = current_time
-                return data
-            else:
-                logger.error("ir.json structure is not a dictionary")
-                return {}
-                
-        except FileNotFoundError:
-            logger.warning(f"ir.json not found at {json_file_path}. Run refresh to create it.")
-            return {}
-        except Exception as e:
-            logger.error(f"📄 Error reading ir.json: {str(e)}")
-            return {}
+        start_time = time.perf_counter()
+        index = MachineIdIndex(data)
+        logger.info(f"🗂️ Indexed {len(index)} machine IDs from {index.server_count} servers "
+                    f"in {(time.perf_counter() - start_time) * 1000:.1f}ms")
+        return index
     
     def get_server_logs(self, server_ip: str, lines: int = 50) -> Tuple[bool, str]:
         """Get logs from a specific server"""
@@ -728,15 +738,9 @@ class ImageReconServiceManager:
             return False, "SSH functionality not available"
         
         try:
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
             if not os.path.exists(self.ssh_key_path):
                 return False, f"SSH key not found: {self.ssh_key_path}"
             
-            private_key = paramiko.RSAKey.from_private_key_file(self.ssh_key_path)
-            ssh.connect(server_ip, username=self.ssh_username, pkey=private_key, timeout=10)
-            
             # Get logs from common locations
             log_commands = [
                 f"tail -{lines} /usr/bin/OSMWatcher/logs/image_identifier.log 2>/dev/null",
@@ -744,136 +748,192 @@ class ImageReconServiceManager:
                 f"tail -{lines} /opt/logs/service.log 2>/dev/null"
             ]
             
-            for cmd in log_commands:
-                stdin, stdout, stderr = ssh.exec_command(cmd)
-                logs = stdout.read().decode('utf-8').strip()
-                
-                if logs:
-                    ssh.close()
-                    return True, logs
+            with self._ssh_connection(server_ip, timeout=10) as ssh:
+                for cmd in log_commands:
+                    stdin, stdout, stderr = ssh.exec_command(cmd)
+                    logs = stdout.read().decode('utf-8').strip()
+                    
+                    if logs:
+                        return True, logs
             
-            ssh.close()
             return False, "No logs found in common locations"
             
         except Exception as e:
             return False, f"Error getting logs: {str(e)}"
     
-    def check_server_status(self, server_ip: str) -> Dict:
-        """Check the status and version of a server"""
+    def check_server_status(self, server_ip: str, service_name: str = "osm") -> Dict:
+        """Check the status and version of a server (single snapshot exec).
+        
+        Reports the ``service_name`` unit (osm by default, like the rest of the dashboard) and the
+        version from its journal - no longer the image-recon unit and /usr/bin/OSMWatcher/version.txt.
+        """
         if not SSH_AVAILABLE:
             return {"status": "error", "message": "SSH not available"}
         
-        try:
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            if not os.path.exists(self.ssh_key_path):
-                return {"status": "error", "message": f"SSH key not found: {self.ssh_key_path}"}
-            
-            private_key = paramiko.RSAKey.from_private_key_file(self.ssh_key_path)
-            ssh.connect(server_ip, username=self.ssh_username, pkey=private_key, timeout=10)
-            
-            # Check service status
-            stdin, stdout, stderr = ssh.exec_command("systemctl is-active image-recon || service image-recon status")
-            service_status = stdout.read().decode('utf-8').strip()
-            
-            # Check version
-            stdin, stdout, stderr = ssh.exec_command("cat /usr/bin/OSMWatcher/version.txt 2>/dev/null || echo 'unknown'")
-            version = stdout.read().decode('utf-8').strip()
-            
-            # Check uptime
-            stdin, stdout, stderr = ssh.exec_command("uptime")
-            uptime = stdout.read().decode('utf-8').strip()
-            
-            ssh.close()
-            
-            return {
-                "status": "success",
-                "service_status": service_status,
-                "version": version,
-                "uptime": uptime,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            return {"status": "error", "message": f"Error checking status: {str(e)}"}
+        snapshot = self.get_server_snapshot(server_ip, lines=0, service_name=service_name)
+        if snapshot["status"] != "success":
+            return {"status": "error", "message": f"Error checking status: {snapshot['logs']}"}
+        
+        return {
+            "status": "success",
+            "service_status": snapshot["service_status"],
+            "version": snapshot["version"],
+            "uptime": snapshot["uptime"],
+            "timestamp": snapshot["timestamp"]
+        }
     
-    def batch_update_servers(self, servers: List[Dict], update_file: str = None) -> Dict:
-        """Perform batch update on multiple servers"""
+    def start_update_job(self, servers: List[Dict], update_file: str = None, initiated_by: str = "Unknown",
+                         target_version: Optional[str] = None, **policy) -> Dict:
+        """Start an update rollout as a background job: canary server(s) first, then concurrent waves.
+        
+        With no servers given the whole fleet is updated (like Flask start_update_process).
+        Servers on IR_UPDATE_IGNORE_IPS are always left out, and only one update runs at a time.
+        """
         if not SSH_AVAILABLE:
             return {"status": "error", "message": "SSH functionality not available"}
         
-        results = []
-        total_servers = len(servers)
+        servers = servers or self.get_image_recon_servers()
+        ignored = [server.get('ip') for server in servers if server.get('ip') in settings.IR_UPDATE_IGNORE_IPS]
+        servers = [server for server in servers if server.get('ip') not in settings.IR_UPDATE_IGNORE_IPS]
+        if not servers:
+            return {"status": "error", "message": "No servers to update (all selected servers are ignored)"}
         
-        for i, server in enumerate(servers):
-            server_ip = server.get('ip')
-            hostname = server.get('hostname', server_ip)
-            
-            try:
-                # Simulate update process (replace with actual update logic)
-                result = self._update_single_server(server_ip, update_file)
-                result['hostname'] = hostname
-                result['progress'] = f"{i+1}/{total_servers}"
-                results.append(result)
-                
-            except Exception as e:
-                results.append({
-                    "hostname": hostname,
-                    "ip": server_ip,
-                    "status": "error",
-                    "message": str(e),
-                    "progress": f"{i+1}/{total_servers}"
-                })
+        target_version = target_version or settings.IR_UPDATE_TARGET_VERSION or None
+        rollout, target = self._new_update_rollout(servers, initiated_by, target_version, **policy)
+        job, created = self._submit_rollout(
+            UPDATE_JOB_KIND, rollout, "UPDATE",
+            title=f"Update Image Recon on {len(servers)} server(s)",
+            params={"initiated_by": initiated_by, "update_file": update_file, "target_version": target_version,
+                    "servers": [server.get('ip') for server in servers], "ignored": ignored},
+            dedupe_key=UPDATE_JOB_KIND,
+            details=lambda: {**rollout.progress(), "target_version": target["version"], "ignored": ignored}
+        )
+        if not created:
+            return {"status": "error", "message": "Update process is already running",
+                    "job_id": job.id, "job": job.to_dict()}
+        logger.info(f"🚀 Update rollout {job.id} started by {initiated_by}: {len(servers)} servers, "
+                    f"{len(ignored)} ignored, target version {target_version or 'from canary'}")
+        return {"status": "success", "message": f"Update process started for {len(servers)} servers",
+                "job_id": job.id, "job": job.to_dict()}
+    
+    def _new_update_rollout(self, servers: List[Dict], initiated_by: str, target_version: Optional[str] = None,
+                            canary_size: Optional[int] = None, wave_size: Optional[int] = None,
+                            failure_threshold: Optional[float] = None) -> Tuple[RollingRestart, Dict]:
+        """Update rollout over ``servers``; returns it with the (possibly still unknown) target version.
         
-        return {
-            "status": "success",
-            "results": results,
-            "total": total_servers,
-            "timestamp": datetime.now().isoformat()
-        }
+        A server passes once it runs the target version. Without a target version,
+        the first canary has to come up on a version different from the one it ran
+        before the update, and that version becomes the target for the rest.
+        """
+        target = {"version": target_version}
+        target_lock = threading.Lock()
+        previous_versions: Dict[str, str] = {}
+        
+        def run_update(server: Dict) -> Dict:
+            result = self._run_update_script(server)
+            if result.get("previous_version"):
+                previous_versions[server.get('ip')] = result["previous_version"]
+            return result
+        
+        def check_version(server_ip: str) -> Tuple[bool, str, Optional[str]]:
+            healthy, detail, version = self._check_restart_health(server_ip, "osm")
+            if not healthy:
+                return healthy, detail, version
+            with target_lock:
+                if target["version"] is None:
+                    # An old version line still in the journal (script exited 0 without restarting osm)
+                    if version == previous_versions.get(server_ip):
+                        return False, f"still running {version}, waiting for the updated version", version
+                    target["version"] = version
+                    logger.info(f"🎯 Update target version set by {server_ip}: {version}")
+            if version != target["version"]:
+                return False, f"running {version}, waiting for {target['version']}", version
+            return True, detail, version
+        
+        try:
+            fleet_size = len(self.get_image_recon_servers())
+        except Exception:
+            fleet_size = 0
+        rollout = RollingRestart(
+            servers, "osm", initiated_by,
+            restart_one=run_update,
+            check_health=check_version,
+            fleet_size=fleet_size,
+            wave_size=wave_size or settings.IR_UPDATE_WAVE_SIZE,
+            max_down_percent=settings.RESTART_MAX_DOWN_PERCENT,
+            failure_threshold=(failure_threshold if failure_threshold is not None
+                               else settings.IR_UPDATE_FAILURE_THRESHOLD),
+            health_timeout=settings.IR_UPDATE_VERSION_TIMEOUT,
+            health_interval=settings.IR_UPDATE_POLL_INTERVAL,
+            canary_size=canary_size if canary_size is not None else settings.IR_UPDATE_CANARY_SIZE,
+            action="updated"
+        )
+        return rollout, target
     
-    def _update_single_server(self, server_ip: str, update_file: str = None) -> Dict:
-        """Update a single server"""
+    def _run_update_script(self, server: Dict) -> Dict:
+        """Run the update script on one server over a single pooled connection (Flask update_single_server).
+        
+        The version running before the script is returned as ``previous_version``; the
+        version check afterwards is the rollout's health gate, polled from the journal.
+        """
+        server_ip = server.get('ip')
+        hostname = server.get('hostname', server_ip)
+        result = {"hostname": hostname, "ip": server_ip}
         try:
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
             if not os.path.exists(self.ssh_key_path):
-                return {"status": "error", "message": f"SSH key not found: {self.ssh_key_path}"}
-            
-            private_key = paramiko.RSAKey.from_private_key_file(self.ssh_key_path)
-            ssh.connect(server_ip, username=self.ssh_username, pkey=private_key, timeout=30)
+                return {**result, "status": "error", "message": f"SSH key not found: {self.ssh_key_path}"}
             
-            # Stop service
-            stdin, stdout, stderr = ssh.exec_command("sudo systemctl stop image-recon")
-            stdout.read()
-            
-            # Update files (if update_file provided)
-            if update_file:
-                # Upload and extract update file
-                stdin, stdout, stderr = ssh.exec_command(f"cd /usr/bin/OSMWatcher && sudo tar -xzf {update_file}")
-                stdout.read()
-            
-            # Start service
-            stdin, stdout, stderr = ssh.exec_command("sudo systemctl start image-recon")
-            stdout.read()
-            
-            # Verify service is running
-            time.sleep(2)
-            stdin, stdout, stderr = ssh.exec_command("systemctl is-active image-recon")
-            status = stdout.read().decode('utf-8').strip()
+            try:
+                previous_version = self._fetch_server_version(server_ip)
+            except Exception as e:
+                logger.warning(f"[{server_ip}] ⚠️ Could not read the version before updating: {e}")
+                previous_version = "Unknown"
+            if previous_version != "Unknown":
+                result["previous_version"] = previous_version
+            
+            logger.info(f"🔄 Running update script on {server_ip} ({hostname}), currently {previous_version}...")
+            timeout = settings.IR_UPDATE_SCRIPT_TIMEOUT
+            timed_out = False
+            with self._ssh_connection(server_ip, timeout=60) as ssh:
+                command = f"sudo test -f {UPDATE_SCRIPT} || exit 127; sudo bash {UPDATE_SCRIPT}"
+                stdin, stdout, stderr = ssh.exec_command(command, timeout=timeout)
+                channel = stdout.channel
+                stderr_tail = b""
+                start_time = time.time()
+                while True:
+                    # Keep reading: a verbose script blocks on write once the channel window is full
+                    while channel.recv_ready():
+                        channel.recv(65536)
+                    while channel.recv_stderr_ready():
+                        stderr_tail = (stderr_tail + channel.recv_stderr(65536))[-UPDATE_STDERR_TAIL:]
+                    if channel.exit_status_ready() and not channel.recv_ready() and not channel.recv_stderr_ready():
+                        break
+                    if time.time() - start_time > timeout:
+                        timed_out = True
+                        break
+                    time.sleep(0.2)
+                if timed_out:
+                    # Drop only this channel; the pooled connection stays usable
+                    channel.close()
+                else:
+                    exit_status = channel.recv_exit_status()
+                    error = stderr_tail.decode('utf-8', errors='ignore').strip()
             
-            ssh.close()
+            if timed_out:
+                return {**result, "status": "error", "message": f"Update script timeout after {timeout} seconds"}
+            if exit_status == 127:
+                return {**result, "status": "error", "message": f"Update script not found: {UPDATE_SCRIPT}"}
+            if exit_status != 0:
+                return {**result, "status": "error",
+                        "message": f"Update script failed: {error or f'exit status {exit_status}'}"}
             
-            return {
-                "status": "success" if status == "active" else "warning",
-                "message": f"Update completed, service is {status}",
-                "service_status": status
-            }
+            self.clear_version_cache(server_ip)
+            logger.info(f"✅ Update script completed on {server_ip}, waiting for the new version")
+            return {**result, "status": "success", "message": "Update script completed"}
             
         except Exception as e:
-            return {"status": "error", "message": f"Update failed: {str(e)}"}
+            logger.error(f"❌ Update failed on {server_ip}: {str(e)}")
+            return {**result, "status": "error", "message": f"Update failed: {str(e)}"}
     
     def send_batch_email(self, recipients: List[str], subject: str, message: str, results: List[Dict] = None) -> Dict:
         """Send batch email notifications - matches Flask version exactly"""
@@ -1006,24 +1066,10 @@ class ImageReconServiceManager:
             return False, "SSH functionality not available. Install paramiko package."
         
         try:
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
             if not os.path.exists(self.ssh_key_path):
                 raise ValueError(f"Private key file does not exist at path: {self.ssh_key_path}")
             
-            private_key = paramiko.RSAKey.from_private_key_file(self.ssh_key_path)
-            ssh.connect(server_ip, username=self.ssh_username, pkey=private_key, timeout=30)
-            
-            stdin, stdout, stderr = ssh.exec_command(command)
-            
-            # Wait for command to complete
-            exit_status = stdout.channel.recv_exit_status()
-            
-            output = stdout.read().decode('utf-8')
-            error = stderr.read().decode('utf-8')
-            
-            ssh.close()
+            exit_status, output, error = self._run_ssh_command(server_ip, command, timeout=30)
             
             if exit_status == 0:
                 return True, output.strip()
@@ -1033,51 +1079,27 @@ class ImageReconServiceManager:
         except Exception as e:
             return False, str(e)
     
-    def restart_service(self, servers: List[Dict], service_name: str = "image-recognition") -> Dict:
-        """Restart service on selected servers"""
-        results = []
-        
-        for server in servers:
-            server_ip = server.get('ip')
-            server_hostname = server.get('hostname', 'Unknown')
-            
-            if not server_ip:
-                results.append({
-                    "server": server_hostname,
-                    "ip": server_ip,
-                    "status": "error",
-                    "message": "No IP address provided"
-                })
-                continue
-            
-            # Command to restart the service (adjust based on your actual service management)
-            restart_command = f"sudo systemctl restart {service_name}"
-            
-            success, message = self.execute_ssh_command(server_ip, restart_command)
-            
-            results.append({
-                "server": server_hostname,
-                "ip": server_ip,
-                "status": "success" if success else "error",
-                "message": message or "Service restarted successfully"
-            })
-        
-        return {
-            "status": "success",
-            "results": results,
-            "timestamp": datetime.now().isoformat()
-        }
-    
     def clear_version_cache(self, server_ip: str = None):
         """Clear version cache for a specific server or all servers"""
+        self._version_cache.invalidate(server_ip)
         if server_ip:
-            if server_ip in self._version_cache:
-                del self._version_cache[server_ip]
-                logger.info(f"🗑️ Cleared version cache for {server_ip}")
+            logger.info(f"🗑️ Cleared version cache for {server_ip}")
         else:
-            self._version_cache.clear()
             logger.info("🗑️ Cleared all version cache")
     
+    def refresh_versions(self, servers: List[Dict]) -> Dict[str, object]:
+        """Revalidate every server's cached version in parallel, with jitter to spread the SSH load"""
+        if not os.path.exists(self.ssh_key_path):
+            # Localhost dev mode - versions are mocked, nothing to refresh
+            return {server['ip']: self._get_server_version(server['ip']) for server in servers}
+        
+        return self._version_cache.refresh_many(
+            [server['ip'] for server in servers],
+            lambda server_ip: lambda: self._fetch_server_version(server_ip),
+            parallelism=settings.VERSION_REFRESH_PARALLELISM,
+            jitter=settings.VERSION_REFRESH_JITTER
+        )
+    
     def get_server_ids(self, server_ip: str) -> List[Dict]:
         """Get server IDs from list.json on remote server - matches Flask version"""
         if not SSH_AVAILABLE:
@@ -1090,51 +1112,50 @@ class ImageReconServiceManager:
                 logger.error(f"Private key not found at: {self.ssh_key_path}")
                 return []
             
-            logger.info(f"🔌 Attempting to SSH into server {server_ip}")
-            
-            # Create an SSH client
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # Load private key
-            private_key = paramiko.RSAKey.from_private_key_file(self.ssh_key_path)
-            
-            # Connect to the server
-            ssh.connect(server_ip, username=self.ssh_username, pkey=private_key, timeout=30)
-            
-            logger.info(f"✅ Successfully connected to {server_ip}")
+            logger.info(f"🔌 Fetching IDs from server {server_ip}")
             
             # Run the command to fetch the ids from list.json
-            command = "cat /usr/bin/OSMWatcher/list.json | grep -oP '\"id\": \"[^\"]+'"
-            logger.info(f"🔍 Running command: {command}")
+            logger.info(f"🔍 Running command: {SERVER_IDS_COMMAND}")
             
-            stdin, stdout, stderr = ssh.exec_command(command)
+            exit_status, ids, error = self._run_ssh_command(server_ip, SERVER_IDS_COMMAND, timeout=30)
             
-            # Capture the results from stdout
-            ids = stdout.read().decode()
-            
-            ssh.close()
-            
-            # Check if there were any results
-            if not ids:
-                logger.warning(f"⚠️ No IDs found for server {server_ip}")
-                return []
-            
-            # Clean the results by removing extra characters and extracting the IDs
-            cleaned_ids = [line.split(":")[1].strip().replace('"', '') for line in ids.splitlines()]
-            
-            # Prepare the cleaned IDs in the desired format
-            id_objects = [{"id": id.strip()} for id in cleaned_ids]
-            
-            logger.info(f"📋 Fetched {len(id_objects)} IDs for {server_ip}")
-            
-            return id_objects
+            return self._parse_server_ids(server_ip, ids)
             
         except Exception as e:
             logger.error(f"📄 Error reading list.json from {server_ip}: {str(e)}")
             return []
     
-    def refresh_servers(self) -> Dict:
+    def _parse_server_ids(self, server_ip: str, ids: str) -> List[Dict]:
+        """Turn grep output of list.json into [{"id": ...}] objects"""
+        # Check if there were any results
+        if not ids:
+            logger.warning(f"⚠️ No IDs found for server {server_ip}")
+            return []
+        
+        # Clean the results by removing extra characters and extracting the IDs
+        cleaned_ids = [line.split(":")[1].strip().replace('"', '') for line in ids.splitlines()]
+        
+        # Prepare the cleaned IDs in the desired format
+        id_objects = [{"id": id.strip()} for id in cleaned_ids]
+        
+        logger.info(f"📋 Fetched {len(id_objects)} IDs for {server_ip}")
+        
+        return id_objects
+    
+    def start_refresh_job(self, async_mode: bool = False) -> Dict:
+        """Start a server refresh as a background job (a running refresh is returned instead of a second one)"""
+        if async_mode:
+            async def run(job: Job) -> Dict:
+                return await self.refresh_servers_async(job)
+        else:
+            def run(job: Job) -> Dict:
+                return self.refresh_servers(job)
+        
+        job, created = jobs.submit(REFRESH_JOB_KIND, run, title="Refresh Image Recon server list",
+                                   dedupe_key=REFRESH_JOB_KIND)
+        return {"status": "success", "job_id": job.id, "already_running": not created, "job": job.to_dict()}
+    
+    def refresh_servers(self, job: Optional[Job] = None) -> Dict:
         """Refresh server list by fetching IDs from each server and updating ir.json - matches Flask version"""
         try:
             logger.info("=" * 80)
@@ -1147,74 +1168,217 @@ class ImageReconServiceManager:
             if not servers_list:
                 return {"status": "error", "message": "No servers found in image-recon.json"}
             
-            # Initialize the result data structure grouped by label
-            refreshed_data = {}
-            total_servers = 0
-            successful_fetches = 0
-            
-            # Group servers by label and fetch IDs for each
-            for server in servers_list:
-                server_ip = server['ip']
-                hostname = server['hostname']
-                label = server.get('label', 'Unknown')
-                total_servers += 1
-                
-                # Initialize label group if not exists
-                if label not in refreshed_data:
-                    refreshed_data[label] = []
-                
-                # Fetch the server IDs by SSH'ing into the server
-                logger.info(f"📋 Fetching IDs from {hostname} ({server_ip})")
-                ids = self.get_server_ids(server_ip)
-                
-                if ids:
-                    successful_fetches += 1
-                    refreshed_data[label].append({
-                        "hostname": hostname,
-                        "ip": server_ip,  # Include IP address
-                        "ids": ids
-                    })
-                else:
-                    refreshed_data[label].append({
-                        "hostname": hostname,
-                        "ip": server_ip,  # Include IP address
-                        "ids": []  # If no IDs were fetched, set an empty list
-                    })
-            
-            # Define the path to store the JSON file (ir.json)
-            json_file_path = os.path.join(settings.TYPE_DIR, 'ir.json')
-            
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(json_file_path), exist_ok=True)
-            
-            # Write the refreshed server list to the JSON file
-            with open(json_file_path, 'w') as f:
-                json.dump(refreshed_data, f, indent=4)
-            
-            logger.info(f"🔄 Server list has been refreshed and written to {json_file_path}")
-            
-            # Invalidate cache after refresh
-            self.server_cache = {}
-            self.last_cache_update = 0
-            logger.info("🗑️ Cache invalidated after server refresh")
-            
-            logger.info("=" * 80)
-            logger.info(f"📊 REFRESH COMPLETED: {successful_fetches}/{total_servers} servers successful")
-            logger.info("=" * 80)
+            if not self._start_refresh_progress(servers_list, job):
+                return {"status": "error", "message": "Server refresh already in progress"}
+        except Exception as e:
+            logger.error(f"🔄 Error refreshing server list: {str(e)}")
+            return {"status": "error", "message": str(e)}
+        
+        result = None
+        try:
+            # Fetch the server IDs by SSH'ing into the servers concurrently, bounded by a global deadline
+            ids_by_ip = {}
+            executor = futures.ThreadPoolExecutor(max_workers=max(1, settings.IR_REFRESH_PARALLELISM))
+            try:
+                future_map = {
+                    executor.submit(self.get_server_ids, server['ip']): server
+                    for server in servers_list
+                }
+                try:
+                    for future in futures.as_completed(future_map, timeout=settings.IR_REFRESH_DEADLINE):
+                        server = future_map[future]
+                        ids_by_ip[server['ip']] = future.result()
+                        self._record_refresh_progress(server, ids_by_ip[server['ip']], job)
+                except futures.TimeoutError:
+                    logger.warning(f"⏰ Refresh deadline of {settings.IR_REFRESH_DEADLINE}s reached")
+            finally:
+                # Don't wait for hosts still hanging in connect; their results are discarded
+                executor.shutdown(wait=False, cancel_futures=True)
+            
+            result = self._write_refreshed_servers(servers_list, ids_by_ip)
+            return result
             
+        except Exception as e:
+            logger.error(f"🔄 Error refreshing server list: {str(e)}")
+            result = {"status": "error", "message": str(e)}
+            return result
+        finally:
+            self._finish_refresh_progress(result)
+    
+    def _start_refresh_progress(self, servers_list: List[Dict], job: Optional[Job] = None) -> bool:
+        """Reset refresh progress for a new run; False if a refresh is already running"""
+        with self._refresh_lock:
+            if self._refresh_progress.get("running"):
+                return False
+            if job:
+                job.set_total(len(servers_list))
+            self._refresh_progress = {
+                "running": True,
+                "started_at": time.time(),
+                "finished_at": None,
+                "total_servers": len(servers_list),
+                "completed": 0,
+                "successful_fetches": 0,
+                "servers": {},
+                "result": None
+            }
+            return True
+    
+    def _record_refresh_progress(self, server: Dict, ids: List[Dict], job: Optional[Job] = None):
+        """Publish one server's fetched IDs as a partial refresh result"""
+        if job:
+            job.advance({"ip": server['ip'], "hostname": server['hostname'], "ids": len(ids)}, ok=bool(ids))
+        with self._refresh_lock:
+            progress = self._refresh_progress
+            progress["completed"] += 1
+            if ids:
+                progress["successful_fetches"] += 1
+            progress["servers"][server['ip']] = {
+                "hostname": server['hostname'],
+                "label": server.get('label', 'Unknown'),
+                "ids": ids
+            }
+    
+    def _finish_refresh_progress(self, result: Optional[Dict]):
+        with self._refresh_lock:
+            self._refresh_progress["running"] = False
+            self._refresh_progress["finished_at"] = time.time()
+            self._refresh_progress["result"] = result
+    
+    def get_refresh_progress(self) -> Dict:
+        """Snapshot of the running (or last) refresh, including partial per-server results"""
+        with self._refresh_lock:
+            progress = dict(self._refresh_progress)
+            if "servers" in progress:
+                progress["servers"] = dict(progress["servers"])
+        
+        if progress.get("started_at"):
+            end_time = progress["finished_at"] or time.time()
+            progress["elapsed_seconds"] = round(end_time - progress["started_at"], 1)
+            progress["started_at"] = datetime.fromtimestamp(progress["started_at"]).isoformat()
+            if progress["finished_at"]:
+                progress["finished_at"] = datetime.fromtimestamp(progress["finished_at"]).isoformat()
+        return progress
+    
+    def _load_existing_ids(self, json_file_path: str) -> Dict[str, List[Dict]]:
+        """IDs per IP from the current ir.json (used for servers that missed the deadline)"""
+        try:
+            with open(json_file_path, 'r') as f:
+                data = json.load(f)
             return {
-                "status": "success",
-                "message": "Server list refreshed successfully!",
-                "total_servers": total_servers,
-                "successful_fetches": successful_fetches
+                server['ip']: server.get('ids', [])
+                for servers in data.values() for server in servers if 'ip' in server
             }
+        except Exception:
+            return {}
+    
+    def _write_refreshed_servers(self, servers_list: List[Dict], ids_by_ip: Dict[str, List[Dict]]) -> Dict:
+        """Group fetched IDs by label, atomically write ir.json and return the refresh summary"""
+        # Define the path to store the JSON file (ir.json)
+        json_file_path = os.path.join(settings.TYPE_DIR, 'ir.json')
+        
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(json_file_path), exist_ok=True)
+        
+        # Servers that didn't answer before the deadline keep their previous IDs
+        timed_out = [server for server in servers_list if server['ip'] not in ids_by_ip]
+        existing_ids = self._load_existing_ids(json_file_path) if timed_out else {}
+        for server in timed_out:
+            logger.warning(f"⏰ No answer from {server['hostname']} ({server['ip']}) before the deadline, keeping previous IDs")
+        
+        # Initialize the result data structure grouped by label
+        refreshed_data = {}
+        total_servers = 0
+        successful_fetches = 0
+        
+        for server in servers_list:
+            server_ip = server['ip']
+            label = server.get('label', 'Unknown')
+            if server_ip in ids_by_ip:
+                ids = ids_by_ip[server_ip] or []
+            else:
+                ids = existing_ids.get(server_ip, [])
+            total_servers += 1
             
-        except Exception as e:
-            logger.error(f"🔄 Error refreshing server list: {str(e)}")
-            return {"status": "error", "message": str(e)}
+            if ids_by_ip.get(server_ip):
+                successful_fetches += 1
+            
+            # If no IDs were fetched, the server is listed with an empty list
+            refreshed_data.setdefault(label, []).append({
+                "hostname": server['hostname'],
+                "ip": server_ip,  # Include IP address
+                "ids": ids
+            })
+        
+        # Write to a temp file in the same directory and swap it in, so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(json_file_path), prefix='.ir.', suffix='.json.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(refreshed_data, f, indent=4)
+            os.replace(temp_path, json_file_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        logger.info(f"🔄 Server list has been refreshed and written to {json_file_path}")
+        
+        # Re-index right away instead of waiting for the file watcher to notice
+        file_watcher.reload("ir.json")
+        logger.info("🗂️ Search index rebuilt after server refresh")
+        
+        logger.info("=" * 80)
+        logger.info(f"📊 REFRESH COMPLETED: {successful_fetches}/{total_servers} servers successful, {len(timed_out)} timed out")
+        logger.info("=" * 80)
+        
+        return {
+            "status": "success",
+            "message": "Server list refreshed successfully!",
+            "total_servers": total_servers,
+            "successful_fetches": successful_fetches,
+            "timed_out": len(timed_out)
+        }
+    
+    def _parse_version(self, server_ip: str, version_output: str) -> str:
+        """Extract the version from journalctl grep output"""
+        version_output = version_output.strip()
+        
+        # Extract version from format: version[3.1.2335-1]
+        version = "Unknown"
+        if version_output and version_output.startswith('version['):
+            version_match = VERSION_PATTERN.search(version_output)
+            if version_match:
+                version = version_match.group(1)
+        else:
+            # Only log if version not found (warning)
+            logger.warning(f"[{server_ip}] ⚠️ No version found in journalctl output")
+        
+        return version
+    
+    def _read_journal(self, server_ip: str, lines: int = 0, unit: str = "osm"):
+        """Pull the journal entries logged since the last read into the local buffer"""
+        self._journal.read(
+            server_ip,
+            lambda command: self._run_ssh_command(server_ip, command, timeout=10, command_timeout=60),
+            unit=unit,
+            lines=lines
+        )
+    
+    def _fetch_server_version(self, server_ip: str) -> str:
+        """Read the version over SSH (uncached; raises on connection errors)"""
+        self._read_journal(server_ip)
+        version = self._journal.get_version(server_ip)
+        if version:
+            return version
+        
+        # No version line in the unit's journal yet - scan the whole recent journal (exactly like Flask)
+        exit_status, version_output, error = self._run_ssh_command(
+            server_ip, VERSION_COMMAND, timeout=10, command_timeout=10
+        )
+        return self._parse_version(server_ip, version_output)
     
     def _get_server_version(self, server_ip: str) -> str:
-        """Get version from server using journalctl with 10-minute cache"""
+        """Get version from server using journalctl, served from the stale-while-revalidate cache"""
         if not SSH_AVAILABLE:
             logger.warning(f"[{server_ip}] SSH not available")
             return "Unknown"
@@ -1229,56 +1393,9 @@ class ImageReconServiceManager:
             }
             return mock_versions.get(server_ip, "3.1.2335-1")
         
-        # Check cache first (10-minute cache to reduce SSH connections)
-        current_time = time.time()
-        if server_ip in self._version_cache:
-            cache_entry = self._version_cache[server_ip]
-            cache_age = current_time - cache_entry['timestamp']
-            
-            # If cache is still valid (less than 10 minutes old), return cached version
-            if cache_age < self._version_cache_duration:
-                return cache_entry['version']
-        
-        # Cache miss or expired - fetch from server via SSH
+        # Fresh or stale hits return at once; concurrent misses share one SSH fetch
         try:
-            
-            # Create an SSH client
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # Load the private key for authentication
-            private_key = paramiko.RSAKey.from_private_key_file(self.ssh_key_path)
-            
-            # Attempt SSH connection with a timeout
-            ssh.connect(server_ip, username=self.ssh_username, pkey=private_key, timeout=10)
-            
-            # Run journalctl command to get version (exactly like Flask)
-            version_cmd = 'journalctl --since "10 minutes ago" | grep -o "version\\[[0-9]\\+\\.[0-9]\\+\\.[0-9]\\+-[0-9]\\+]" | tail -1'
-            
-            stdin, stdout, stderr = ssh.exec_command(version_cmd, timeout=10)
-            version_output = stdout.read().decode().strip()
-            
-            ssh.close()
-            
-            # Extract version from format: version[3.1.2335-1]
-            version = "Unknown"
-            if version_output and version_output.startswith('version['):
-                import re
-                version_match = re.search(r'version\[([0-9]+\.[0-9]+\.[0-9]+-[0-9]+)\]', version_output)
-                if version_match:
-                    version = version_match.group(1)
-            else:
-                # Only log if version not found (warning)
-                logger.warning(f"[{server_ip}] ⚠️ No version found in journalctl output")
-            
-            # Update cache with new version and timestamp
-            self._version_cache[server_ip] = {
-                'version': version,
-                'timestamp': current_time
-            }
-            
-            return version
-            
+            return self._version_cache.get(server_ip, lambda: self._fetch_server_version(server_ip))
         except Exception as e:
             logger.error(f"[{server_ip}] ❌ Error getting version: {e}")
             return "Unknown"
@@ -1300,31 +1417,9 @@ Oct 07 11:45:45 image-recon-server osm[1234]: [INFO] Health check passed
 """
         
         try:
-            
-            # Create an SSH client
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # Load the private key for authentication
-            private_key = paramiko.RSAKey.from_private_key_file(self.ssh_key_path)
-            
-            # Attempt SSH connection with a timeout
-            ssh.connect(server_ip, username=self.ssh_username, pkey=private_key, timeout=60)
-            
-            # Run journalctl to fetch logs (exactly like Flask version)
-            command = f"journalctl -u osm -n {lines}"
-            
-            stdin, stdout, stderr = ssh.exec_command(command)
-            
-            # Read the logs
-            logs = stdout.read().decode()
-            
-            # If there's an error from stderr, raise an exception
-            error_message = stderr.read().decode()
-            if error_message:
-                raise Exception(f"Error fetching logs: {error_message}")
-            
-            ssh.close()
+            # Only entries logged since the previous read cross the wire
+            self._read_journal(server_ip, lines=lines)
+            logs = "\n".join(self._journal.tail(server_ip, lines))
             
             # If no logs are returned, handle it gracefully
             if not logs:
@@ -1335,142 +1430,227 @@ Oct 07 11:45:45 image-recon-server osm[1234]: [INFO] Health check passed
         except Exception as e:
             return f"Error: {str(e)}"
     
-    def _analyze_server_status(self, logs: str, server_ip: str) -> Dict:
-        """Analyze server logs to determine status - matches Flask 321123.py logic exactly"""
-        # Check for specific offline indicators first (these take priority)
-        offline_indicators = [
-            "stopped osm service"
-        ]
-        
-        is_offline = False
-        for indicator in offline_indicators:
-            if indicator in logs.lower():
-                is_offline = True
-                logger.warning(f"🔴 Server {server_ip} is OFFLINE (found: {indicator})")
-                break
-        
-        # If we can't get logs at all due to connection issues, mark as offline
-        if "Error:" in logs and any(indicator in logs.lower() for indicator in ["connection", "timeout", "ssh"]):
-            is_offline = True
-            logger.warning(f"🔴 Server {server_ip} is OFFLINE (connection error)")
-        
-        # Only check for application errors if server is not offline
-        has_errors = False
-        detected_error = None
-        if not is_offline:
-            # Look for specific application error keywords in logs (matches Flask exactly)
-            error_indicators = [
-                "exception caught: stoi",
-                "system error",
-                "segmentation fault",
-                "cannot open connection",
-                "core dumped",
-                "aborted",
-                "free(): invalid next size",
-                "received signal 6",
-                "curl handler not initialized"
-            ]
-            
-            for indicator in error_indicators:
-                if indicator in logs.lower():
-                    has_errors = True
-                    detected_error = indicator
-                    logger.warning(f"🟡 Server {server_ip} has ERRORS (found: {indicator})")
-                    break
-        
-        # Determine status color
-        if is_offline:
-            status_color = "black"
-            status_text = "Offline"
-        elif has_errors:
-            status_color = "yellow"
-            status_text = f"Error: {detected_error}"
-        else:
-            status_color = "green"
-            status_text = "Online"
-        
-        return {
-            "status_color": status_color,
-            "status_text": status_text,
-            "is_offline": is_offline,
-            "has_errors": has_errors,
-            "detected_error": detected_error
-        }
+    def follow_logs(self, server_ip: str, service_name: str = "osm") -> AsyncIterator[str]:
+        """Async iterator over new journal lines of a server (one long-lived journalctl -f channel)"""
+        command = f"journalctl -u {service_name} -f -n 0 --no-pager"
+        if not os.path.exists(self.ssh_key_path):
+            return self._follow_logs_mock(server_ip)
+        if self._async_available():
+            return async_ssh_runner.stream(
+                server_ip, self.ssh_username, command, key_path=self.ssh_key_path, connect_timeout=10
+            )
+        return self._follow_logs_paramiko(server_ip, command)
     
-    def check_service_status(self, servers: List[Dict], service_name: str = "osm") -> Dict:
-        """Check service status and version on selected servers - matches Flask version"""
-        results = []
+    async def _follow_logs_mock(self, server_ip: str) -> AsyncIterator[str]:
+        """Localhost dev mode - a fake line every couple of seconds"""
+        while True:
+            await asyncio.sleep(2)
+            yield f"{datetime.now().strftime('%b %d %H:%M:%S')} image-recon-server osm[1234]: [INFO] Health check passed"
+    
+    async def _follow_logs_paramiko(self, server_ip: str, command: str) -> AsyncIterator[str]:
+        """Stream a command's output over a pooled paramiko connection from a dedicated reader thread"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
         
-        for server in servers:
-            server_ip = server.get('ip')
-            server_hostname = server.get('hostname', 'Unknown')
-            
-            if not server_ip:
-                results.append({
-                    "server": server_hostname,
-                    "ip": server_ip,
-                    "status": "error",
-                    "version": "Unknown",
-                    "message": "No IP address provided"
-                })
-                continue
-            
+        def deliver(item):
             try:
-                # Get version using SSH command (exactly like Flask version)
-                version = self._get_server_version(server_ip)
-                
-                # Get logs to check status
-                logs = self._get_logs_from_server(server_ip, lines=100)
-                
-                # Check if we got logs successfully
-                if "Error:" in logs:
-                    results.append({
-                        "server": server_hostname,
-                        "ip": server_ip,
-                        "status": "offline",
-                        "version": version,
-                        "message": logs
-                    })
-                    continue
-                
-                # Check for offline indicators
-                offline_indicators = ["stopped osm service"]
-                is_offline = any(indicator in logs.lower() for indicator in offline_indicators)
-                
-                # Check for error indicators
-                error_indicators = [
-                    "exception caught: stoi",
-                    "system error",
-                    "segmentation fault",
-                    "cannot open connection",
-                    "core dumped"
-                ]
-                has_errors = any(indicator in logs.lower() for indicator in error_indicators)
-                
-                status = "offline" if is_offline else ("error" if has_errors else "online")
-                
-                results.append({
-                    "server": server_hostname,
-                    "ip": server_ip,
-                    "status": status,
-                    "version": version,
-                    "message": "Service is running" if status == "online" else f"Service has issues: {status}"
-                })
-                
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                stop.set()  # event loop already closed
+        
+        def reader():
+            try:
+                with self._ssh_connection(server_ip, timeout=10) as client:
+                    channel = client.get_transport().open_session()
+                    try:
+                        channel.settimeout(1.0)
+                        channel.exec_command(command)
+                        pending = b""
+                        while not stop.is_set():
+                            try:
+                                chunk = channel.recv(4096)
+                            except socket.timeout:
+                                continue
+                            if not chunk:
+                                break
+                            *lines, pending = (pending + chunk).split(b"\n")
+                            for line in lines:
+                                deliver(line.decode('utf-8', errors='ignore'))
+                    finally:
+                        channel.close()
             except Exception as e:
-                results.append({
-                    "server": server_hostname,
-                    "ip": server_ip,
-                    "status": "error",
-                    "version": "Unknown",
-                    "message": f"Error checking status: {str(e)}"
-                })
+                deliver(e)
+            finally:
+                deliver(None)
         
-        return {
-            "status": "success",
-            "results": results,
+        threading.Thread(target=reader, name=f"log-follow-{server_ip}", daemon=True).start()
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+    
+    def _build_snapshot_command(self, marker: str, journal_command: str, scan_journal: bool, service_name: str) -> str:
+        """Remote script that prints version, service state, uptime and new log entries as framed sections"""
+        version_grep = "grep -o 'version\\[[0-9]\\+\\.[0-9]\\+\\.[0-9]\\+-[0-9]\\+]' | tail -1"
+        # Only scan the wider journal when no version is known and the new unit entries don't carry one
+        fallback_scan = (
+            f"[ -z \"$v\" ] && v=$(journalctl --since '10 minutes ago' 2>/dev/null | {version_grep}); "
+            if scan_journal else ""
+        )
+        return (
+            f"logs=$({journal_command} 2>/dev/null); logs_rc=$?; "
+            f"v=$(printf '%s\\n' \"$logs\" | {version_grep}); "
+            f"{fallback_scan}"
+            f"echo '{marker}:VERSION'; echo \"$v\"; "
+            f"echo '{marker}:ACTIVE'; systemctl is-active {service_name} 2>/dev/null; "
+            f"echo '{marker}:UPTIME'; uptime; "
+            f"echo '{marker}:LOGS_RC'; echo \"$logs_rc\"; "
+            f"echo '{marker}:LOGS'; printf '%s\\n' \"$logs\""
+        )
+    
+    def _parse_snapshot_output(self, output: str, marker: str) -> Dict[str, str]:
+        """Split framed snapshot output into {section: text}"""
+        sections = {}
+        current = None
+        buffer = []
+        prefix = f"{marker}:"
+        for line in output.splitlines():
+            if line.startswith(prefix):
+                if current is not None:
+                    sections[current] = "\n".join(buffer)
+                current = line[len(prefix):].strip()
+                buffer = []
+            elif current is not None:
+                buffer.append(line)
+        if current is not None:
+            sections[current] = "\n".join(buffer)
+        return sections
+    
+    def get_server_snapshot(self, server_ip: str, lines: int = 100, service_name: str = "osm",
+                            budget: Optional[float] = None) -> Dict:
+        """Fetch version, last log lines, service state and uptime in a single remote exec.
+        
+        With ``budget`` (seconds) the SSH call, connecting included, is given up after that long.
+        """
+        snapshot = {
+            "ip": server_ip,
+            "status": "error",
+            "version": "Unknown",
+            "service_status": "unknown",
+            "uptime": "unknown",
+            "logs": "",
             "timestamp": datetime.now().isoformat()
         }
+        
+        if not SSH_AVAILABLE:
+            snapshot["logs"] = "Error: SSH not available"
+            return snapshot
+        
+        # Localhost dev mode (no key) - compose the snapshot from the mock helpers
+        if not os.path.exists(self.ssh_key_path):
+            snapshot.update({
+                "status": "success",
+                "version": self._get_server_version(server_ip),
+                "service_status": "active",
+                "logs": self._get_logs_from_server(server_ip, lines)
+            })
+            return snapshot
+        
+        marker = f"__OSMSNAP_{uuid.uuid4().hex}__"
+        command, read_after = self._snapshot_command(server_ip, marker, int(lines), service_name)
+        deadline = time.monotonic() + budget if budget is not None else None
+        
+        try:
+            exit_status, output, error = self._run_ssh_command(server_ip, command, timeout=10, command_timeout=60,
+                                                               deadline=deadline)
+            self._fill_snapshot(snapshot, output, error, marker, read_after, int(lines), service_name)
+        except Exception as e:
+            logger.error(f"[{server_ip}] ❌ Error getting server snapshot: {e}")
+            snapshot["logs"] = f"Error: {str(e)}"
+            snapshot["timed_out"] = isinstance(e, (TimeoutError, asyncio.TimeoutError))
+        
+        return snapshot
+    
+    def _snapshot_command(self, server_ip: str, marker: str, lines: int, service_name: str) -> Tuple[str, Optional[str]]:
+        """Snapshot script reading the journal after the stored cursor; returns (command, cursor read after)"""
+        journal_command, read_after = self._journal.build_command(server_ip, service_name, lines)
+        # Skip the remote full-journal version scan when a version is already known
+        scan_journal = (self._journal.get_version(server_ip, service_name) is None
+                        and self._version_cache.lookup(server_ip)[1] != FRESH)
+        return self._build_snapshot_command(marker, journal_command, scan_journal, service_name), read_after
+    
+    def _fill_snapshot(self, snapshot: Dict, output: str, error: str, marker: str,
+                       read_after: Optional[str], lines: int, service_name: str):
+        """Parse framed snapshot output into ``snapshot``, the journal buffer and the version cache"""
+        server_ip = snapshot["ip"]
+        sections = self._parse_snapshot_output(output, marker)
+        
+        if "LOGS" not in sections:
+            raise Exception(error.strip() or "Malformed snapshot output")
+        
+        if sections.get("LOGS_RC", "0").strip() != "0":
+            # Most likely a cursor the server no longer has (journal rotated) - start over next time
+            if read_after:
+                self._journal.reset_cursor(server_ip, service_name)
+            logs = f"Error: journalctl failed on {server_ip}"
+        else:
+            self._journal.ingest(server_ip, service_name, sections["LOGS"], read_after)
+            logs = "\n".join(self._journal.tail(server_ip, lines, service_name)) or "No logs available."
+        
+        version_match = VERSION_PATTERN.search(sections.get("VERSION", ""))
+        version = version_match.group(1) if version_match else self._journal.get_version(server_ip, service_name)
+        cached_version, state = self._version_cache.lookup(server_ip)
+        if not version and state == FRESH:
+            # The remote scan was skipped because the cache already holds a fresh version
+            version = cached_version
+        else:
+            if not version:
+                version = "Unknown"
+                logger.warning(f"[{server_ip}] ⚠️ No version found in journalctl output")
+            # The snapshot doubles as a version cache refresh
+            self._version_cache.set(server_ip, version)
+        
+        snapshot.update({
+            "status": "success",
+            "version": version,
+            "service_status": sections.get("ACTIVE", "").strip() or "unknown",
+            "uptime": sections.get("UPTIME", "").strip() or "unknown",
+            "logs": logs
+        })
+    
+    def _analyze_snapshot(self, snapshot: Dict) -> Dict:
+        """Status analysis for a snapshot: log indicators plus the systemd unit state"""
+        if snapshot["status"] == "error":
+            # No logs were read: the "Error: ..." text must not be judged as log content
+            return {
+                "status_color": "black",
+                "status_text": "Timeout" if snapshot.get("timed_out") else "Error",
+                "is_offline": True,
+                "has_errors": True,
+                "detected_error": snapshot["logs"],
+                "hits": []
+            }
+        analysis = self._analyze_server_status(snapshot["logs"], snapshot["ip"])
+        if (snapshot["status"] == "success" and not analysis["is_offline"]
+                and snapshot["service_status"] in ("inactive", "failed")):
+            logger.warning(f"🔴 Server {snapshot['ip']} is OFFLINE (service {snapshot['service_status']})")
+            analysis.update({
+                "status_color": "black",
+                "status_text": "Offline",
+                "is_offline": True
+            })
+        return analysis
+    
+    def _analyze_server_status(self, logs: str, server_ip: str) -> Dict:
+        """Analyze server logs to determine status - matches Flask 321123.py logic exactly"""
+        return self.status_analyzer.analyze(logs, server_ip)
     
     def restart_machine(self, servers: List[Dict]) -> Dict:
         """Restart entire machine on selected servers"""
@@ -1507,129 +1687,244 @@ Oct 07 11:45:45 image-recon-server osm[1234]: [INFO] Health check passed
             "timestamp": datetime.now().isoformat()
         }
     
-    def restart_service(self, servers: List[Dict], service_name: str = "osm", initiated_by: str = "Unknown") -> Dict:
-        """Restart service on multiple servers - matches Flask version"""
+    def restart_service(self, servers: List[Dict], service_name: str = "osm", initiated_by: str = "Unknown",
+                        **policy) -> Dict:
+        """Rolling restart of the service on multiple servers; blocks until every wave has settled"""
         if not SSH_AVAILABLE:
             return {"status": "error", "message": "SSH functionality not available"}
         
-        # Log who initiated the restart
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        logger.info("=" * 80)
-        logger.info(f"🔄 SERVICE RESTART INITIATED")
-        logger.info(f"📅 Time: {timestamp}")
-        logger.info(f"👤 Initiated by: {initiated_by}")
-        logger.info(f"🎯 Target servers: {len(servers)}")
-        logger.info(f"🔧 Service: {service_name}")
-        logger.info("=" * 80)
+        rollout = self._new_rolling_restart(servers, service_name, initiated_by, **policy)
+        self._log_restart_start(servers, service_name, initiated_by)
+        progress = rollout.run()
+        return {**progress, **self._restart_summary(progress["results"], initiated_by)}
+    
+    def start_restart_job(self, servers: List[Dict], service_name: str = "osm", initiated_by: str = "Unknown",
+                          **policy) -> Dict:
+        """Start a rolling restart as a background job; poll get_restart_job() for progress.
         
-        results = []
+        Repeating the same request while it runs returns the running job.
+        """
+        if not SSH_AVAILABLE:
+            return {"status": "error", "message": "SSH functionality not available"}
         
-        for server in servers:
-            server_ip = server.get('ip')
-            hostname = server.get('hostname', server_ip)
+        rollout = self._new_rolling_restart(servers, service_name, initiated_by, **policy)
+        hostnames = ", ".join(server.get('hostname', server.get('ip', '?')) for server in servers[:3])
+        job, created = self._submit_rollout(
+            RESTART_JOB_KIND, rollout, "RESTART",
+            title=f"Restart {service_name} on {len(servers)} server(s): {hostnames}{'...' if len(servers) > 3 else ''}",
+            params={"service_name": service_name, "initiated_by": initiated_by,
+                    "servers": [server.get('ip') for server in servers]},
+            dedupe_key=(RESTART_JOB_KIND, service_name, tuple(sorted(str(server.get('ip')) for server in servers)))
+        )
+        if created:
+            self._log_restart_start(servers, service_name, initiated_by)
+        return {"status": "success", "already_running": not created, **self.get_restart_job(job.id)}
+    
+    def _submit_rollout(self, kind: str, rollout: RollingRestart, operation: str, title: str, params: Dict,
+                        dedupe_key, details: Optional[Callable[[], Dict]] = None) -> Tuple[Job, bool]:
+        """Run a rollout as a background job that counts each settled server"""
+        def run(job: Job) -> Dict:
+            rollout.on_result = lambda result: job.advance(ok=result.get("status") == "success")
+            job.add_cancel_hook(rollout.cancel)
+            progress = rollout.run()
+            self._restart_summary(progress["results"], rollout.initiated_by, operation)
+            return {key: value for key, value in progress.items() if key != "results"}
+        
+        return jobs.submit(kind, run, title=title, total=len(rollout.servers), params=params,
+                           dedupe_key=dedupe_key, details=details or rollout.progress)
+    
+    def get_restart_job(self, job_id: str, kind: str = RESTART_JOB_KIND) -> Optional[Dict]:
+        """Progress of a background rollout (waves, results, ETA), or None if unknown"""
+        job = jobs.get(job_id)
+        if job is None or job.kind != kind:
+            return None
+        data = job.to_dict()
+        progress = dict(data.get("details") or {})
+        if data["state"] in (FAILED, INTERRUPTED):
+            progress["state"] = data["state"]
+            progress["abort_reason"] = progress.get("abort_reason") or data["error"]
+        progress.update({
+            "job_id": data["job_id"],
+            "progress_percent": data["progress_percent"],
+            "elapsed_seconds": data["elapsed_seconds"],
+            "eta_seconds": data["eta_seconds"]
+        })
+        return progress
+    
+    def cancel_restart_job(self, job_id: str) -> Optional[Dict]:
+        """Stop a background rolling restart before its next wave"""
+        if self.get_restart_job(job_id) is None:
+            return None
+        jobs.cancel(job_id)
+        return self.get_restart_job(job_id)
+    
+    def _new_rolling_restart(self, servers: List[Dict], service_name: str, initiated_by: str,
+                             wave_size: Optional[int] = None, max_down_percent: Optional[float] = None,
+                             failure_threshold: Optional[float] = None) -> RollingRestart:
+        """Rolling restart over ``servers`` with settings defaults for any policy value not given"""
+        try:
+            fleet_size = len(self.get_image_recon_servers())
+        except Exception:
+            fleet_size = 0
+        return RollingRestart(
+            servers, service_name, initiated_by,
+            restart_one=lambda server: self._restart_one(server, service_name),
+            check_health=lambda server_ip: self._check_restart_health(server_ip, service_name),
+            fleet_size=fleet_size,
+            wave_size=wave_size or settings.RESTART_WAVE_SIZE,
+            max_down_percent=max_down_percent or settings.RESTART_MAX_DOWN_PERCENT,
+            failure_threshold=(failure_threshold if failure_threshold is not None
+                               else settings.RESTART_FAILURE_THRESHOLD),
+            health_timeout=settings.RESTART_HEALTH_TIMEOUT,
+            health_interval=settings.RESTART_HEALTH_INTERVAL
+        )
+    
+    def _restart_one(self, server: Dict, service_name: str) -> Dict:
+        """Restart the service on one server and wait for the command (up to 3 minutes)"""
+        server_ip = server.get('ip')
+        hostname = server.get('hostname', server_ip)
+        
+        try:
+            logger.info(f"🔄 Attempting to restart service on {server_ip} ({hostname})")
             
-            try:
-                logger.info(f"🔄 Attempting to restart service on {server_ip} ({hostname})")
-                
-                # Connect via SSH
-                ssh = paramiko.SSHClient()
-                ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                private_key = paramiko.RSAKey.from_private_key_file(self.ssh_key_path)
-                ssh.connect(server_ip, username=self.ssh_username, pkey=private_key, timeout=30)
-                
+            # Restart command: restart service, wait 10 seconds, check if active
+            # Since we're root, no sudo password needed
+            restart_command = f"systemctl restart {service_name} && sleep 10 && systemctl is-active {service_name}"
+            
+            # Wait for completion (up to 3 minutes)
+            timeout = 180
+            timed_out = False
+            
+            with self._ssh_connection(server_ip, timeout=30) as ssh:
                 logger.info(f"✅ Connected to {server_ip}. Restarting service...")
                 
-                # Restart command: restart service, wait 10 seconds, check if active
-                # Since we're root, no sudo password needed
-                restart_command = f"systemctl restart {service_name} && sleep 10 && systemctl is-active {service_name}"
-                
-                stdin, stdout, stderr = ssh.exec_command(restart_command, timeout=180)
-                
-                # Wait for completion (up to 3 minutes)
+                stdin, stdout, stderr = ssh.exec_command(restart_command, timeout=timeout)
                 start_time = time.time()
-                timeout = 180
                 
                 logger.info(f"⏳ Waiting for restart command to complete...")
                 while not stdout.channel.exit_status_ready():
                     if time.time() - start_time > timeout:
-                        ssh.close()
-                        logger.error(f"⏰ Restart timeout after {timeout} seconds on {server_ip}")
-                        msg = f"Restart timeout after {timeout} seconds. Service may still be restarting."
-                    results.append({
-                        "hostname": hostname,
-                        "ip": server_ip,
-                        "status": "error",
-                        "message": msg
-                    })
-                    # Send timeout notification to Lark (matches Flask exactly - with "Timeout" error)
-                    send_lark_notification(server_ip, hostname, "error", msg, "Timeout")
-                    continue
+                        timed_out = True
+                        break
                     time.sleep(1)
                 
-                # Check exit status
-                exit_status = stdout.channel.recv_exit_status()
-                service_status = stdout.read().decode().strip()
-                
-                ssh.close()
-                
-                logger.info(f"📊 Service status after restart: {service_status}")
-                
-                if exit_status == 0 and service_status == "active":
-                    logger.info(f"🎉 Service restarted successfully and is ACTIVE on {server_ip}")
-                    msg = "Service restarted successfully and is now active."
-                    results.append({
-                        "hostname": hostname,
-                        "ip": server_ip,
-                        "status": "success",
-                        "message": msg
-                    })
-                    # Send success notification to Lark (matches Flask exactly)
-                    send_lark_notification(server_ip, hostname, "success", msg)
-                elif exit_status == 0:
-                    logger.warning(f"⚠️ Service restarted but status is '{service_status}' on {server_ip}")
-                    msg = f"Service restarted but current status is: {service_status}. Please check manually."
-                    results.append({
-                        "hostname": hostname,
-                        "ip": server_ip,
-                        "status": "warning",
-                        "message": msg
-                    })
-                    # Send warning notification to Lark (matches Flask exactly)
-                    send_lark_notification(server_ip, hostname, "warning", msg)
+                if timed_out:
+                    # Drop only this channel; the pooled connection stays usable
+                    stdout.channel.close()
                 else:
+                    # Check exit status
+                    exit_status = stdout.channel.recv_exit_status()
+                    service_status = stdout.read().decode().strip()
                     error_msg = stderr.read().decode().strip()
-                    msg = f"Failed to restart the service. {error_msg}" if error_msg else "Failed to restart the service."
-                    logger.error(f"💥 Error restarting service on {server_ip}: {error_msg}")
-                    results.append({
-                        "hostname": hostname,
-                        "ip": server_ip,
-                        "status": "error",
-                        "message": msg
-                    })
-                    # Send error notification to Lark (matches Flask exactly - with error detail)
-                    send_lark_notification(server_ip, hostname, "error", msg, error_msg if error_msg else None)
             
-            except Exception as e:
-                error_str = str(e)
-                msg = f"Unexpected error during restart: {error_str}"
-                logger.error(f"Error: {error_str}")  # Match Flask log format
-                results.append({
-                    "hostname": hostname,
-                    "ip": server_ip,
-                    "status": "error",
-                    "message": error_str
-                })
-                # Send error notification to Lark (matches Flask exactly)
-                send_lark_notification(server_ip, hostname, "error", msg, error_str)
+            if timed_out:
+                return self._restart_timeout_result(server_ip, hostname, timeout)
+            
+            return self._restart_result(server_ip, hostname, exit_status, service_status, error_msg)
+        
+        except Exception as e:
+            return self._restart_error_result(server_ip, hostname, e)
+    
+    def _check_restart_health(self, server_ip: str, service_name: str) -> Tuple[bool, str, Optional[str]]:
+        """Health gate after a restart: unit active and a version line logged since it became active"""
+        version_grep = "grep -o 'version\\[[0-9]\\+\\.[0-9]\\+\\.[0-9]\\+-[0-9]\\+]' | tail -1"
+        command = (
+            f"systemctl is-active {service_name}; "
+            f"since=$(systemctl show -p ActiveEnterTimestamp --value {service_name}); "
+            f"[ -n \"$since\" ] && journalctl -u {service_name} --since \"$since\" --no-pager 2>/dev/null | {version_grep}"
+        )
+        exit_status, output, error = self._run_ssh_command(server_ip, command, timeout=10, command_timeout=30)
+        lines = output.strip().splitlines()
+        state = lines[0].strip() if lines else "unknown"
+        version_match = VERSION_PATTERN.search(output)
+        
+        if state != "active":
+            return False, f"service is {state}", None
+        if not version_match:
+            return False, "service active but no version logged since start", None
+        
+        version = version_match.group(1)
+        self._version_cache.set(server_ip, version)
+        return True, f"active, version {version}", version
+    
+    def _log_restart_start(self, servers: List[Dict], service_name: str, initiated_by: str):
+        """Log who initiated the restart"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        logger.info("=" * 80)
+        logger.info(f"🔄 SERVICE RESTART INITIATED")
+        logger.info(f"📅 Time: {timestamp}")
+        logger.info(f"👤 Initiated by: {initiated_by}")
+        logger.info(f"🎯 Target servers: {len(servers)}")
+        logger.info(f"🔧 Service: {service_name}")
+        logger.info("=" * 80)
+    
+    def _restart_timeout_result(self, server_ip: str, hostname: str, timeout: int) -> Dict:
+        """Result entry (and Lark notification) for a restart that ran past its timeout"""
+        logger.error(f"⏰ Restart timeout after {timeout} seconds on {server_ip}")
+        msg = f"Restart timeout after {timeout} seconds. Service may still be restarting."
+        # Send timeout notification to Lark (matches Flask exactly - with "Timeout" error)
+        send_lark_notification(server_ip, hostname, "error", msg, "Timeout")
+        return {
+            "hostname": hostname,
+            "ip": server_ip,
+            "status": "error",
+            "message": msg
+        }
+    
+    def _restart_result(self, server_ip: str, hostname: str, exit_status: int,
+                        service_status: str, error_msg: str) -> Dict:
+        """Result entry (and Lark notification) for a completed restart command"""
+        logger.info(f"📊 Service status after restart: {service_status}")
         
-        # Log restart summary
+        if exit_status == 0 and service_status == "active":
+            logger.info(f"🎉 Service restarted successfully and is ACTIVE on {server_ip}")
+            status = "success"
+            msg = "Service restarted successfully and is now active."
+            error_detail = None
+        elif exit_status == 0:
+            logger.warning(f"⚠️ Service restarted but status is '{service_status}' on {server_ip}")
+            status = "warning"
+            msg = f"Service restarted but current status is: {service_status}. Please check manually."
+            error_detail = None
+        else:
+            logger.error(f"💥 Error restarting service on {server_ip}: {error_msg}")
+            status = "error"
+            msg = f"Failed to restart the service. {error_msg}" if error_msg else "Failed to restart the service."
+            error_detail = error_msg if error_msg else None
+        
+        # Send notification to Lark (matches Flask exactly)
+        send_lark_notification(server_ip, hostname, status, msg, error_detail)
+        return {
+            "hostname": hostname,
+            "ip": server_ip,
+            "status": status,
+            "message": msg
+        }
+    
+    def _restart_error_result(self, server_ip: str, hostname: str, e: Exception) -> Dict:
+        """Result entry (and Lark notification) for a restart that raised"""
+        error_str = str(e)
+        msg = f"Unexpected error during restart: {error_str}"
+        logger.error(f"Error: {error_str}")  # Match Flask log format
+        # Send error notification to Lark (matches Flask exactly)
+        send_lark_notification(server_ip, hostname, "error", msg, error_str)
+        return {
+            "hostname": hostname,
+            "ip": server_ip,
+            "status": "error",
+            "message": error_str
+        }
+    
+    def _restart_summary(self, results: List[Dict], initiated_by: str, operation: str = "RESTART") -> Dict:
+        """Log the restart (or update) summary and build the response"""
         success_count = sum(1 for r in results if r.get('status') == 'success')
         warning_count = sum(1 for r in results if r.get('status') == 'warning')
         error_count = sum(1 for r in results if r.get('status') == 'error')
+        skipped_count = sum(1 for r in results if r.get('status') == 'skipped')
         
         logger.info("=" * 80)
-        logger.info(f"📊 RESTART OPERATION COMPLETED")
-        logger.info(f"✅ Success: {success_count} | ⚠️ Warning: {warning_count} | ❌ Error: {error_count}")
+        logger.info(f"📊 {operation} OPERATION COMPLETED")
+        logger.info(f"✅ Success: {success_count} | ⚠️ Warning: {warning_count} | ❌ Error: {error_count} | ⏭️ Skipped: {skipped_count}")
         logger.info(f"👤 Initiated by: {initiated_by}")
         logger.info("=" * 80)
         
@@ -1639,36 +1934,267 @@ Oct 07 11:45:45 image-recon-server osm[1234]: [INFO] Health check passed
             "timestamp": datetime.now().isoformat()
         }
     
-    def check_service_status(self, servers: List[Dict], service_name: str = "image-recon") -> Dict:
-        """Check service status on multiple servers"""
-        results = []
+    def check_service_status(self, servers: List[Dict], service_name: str = "osm") -> Dict:
+        """Check service status on multiple servers (``service_name`` unit, version from its journal).
         
-        for server in servers:
+        Servers are checked concurrently (IR_STATUS_CHECK_PARALLELISM at a time) within
+        IR_STATUS_CHECK_BUDGET; servers still unanswered then are reported as timed out.
+        """
+        def check_one(server: Dict) -> Dict:
             server_ip = server.get('ip')
-            hostname = server.get('hostname', server_ip)
+            status_result = self.check_server_status(server_ip, service_name)
+            return {
+                "hostname": server.get('hostname', server_ip),
+                "ip": server_ip,
+                "status": status_result.get("status", "error"),
+                "service_status": status_result.get("service_status", "unknown"),
+                "version": status_result.get("version", "unknown"),
+                "uptime": status_result.get("uptime", "unknown")
+            }
+        
+        def failed(server: Dict, message: str) -> Dict:
+            return {
+                "hostname": server.get('hostname', server.get('ip')),
+                "ip": server.get('ip'),
+                "status": "error",
+                "message": message
+            }
+        
+        budget = settings.IR_STATUS_CHECK_BUDGET
+        results = []
+        executor = futures.ThreadPoolExecutor(max_workers=max(1, settings.IR_STATUS_CHECK_PARALLELISM))
+        try:
+            future_list = [executor.submit(check_one, server) for server in servers]
+            done, not_done = futures.wait(future_list, timeout=budget)
+            # Results in the order the servers were given
+            for server, future in zip(servers, future_list):
+                if future in not_done:
+                    results.append(failed(server, f"No answer within the {budget}s status check budget"))
+                    continue
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"❌ Error checking status on {server.get('ip')}: {str(e)}")
+                    results.append(failed(server, str(e)))
+            if not_done:
+                logger.warning(f"⏰ Status check budget of {budget}s reached, {len(not_done)} servers unanswered")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return {
+            "status": "success",
+            "results": results,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    # ------------------------------------------------------------------
+    # asyncssh backend (settings.SSH_BACKEND == "asyncssh")
+    #
+    # Same results as the sync methods above, but every host is a coroutine
+    # on the shared AsyncSSHRunner instead of a thread holding a paramiko
+    # connection. Without a key (localhost dev mode) they fall back to the
+    # sync implementations in a worker thread.
+    # ------------------------------------------------------------------
+    
+    def _async_available(self) -> bool:
+        return os.path.exists(self.ssh_key_path)
+    
+    async def _arun_ssh_command(self, server_ip: str, command: str, timeout: int = 30,
+                                command_timeout: Optional[int] = None) -> Tuple[int, str, str]:
+        """Async counterpart of _run_ssh_command on the asyncssh runner"""
+        return await async_ssh_runner.run(
+            server_ip, self.ssh_username, command,
+            key_path=self.ssh_key_path, connect_timeout=timeout, timeout=command_timeout
+        )
+    
+    async def _aread_journal_version(self, server_ip: str, unit: str = "osm") -> Optional[str]:
+        """Async incremental journal read; returns the latest version seen, or None"""
+        command, read_after = self._journal.build_command(server_ip, unit)
+        exit_status, output, error = await self._arun_ssh_command(server_ip, command, timeout=10, command_timeout=60)
+        if exit_status == 0:
+            self._journal.ingest(server_ip, unit, output, read_after)
+        elif read_after:
+            self._journal.reset_cursor(server_ip, unit)
+        return self._journal.get_version(server_ip, unit)
+    
+    async def _get_server_version_async(self, server_ip: str) -> str:
+        """Async counterpart of _get_server_version (shares the version cache)"""
+        if not self._async_available():
+            return await asyncio.to_thread(self._get_server_version, server_ip)
+        
+        cached_version, state = self._version_cache.lookup(server_ip)
+        if state == FRESH:
+            return cached_version
+        if state == STALE:
+            self._version_cache.load(server_ip, lambda: self._fetch_server_version(server_ip), background=True)
+            return cached_version
+        
+        try:
+            version = await self._aread_journal_version(server_ip)
+            if not version:
+                exit_status, version_output, error = await self._arun_ssh_command(
+                    server_ip, VERSION_COMMAND, timeout=10, command_timeout=10
+                )
+                version = self._parse_version(server_ip, version_output)
+            self._version_cache.set(server_ip, version)
+            return version
+        except Exception as e:
+            logger.error(f"[{server_ip}] ❌ Error getting version: {e}")
+            return "Unknown"
+    
+    async def get_server_snapshot_async(self, server_ip: str, lines: int = 100, service_name: str = "osm") -> Dict:
+        """Async counterpart of get_server_snapshot"""
+        if not SSH_AVAILABLE or not self._async_available():
+            return await asyncio.to_thread(self.get_server_snapshot, server_ip, lines, service_name)
+        
+        snapshot = {
+            "ip": server_ip,
+            "status": "error",
+            "version": "Unknown",
+            "service_status": "unknown",
+            "uptime": "unknown",
+            "logs": "",
+            "timestamp": datetime.now().isoformat()
+        }
+        marker = f"__OSMSNAP_{uuid.uuid4().hex}__"
+        command, read_after = self._snapshot_command(server_ip, marker, int(lines), service_name)
+        
+        try:
+            exit_status, output, error = await self._arun_ssh_command(server_ip, command, timeout=10, command_timeout=60)
+            self._fill_snapshot(snapshot, output, error, marker, read_after, int(lines), service_name)
+        except Exception as e:
+            logger.error(f"[{server_ip}] ❌ Error getting server snapshot: {e}")
+            snapshot["logs"] = f"Error: {str(e)}"
+            snapshot["timed_out"] = isinstance(e, (TimeoutError, asyncio.TimeoutError))
+        
+        return snapshot
+    
+    async def get_server_ids_async(self, server_ip: str) -> List[Dict]:
+        """Async counterpart of get_server_ids"""
+        if not self._async_available():
+            return await asyncio.to_thread(self.get_server_ids, server_ip)
+        
+        try:
+            logger.info(f"🔌 Fetching IDs from server {server_ip}")
+            exit_status, ids, error = await self._arun_ssh_command(server_ip, SERVER_IDS_COMMAND, timeout=30)
+            return self._parse_server_ids(server_ip, ids)
+        except Exception as e:
+            logger.error(f"📄 Error reading list.json from {server_ip}: {str(e)}")
+            return []
+    
+    async def refresh_servers_async(self, job: Optional[Job] = None) -> Dict:
+        """Async counterpart of refresh_servers - same parallelism limit and deadline"""
+        try:
+            logger.info("=" * 80)
+            logger.info("🔄 SERVER REFRESH INITIATED (async)")
+            logger.info("=" * 80)
             
-            try:
-                status_result = self.check_server_status(server_ip)
-                results.append({
-                    "hostname": hostname,
-                    "ip": server_ip,
-                    "status": status_result.get("status", "error"),
-                    "service_status": status_result.get("service_status", "unknown"),
-                    "version": status_result.get("version", "unknown"),
-                    "uptime": status_result.get("uptime", "unknown")
-                })
+            servers_list = self.get_image_recon_servers()
             
-            except Exception as e:
-                logger.error(f"❌ Error checking status on {server_ip}: {str(e)}")
-                results.append({
+            if not servers_list:
+                return {"status": "error", "message": "No servers found in image-recon.json"}
+            
+            if not self._start_refresh_progress(servers_list, job):
+                return {"status": "error", "message": "Server refresh already in progress"}
+        except Exception as e:
+            logger.error(f"🔄 Error refreshing server list: {str(e)}")
+            return {"status": "error", "message": str(e)}
+        
+        result = None
+        try:
+            ids_by_ip = {}
+            semaphore = asyncio.Semaphore(max(1, settings.IR_REFRESH_PARALLELISM))
+            
+            async def fetch_ids(server: Dict):
+                async with semaphore:
+                    ids = await self.get_server_ids_async(server['ip'])
+                ids_by_ip[server['ip']] = ids
+                self._record_refresh_progress(server, ids, job)
+            
+            tasks = [asyncio.create_task(fetch_ids(server)) for server in servers_list]
+            done, pending = await asyncio.wait(tasks, timeout=settings.IR_REFRESH_DEADLINE)
+            if pending:
+                logger.warning(f"⏰ Refresh deadline of {settings.IR_REFRESH_DEADLINE}s reached")
+                for task in pending:
+                    task.cancel()
+            
+            result = await asyncio.to_thread(self._write_refreshed_servers, servers_list, dict(ids_by_ip))
+            return result
+            
+        except Exception as e:
+            logger.error(f"🔄 Error refreshing server list: {str(e)}")
+            result = {"status": "error", "message": str(e)}
+            return result
+        finally:
+            self._finish_refresh_progress(result)
+    
+    async def check_service_status_async(self, servers: List[Dict], service_name: str = "osm") -> Dict:
+        """Async counterpart of check_service_status - one snapshot per server, all concurrently"""
+        async def check_one(server: Dict) -> Dict:
+            server_ip = server.get('ip')
+            hostname = server.get('hostname', server_ip)
+            snapshot = await self.get_server_snapshot_async(server_ip, lines=0, service_name=service_name)
+            if snapshot["status"] != "success":
+                return {
                     "hostname": hostname,
                     "ip": server_ip,
                     "status": "error",
-                    "message": str(e)
-                })
+                    "message": f"Error checking status: {snapshot['logs']}"
+                }
+            return {
+                "hostname": hostname,
+                "ip": server_ip,
+                "status": "success",
+                "service_status": snapshot["service_status"],
+                "version": snapshot["version"],
+                "uptime": snapshot["uptime"]
+            }
         
+        results = await asyncio.gather(*(check_one(server) for server in servers))
         return {
             "status": "success",
-            "results": results,
+            "results": list(results),
             "timestamp": datetime.now().isoformat()
         }
+    
+    async def test_scheduled_version_check_async(self) -> Dict:
+        """Async counterpart of test_scheduled_version_check"""
+        try:
+            logger.info("🕘 Running test version check...")
+            
+            config, servers, error = await asyncio.to_thread(self._prepare_version_check)
+            if error:
+                return error
+            
+            budget = settings.VERSION_CHECK_BUDGET
+            tasks = {
+                server.get('ip'): asyncio.create_task(self._get_server_version_async(server.get('ip')))
+                for server in servers
+            }
+            done, pending = await asyncio.wait(tasks.values(), timeout=budget)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"⏰ Version check budget of {budget}s reached, {len(pending)} servers unanswered")
+            
+            versions = {}
+            for ip, task in tasks.items():
+                if task in pending:
+                    versions[ip] = TimeoutError(f"No answer within the {budget}s version check budget")
+                elif task.exception() is not None:
+                    versions[ip] = task.exception()
+                else:
+                    versions[ip] = task.result()
+            
+            return await asyncio.to_thread(self._finish_version_check, config, servers, versions)
+            
+        except Exception as e:
+            logger.error(f"❌ Error testing scheduled version check: {str(e)}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+
+# Shared instance for every router and background task
+services.register("image_recon_service", ImageReconServiceManager)
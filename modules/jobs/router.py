@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from typing import Optional
+
+from modules.common.jobs import jobs
+
+router = APIRouter()
+
+@router.get("")
+async def list_jobs(kind: Optional[str] = None):
+    """All known background jobs (newest first), optionally filtered by kind"""
+    try:
+        return JSONResponse(content={"status": "success", "jobs": jobs.list(kind), **jobs.get_stats()})
+    except Exception as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Progress, ETA and per-item results of one job"""
+    job = jobs.get(job_id)
+    if job is None:
+        return JSONResponse(content={"status": "error", "message": f"Unknown job: {job_id}"}, status_code=404)
+    return JSONResponse(content={"status": "success", "job": job.to_dict()})
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Ask a queued or running job to stop (it finishes the item in progress first)"""
+    job = jobs.cancel(job_id)
+    if job is None:
+        return JSONResponse(content={"status": "error", "message": f"Unknown job: {job_id}"}, status_code=404)
+    return JSONResponse(content={"status": "success", "job": job.to_dict()})
@@ -1,18 +1,25 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Depends
 from fastapi.responses import JSONResponse
 from fastapi.templating import Jinja2Templates
 from .service import OSMachineService
+from modules.common.registry import services
+from modules.common.async_ssh import use_async_ssh
+from modules.common.executor import run_blocking, ExecutorBusyError
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
-service = OSMachineService()
+# One shared instance per process, resolved from the service registry (app.state.services)
+get_service = services.provider("osmachine")
+
+# Blocking service calls run on this module's executor lane
+EXECUTOR_LANE = "osmachine"
 
 @router.get("/")
-async def show_osmachine_page(request: Request):
+async def show_osmachine_page(request: Request, service: OSMachineService = Depends(get_service)):
     """Show OSMachine page"""
     try:
         # Read machines from lognavigator.xml
-        machines = service.read_machines_from_lognavigator(force_remote=False)
+        machines = await run_blocking(EXECUTOR_LANE, service.read_machines_from_lognavigator, force_remote=False)
         
         # Get filtering info
         filter_info = service.get_allowed_groups_info()
@@ -41,12 +48,14 @@ async def show_osmachine_page(request: Request):
             "filter_info": filter_info
         })
         
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         service.logger.error(f"❌ Error loading OSMachine page: {str(e)}")
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 @router.post("/check-machine-status")
-async def check_machine_status(request: Request):
+async def check_machine_status(request: Request, service: OSMachineService = Depends(get_service)):
     """Check status of a single machine"""
     try:
         data = await request.json()
@@ -55,7 +64,7 @@ async def check_machine_status(request: Request):
         if not machine_ip:
             return JSONResponse(content={"status": "error", "message": "Machine IP is required"}, status_code=400)
         
-        is_online, status_message = service.check_machine_status(machine_ip)
+        is_online, status_message = await run_blocking(EXECUTOR_LANE, service.check_machine_status, machine_ip)
         
         return JSONResponse(content={
             "status": "success",
@@ -64,6 +73,8 @@ async def check_machine_status(request: Request):
             "machine_ip": machine_ip
         })
         
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         service.logger.error(f"❌ Error checking status: {str(e)}")
         return JSONResponse(content={
@@ -74,7 +85,7 @@ async def check_machine_status(request: Request):
         }, status_code=500)
 
 @router.post("/restart-machine")
-async def restart_machine(request: Request):
+async def restart_machine(request: Request, service: OSMachineService = Depends(get_service)):
     """Restart a single machine"""
     try:
         data = await request.json()
@@ -87,7 +98,10 @@ async def restart_machine(request: Request):
         if operation_mode not in service.get_operation_modes():
             return JSONResponse(content={"status": "error", "message": f"Invalid operation mode: {operation_mode}"}, status_code=400)
         
-        success, message = service.restart_machine(machine_ip, operation_mode)
+        if use_async_ssh():
+            success, message = await service.restart_machine_async(machine_ip, operation_mode)
+        else:
+            success, message = await run_blocking(EXECUTOR_LANE, service.restart_machine, machine_ip, operation_mode)
         
         if success:
             mode_info = service.get_operation_modes()[operation_mode]
@@ -104,6 +118,8 @@ async def restart_machine(request: Request):
                 "operation_mode": operation_mode
             }, status_code=500)
             
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         service.logger.error(f"❌ Error in restart_machine: {str(e)}")
         return JSONResponse(content={
@@ -112,13 +128,16 @@ async def restart_machine(request: Request):
         }, status_code=500)
 
 @router.post("/batch-check-status")
-async def batch_check_status(request: Request):
+async def batch_check_status(request: Request, service: OSMachineService = Depends(get_service)):
     """Check status of multiple machines concurrently with caching"""
     try:
         data = await request.json()
         machines_to_check = data.get('machines', [])
-        max_concurrent = data.get('max_concurrent', 20)
+        # Optional cap; the adaptive "osm_ssh" limit applies either way
+        max_concurrent = data.get('max_concurrent')
         force_refresh = data.get('force_refresh', False)
+        full_check = data.get('full_check', False)
+        group_name = data.get('group_name')
         
         if not machines_to_check:
             return JSONResponse(content={
@@ -126,7 +145,13 @@ async def batch_check_status(request: Request):
                 "message": "No machines provided"
             }, status_code=400)
         
-        results = service.batch_check_status(machines_to_check, max_concurrent, use_cache=not force_refresh)
+        if use_async_ssh():
+            results = await service.batch_check_status_async(machines_to_check, use_cache=not force_refresh, full_check=full_check)
+        else:
+            results = await run_blocking(
+                EXECUTOR_LANE, service.batch_check_status, machines_to_check, max_concurrent,
+                use_cache=not force_refresh, full_check=full_check
+            )
         
         # Calculate health summary
         online_count = sum(1 for r in results.values() if r['status'] == 'online')
@@ -149,6 +174,8 @@ async def batch_check_status(request: Request):
             "timestamp": results[list(results.keys())[0]]['timestamp'] if results else None
         })
         
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         service.logger.error(f"❌ Error in batch_check_status: {str(e)}")
         return JSONResponse(content={
@@ -157,13 +184,15 @@ async def batch_check_status(request: Request):
         }, status_code=500)
 
 @router.post("/check-all-machines")
-async def check_all_machines(request: Request):
+async def check_all_machines(request: Request, service: OSMachineService = Depends(get_service)):
     """Check status of ALL machines with optimized performance and caching"""
     try:
         data = await request.json() if request.headers.get('content-type') == 'application/json' else {}
         force_refresh = data.get('force_refresh', False)
+        # Also log in to hosts whose SSH banner already answered (slower, verifies credentials)
+        full_check = data.get('full_check', False)
         
-        machines = service.read_machines_from_lognavigator()
+        machines = await run_blocking(EXECUTOR_LANE, service.read_machines_from_lognavigator)
         
         if not machines:
             return JSONResponse(content={
@@ -172,16 +201,18 @@ async def check_all_machines(request: Request):
             }, status_code=404)
         
         # Flatten all machines into a single list
-        all_machines = []
-        for group_name, group_machines in machines.items():
-            for machine in group_machines:
-                machine['group_name'] = group_name
-                all_machines.append(machine)
+        all_machines = [machine for group_machines in machines.values() for machine in group_machines]
         
-        service.logger.info(f"🚀 Starting bulk status check for {len(all_machines)} machines (force_refresh={force_refresh})...")
+        service.logger.info(f"🚀 Starting bulk status check for {len(all_machines)} machines (force_refresh={force_refresh}, full_check={full_check})...")
         
-        # Use high concurrency for bulk operations with caching
-        results = service.batch_check_status(all_machines, max_concurrent=30, use_cache=not force_refresh)
+        # Banner pre-scan for every host, SSH login only where needed (cached results are reused)
+        if use_async_ssh():
+            results = await service.batch_check_status_async(all_machines, use_cache=not force_refresh, full_check=full_check)
+        else:
+            results = await run_blocking(
+                EXECUTOR_LANE, service.batch_check_status, all_machines,
+                use_cache=not force_refresh, full_check=full_check
+            )
         
         # Calculate overall health
         online_count = sum(1 for r in results.values() if r['status'] == 'online')
@@ -203,7 +234,11 @@ async def check_all_machines(request: Request):
                 'error': group_error
             }
         
-        service.logger.info(f"✅ Bulk status check complete: {online_count} online, {offline_count} offline, {error_count} errors")
+        # How much of the answer came from the status store, and how old it is
+        from_store = sum(1 for r in results.values() if r['cached'])
+        oldest_age = max((r.get('cache_age_seconds', 0) for r in results.values()), default=0)
+        
+        service.logger.info(f"✅ Bulk status check complete: {online_count} online, {offline_count} offline, {error_count} errors ({from_store} from store)")
         
         return JSONResponse(content={
             "status": "success",
@@ -212,10 +247,14 @@ async def check_all_machines(request: Request):
             "offline_count": offline_count,
             "error_count": error_count,
             "group_stats": group_stats,
+            "from_store_count": from_store,
+            "oldest_result_age_seconds": oldest_age,
             "results": results,
             "timestamp": list(results.values())[0]['timestamp'] if results else None
         })
         
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         service.logger.error(f"❌ Error in check_all_machines: {str(e)}")
         return JSONResponse(content={
@@ -224,7 +263,7 @@ async def check_all_machines(request: Request):
         }, status_code=500)
 
 @router.post("/get-machine-logs")
-async def get_machine_logs(request: Request):
+async def get_machine_logs(request: Request, service: OSMachineService = Depends(get_service)):
     """Get logs from a machine"""
     try:
         data = await request.json()
@@ -235,13 +274,15 @@ async def get_machine_logs(request: Request):
         if not machine_ip:
             return JSONResponse(content={"status": "error", "message": "Machine IP is required"}, status_code=400)
         
-        result = service.get_machine_logs(machine_ip, date, lines)
+        result = await run_blocking(EXECUTOR_LANE, service.get_machine_logs, machine_ip, date, lines)
         
         if result['status'] == 'error':
             return JSONResponse(content=result, status_code=500)
         
         return JSONResponse(content=result)
         
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         service.logger.error(f"❌ Error in get_machine_logs: {str(e)}")
         return JSONResponse(content={
@@ -250,19 +291,21 @@ async def get_machine_logs(request: Request):
         }, status_code=500)
 
 @router.post("/refresh-machines")
-async def refresh_machines(request: Request):
+async def refresh_machines(request: Request, service: OSMachineService = Depends(get_service)):
     """Refresh machine list and clear cache"""
     try:
         # Clear cache when refreshing
         service.clear_status_cache()
         
-        result = service.refresh_machines()
+        result = await run_blocking(EXECUTOR_LANE, service.refresh_machines)
         
         if result['status'] == 'error':
             return JSONResponse(content=result, status_code=500)
         
         return JSONResponse(content=result)
         
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         service.logger.error(f"❌ Error refreshing machine list: {str(e)}")
         return JSONResponse(content={
@@ -271,7 +314,7 @@ async def refresh_machines(request: Request):
         }, status_code=500)
 
 @router.post("/clear-cache")
-async def clear_cache(request: Request):
+async def clear_cache(request: Request, service: OSMachineService = Depends(get_service)):
     """Clear machine status cache"""
     try:
         service.clear_status_cache()
@@ -286,8 +329,23 @@ async def clear_cache(request: Request):
             "message": str(e)
         }, status_code=500)
 
+@router.get("/status-store")
+async def status_store_stats(service: OSMachineService = Depends(get_service)):
+    """Machines in the status store, per status and per group with the age of the oldest result"""
+    try:
+        stats = await run_blocking(EXECUTOR_LANE, service.status_store.get_stats)
+        return JSONResponse(content={"status": "success", **stats})
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
+    except Exception as e:
+        service.logger.error(f"❌ Error in status_store_stats: {str(e)}")
+        return JSONResponse(content={
+            "status": "error",
+            "message": str(e)
+        }, status_code=500)
+
 @router.get("/get-operation-modes")
-async def get_operation_modes():
+async def get_operation_modes(service: OSMachineService = Depends(get_service)):
     """Get available operation modes"""
     try:
         return JSONResponse(content={
@@ -302,13 +360,14 @@ async def get_operation_modes():
         }, status_code=500)
 
 @router.post("/batch-restart")
-async def batch_restart(request: Request):
-    """Restart multiple machines in a group"""
+async def batch_restart(request: Request, service: OSMachineService = Depends(get_service)):
+    """Restart multiple machines in a group as a background job; poll /api/jobs/{job_id}"""
     try:
         data = await request.json()
         group_name = data.get('group_name')
         operation_mode = data.get('operation_mode', 'soft_restart')
-        max_concurrent = data.get('max_concurrent', 3)
+        # Optional cap; the adaptive "osm_restart" limit applies either way
+        max_concurrent = data.get('max_concurrent')
         
         if operation_mode not in service.get_operation_modes():
             return JSONResponse(content={
@@ -316,7 +375,7 @@ async def batch_restart(request: Request):
                 "message": f"Invalid operation mode: {operation_mode}"
             }, status_code=400)
         
-        machines = service.read_machines_from_lognavigator()
+        machines = await run_blocking(EXECUTOR_LANE, service.read_machines_from_lognavigator)
         
         if not machines or group_name not in machines:
             return JSONResponse(content={
@@ -324,62 +383,13 @@ async def batch_restart(request: Request):
                 "message": f"Group '{group_name}' not found"
             }, status_code=404)
         
-        group_machines = machines[group_name]
-        results = {}
-        
-        # Use ThreadPoolExecutor for concurrent restarts
-        from concurrent import futures
-        from threading import Lock
-        from datetime import datetime
-        
-        lock = Lock()
-        
-        def restart_single_machine(machine):
-            ip = machine['ip']
-            try:
-                success, message = service.restart_machine(ip, operation_mode)
-                with lock:
-                    results[ip] = {
-                        'ip': ip,
-                        'config_id': machine['config_id'],
-                        'operation_mode': operation_mode,
-                        'success': success,
-                        'message': message,
-                        'timestamp': datetime.now().isoformat()
-                    }
-            except Exception as e:
-                with lock:
-                    results[ip] = {
-                        'ip': ip,
-                        'config_id': machine['config_id'],
-                        'operation_mode': operation_mode,
-                        'success': False,
-                        'message': str(e),
-                        'timestamp': datetime.now().isoformat()
-                    }
-        
-        with futures.ThreadPoolExecutor(max_workers=max_concurrent) as executor:
-            future_list = [executor.submit(restart_single_machine, machine) for machine in group_machines]
-            futures.wait(future_list)
-        
-        # Calculate summary
-        successful = len([r for r in results.values() if r['success']])
-        failed = len([r for r in results.values() if not r['success']])
-        
-        return JSONResponse(content={
-            "status": "success",
-            "group_name": group_name,
-            "operation_mode": operation_mode,
-            "results": results,
-            "summary": {
-                "total": len(results),
-                "successful": successful,
-                "failed": failed,
-                "success_rate": round((successful / len(results) * 100), 2) if results else 0
-            },
-            "timestamp": list(results.values())[0]['timestamp'] if results else None
-        })
+        result = service.start_batch_restart_job(
+            group_name, machines[group_name], operation_mode, max_concurrent, async_mode=use_async_ssh()
+        )
+        return JSONResponse(content=result)
         
+    except ExecutorBusyError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=503)
     except Exception as e:
         service.logger.error(f"❌ Error in batch_restart: {str(e)}")
         return JSONResponse(content={
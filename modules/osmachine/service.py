@@ -1,12 +1,24 @@
 import os
+import asyncio
+import filecmp
 import logging
+import shutil
 import socket
+import time
 import paramiko
 from typing import Dict, List, Optional
 from datetime import datetime
-from lxml import etree
 from concurrent import futures
 from logging.handlers import RotatingFileHandler
+from config import settings
+from modules.common.async_ssh import async_ssh_runner, use_async_ssh
+from modules.common.executor import run_blocking
+from modules.common.concurrency import limiters
+from modules.common.tcp_probe import probe_many, ProbeResult, SSH_READY, UNREACHABLE
+from modules.common.registry import services
+from modules.common.jobs import jobs, Job
+from modules.common.inventory import inventory, Inventory, LOGNAVIGATOR, LOGNAV_LOCAL_DIR, LOGNAV_LOCAL_FILE
+from .status_store import MachineStatusStore
 
 # Setup dedicated logger
 def setup_osmachine_logger():
@@ -56,25 +68,8 @@ SSH_CONFIG = {
     'connect_timeout': 5
 }
 
-# Path to lognavigator.xml
-REMOTE_LOGNAV_DIR = "/opt/compose-conf/lognavigator"
-REMOTE_LOGNAV_FILE = os.path.join(REMOTE_LOGNAV_DIR, 'lognavigator.xml')
-LOCAL_CACHE_DIR = "./config/lognavigator"
-LOCAL_CACHE_FILE = os.path.join(LOCAL_CACHE_DIR, 'lognavigator.xml')
-
-# Allowed groups for machine restart functionality
-ALLOWED_GROUPS = [
-    'OSM_CP',
-    'OSM_TBP',
-    'OSM_TBR',
-    'OSM_WF',
-    'OSM_NCH',
-    'OSM_DHS',
-    'OSM_MDR',
-    'OSM_NP',
-    'OSM_LUCKYLINK',
-    'LUCKYLINK_NCH'
-]
+# Allowed groups for machine restart functionality (only these are loaded from lognavigator.xml)
+ALLOWED_GROUPS = settings.OSMACHINE_ALLOWED_GROUPS
 
 # Group categorization - All in one OSM Production category
 GROUP_CATEGORIES = {
@@ -114,15 +109,25 @@ OPERATION_MODES = {
     }
 }
 
+# Background status prober: scheduler tick and lease (one prober across all worker processes)
+PROBER_TICK = 5
+PROBER_LEASE = "status_prober"
+PROBER_LEASE_TTL = 60
+# While a group is being probed the lease is renewed this often (seconds), however long the probe takes
+PROBER_LEASE_RENEW = 20
+
 class OSMachineService:
     def __init__(self):
         self.logger = logger
         self.logger.info("🚀 OSMachine service initialized")
         
-        # Cache for machine status (10 minute TTL)
-        self._status_cache = {}
-        self._status_cache_time = {}
-        self._status_cache_ttl = 600  # 10 minutes in seconds
+        # Last known machine status, shared by all workers and kept fresh by the background prober
+        self.status_store = MachineStatusStore(settings.OSMACHINE_STATUS_DB)
+        self._status_max_age = settings.OSMACHINE_STATUS_MAX_AGE
+        
+        # Machines come from the shared fleet inventory (lognavigator.xml, re-parsed only when it changes)
+        inventory.subscribe(LOGNAVIGATOR, self._on_lognavigator_change)
+        self._on_lognavigator_change(inventory.os_machines)
     
     def is_group_allowed(self, group_name: str) -> bool:
         """Check if a group is in the allowed list"""
@@ -149,154 +154,47 @@ class OSMachineService:
         
         return categorized_machines
     
-    def fetch_xml_from_filesystem(self) -> Optional[str]:
-        """Fetch lognavigator.xml from local filesystem"""
-        try:
-            possible_paths = [
-                REMOTE_LOGNAV_FILE,
-                "/compose-conf/lognavigator/lognavigator.xml",
-                "/opt/compose-conf/web/config/lognavigator/lognavigator.xml",
-                "/var/log/lognavigator/lognavigator.xml",
-                "/etc/lognavigator/lognavigator.xml"
-            ]
-            
-            self.logger.info("🔍 Attempting to read lognavigator.xml from local filesystem")
-            
-            for file_path in possible_paths:
-                if os.path.exists(file_path):
-                    self.logger.info(f"✅ Found XML file at: {file_path}")
-                    
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        xml_content = f.read()
-                    
-                    if xml_content:
-                        xml_size = len(xml_content)
-                        self.logger.info(f"✅ Successfully read lognavigator.xml ({xml_size} bytes)")
-                        machine_count = xml_content.count('<log-access-config')
-                        self.logger.info(f"🔢 Found approximately {machine_count} machine entries in XML")
-                        return xml_content
-                    else:
-                        self.logger.warning(f"⚠️ File exists but is empty: {file_path}")
-            
-            self.logger.error("❌ XML file not found in any of the expected locations")
-            return None
-                
-        except Exception as e:
-            self.logger.error(f"❌ Failed to read XML from filesystem: {str(e)}")
-            return None
-    
     def read_machines_from_lognavigator(self, force_remote: bool = False) -> Dict:
-        """Read machine IPs and configurations from lognavigator.xml with filtering"""
-        try:
-            self.logger.info(f"🔍 Starting read_machines_from_lognavigator (force_remote={force_remote})")
-            
-            xml_content = None
-            if not force_remote and os.path.exists(LOCAL_CACHE_FILE):
-                try:
-                    with open(LOCAL_CACHE_FILE, 'r', encoding='utf-8') as f:
-                        xml_content = f.read()
-                    self.logger.info(f"📋 Using cached lognavigator.xml from: {LOCAL_CACHE_FILE}")
-                except Exception as e:
-                    self.logger.warning(f"⚠️ Failed to read cached XML: {str(e)}")
-            
-            if not xml_content:
-                self.logger.info(f"🔄 Fetching lognavigator.xml from filesystem: {REMOTE_LOGNAV_FILE}")
-                xml_content = self.fetch_xml_from_filesystem()
-                
-                if not xml_content:
-                    self.logger.error("❌ Failed to fetch lognavigator.xml")
-                    return {}
-                
-                # Cache the XML content
-                try:
-                    os.makedirs(LOCAL_CACHE_DIR, exist_ok=True)
-                    with open(LOCAL_CACHE_FILE, 'w', encoding='utf-8') as f:
-                        f.write(xml_content)
-                    self.logger.info(f"💾 Cached lognavigator.xml to: {LOCAL_CACHE_FILE}")
-                except Exception as e:
-                    self.logger.warning(f"⚠️ Failed to cache XML: {str(e)}")
-            
-            # Parse the XML content
-            self.logger.info(f"🔍 Parsing XML content ({len(xml_content)} bytes)")
+        """Machines of the allowed groups from lognavigator.xml, by display group (shared inventory dicts - do not mutate)"""
+        if force_remote:
+            self.logger.info("🔄 Re-reading lognavigator.xml")
+            machines = inventory.reload(LOGNAVIGATOR, force=True)
+        else:
+            machines = inventory.os_machines
+        
+        # The inventory only holds the allowed groups (filtered while parsing)
+        return {group: machines.find_dicts('display_group', group) for group in machines.keys('display_group')}
+    
+    def _on_lognavigator_change(self, machines: Inventory):
+        """Log the filtering result, keep a local copy of the live lognavigator.xml and forget machines that are gone"""
+        group_counts = machines.stats.get('group_counts', {})
+        total_machines = machines.stats.get('total_entries', len(machines))
+        allowed_total = sum(count for group, count in group_counts.items() if self.is_group_allowed(group))
+        self.logger.info(f"📋 Machine filtering results:")
+        self.logger.info(f"   - Total machines in XML: {total_machines}")
+        self.logger.info(f"   - Filtered machines (allowed): {allowed_total}")
+        self.logger.info(f"   - Excluded machines: {total_machines - allowed_total}")
+        self.logger.info(f"   - All unique groups found in XML: {sorted(group for group in group_counts if group != 'Unknown')}")
+        self.logger.info(f"   - Allowed groups configured: {ALLOWED_GROUPS}")
+        self.logger.info(f"   - Allowed groups found: {machines.keys('display_group')}")
+        self.logger.info(f"   - Total machines added to result: {len(machines)}")
+        if total_machines and not len(machines):
+            self.logger.error("❌ No machines found after filtering! Check if allowed groups match XML groups.")
+        
+        source_path = inventory.path(LOGNAVIGATOR)
+        if (source_path and source_path != os.path.abspath(LOGNAV_LOCAL_FILE)
+                and not (os.path.exists(LOGNAV_LOCAL_FILE) and filecmp.cmp(source_path, LOGNAV_LOCAL_FILE, shallow=False))):
             try:
-                root = etree.fromstring(xml_content.encode('utf-8'))
-            except Exception as xml_parse_error:
-                self.logger.error(f"❌ Failed to parse XML content: {str(xml_parse_error)}")
-                return {}
-            
-            machines = {}
-            total_machines = 0
-            filtered_machines = 0
-            all_groups_found = set()
-            
-            # Find all log-access-config elements
-            for config in root.findall('.//log-access-config'):
-                config_id = config.get('id', 'Unknown')
-                url = config.get('url', '')
-                
-                # Try different attribute names for display group
-                display_group = config.get('display-group', None)
-                if not display_group:
-                    display_group = config.get('displayGroup', None)
-                if not display_group:
-                    display_group = config.get('display_group', None)
-                if not display_group:
-                    display_group = 'Unknown'
-                
-                # Track all groups found for debugging
-                if display_group != 'Unknown':
-                    all_groups_found.add(display_group)
-                
-                total_machines += 1
-                
-                # Debug: Log first 3 machines to see what we're getting
-                if total_machines <= 3:
-                    self.logger.info(f"📋 Sample machine {total_machines}: config_id={config_id}, display_group={display_group}, url={url}")
-                
-                # Filter: Only include machines from allowed groups
-                if not self.is_group_allowed(display_group):
-                    continue
-                
-                filtered_machines += 1
-                
-                # Extract IP from URL
-                ip = url.replace('http://', '').replace('https://', '').replace(':80', '').replace(':443', '')
-                if ':' in ip:
-                    ip = ip.split(':')[0]
-                
-                # Debug: Log if IP extraction failed
-                if not ip or ip == 'Unknown':
-                    self.logger.warning(f"⚠️ Skipping machine {config_id} in group {display_group} - invalid IP from URL: {url}")
-                    continue
-                
-                if display_group not in machines:
-                    machines[display_group] = []
-                
-                machines[display_group].append({
-                    'ip': ip,
-                    'config_id': config_id,
-                    'display_group': display_group,
-                    'url': url,
-                    'status': 'unknown'
-                })
-            
-            self.logger.info(f"📋 Machine filtering results:")
-            self.logger.info(f"   - Total machines in XML: {total_machines}")
-            self.logger.info(f"   - Filtered machines (allowed): {filtered_machines}")
-            self.logger.info(f"   - Excluded machines: {total_machines - filtered_machines}")
-            self.logger.info(f"   - All unique groups found in XML: {sorted(list(all_groups_found))}")
-            self.logger.info(f"   - Allowed groups configured: {ALLOWED_GROUPS}")
-            self.logger.info(f"   - Allowed groups found: {list(machines.keys())}")
-            self.logger.info(f"   - Total machines added to result: {sum(len(m) for m in machines.values())}")
-            
-            if not machines:
-                self.logger.error("❌ No machines found after filtering! Check if allowed groups match XML groups.")
-            
-            return machines
-            
-        except Exception as e:
-            self.logger.error(f"❌ Error reading lognavigator.xml: {str(e)}")
-            return {}
+                os.makedirs(LOGNAV_LOCAL_DIR, exist_ok=True)
+                tmp_path = f"{LOGNAV_LOCAL_FILE}.tmp"
+                shutil.copyfile(source_path, tmp_path)
+                os.replace(tmp_path, LOGNAV_LOCAL_FILE)
+                self.logger.info(f"💾 Cached lognavigator.xml to: {LOGNAV_LOCAL_FILE}")
+            except Exception as e:
+                self.logger.warning(f"⚠️ Failed to cache XML: {str(e)}")
+        
+        if inventory.path(LOGNAVIGATOR) is not None:
+            self.status_store.retain(machine.ip for machine in machines)
     
     def check_machine_status_fast(self, ip: str, timeout: int = 3) -> str:
         """Fast status check with shorter timeout for bulk operations"""
@@ -364,71 +262,208 @@ class OSMachineService:
                 return False, "Connection timeout"
             return False, f"Error: {error_msg}"
     
-    def batch_check_status(self, machines: List[Dict], max_concurrent: int = 20, use_cache: bool = True) -> Dict:
-        """Check status of multiple machines concurrently with caching"""
+    def batch_check_status(self, machines: List[Dict], max_concurrent: Optional[int] = None, use_cache: bool = True,
+                           full_check: bool = False) -> Dict:
+        """Check status of multiple machines with caching: TCP/banner pre-scan, then SSH login where needed.
+        
+        Logins run at the adaptive "osm_ssh" limit (``max_concurrent`` only caps it).
+        """
         from threading import Lock
-        import time
         
-        results = {}
         lock = Lock()
-        machines_to_check = []
-        current_time = time.time()
+        results, machines_to_check = self._split_cached_status(machines, use_cache)
+        if not machines_to_check:
+            return results
         
-        # Check cache first
-        for machine in machines:
-            ip = machine['ip']
-            
-            if use_cache and ip in self._status_cache:
-                cache_age = current_time - self._status_cache_time.get(ip, 0)
-                
-                if cache_age < self._status_cache_ttl:
-                    # Use cached result
-                    cached_result = self._status_cache[ip].copy()
-                    cached_result['cached'] = True
-                    cached_result['cache_age_seconds'] = int(cache_age)
-                    results[ip] = cached_result
-                    continue
-            
-            # Need to check this machine
-            machines_to_check.append(machine)
+        # Stage one: concurrent TCP connect + SSH banner (this runs on an executor thread, so no loop is running)
+        probes = asyncio.run(self._prescan(machines_to_check))
+        machines_to_login = self._apply_prescan(machines_to_check, probes, results, full_check)
         
-        self.logger.info(f"📊 Batch status check: {len(machines)} total, {len(results)} from cache, {len(machines_to_check)} to check")
+        # Stage two: full SSH login for the hosts that still need one
+        limiter = limiters.get("osm_ssh")
+        login = limiter.wrap(self.check_machine_status_fast, is_error=lambda status: status == 'error')
         
-        # Check remaining machines
         def check_single_machine(machine):
-            ip = machine['ip']
             try:
-                status = self.check_machine_status_fast(ip)
+                status = login(machine['ip'])
             except Exception:
                 status = 'error'
             
-            result = {
-                'ip': ip,
-                'config_id': machine['config_id'],
-                'display_group': machine['display_group'],
-                'status': status,
-                'timestamp': datetime.now().isoformat(),
-                'cached': False
-            }
-            
             with lock:
-                results[ip] = result
-                # Update cache
-                self._status_cache[ip] = result.copy()
-                self._status_cache_time[ip] = time.time()
+                results[machine['ip']] = self._record_status(machine, status, check='ssh_login')
         
-        if machines_to_check:
-            with futures.ThreadPoolExecutor(max_workers=max_concurrent) as executor:
-                future_list = [executor.submit(check_single_machine, machine) for machine in machines_to_check]
+        if machines_to_login:
+            with futures.ThreadPoolExecutor(max_workers=max_concurrent or limiter.max_limit) as executor:
+                future_list = [executor.submit(check_single_machine, machine) for machine in machines_to_login]
                 futures.wait(future_list)
         
+        self._store_checked(results)
+        return results
+    
+    async def _prescan(self, machines: List[Dict]) -> Dict[str, ProbeResult]:
+        return await probe_many(
+            [machine['ip'] for machine in machines], port=SSH_CONFIG['port'],
+            timeout=settings.OSMACHINE_PROBE_TIMEOUT, concurrency=settings.OSMACHINE_PROBE_CONCURRENCY
+        )
+    
+    def _apply_prescan(self, machines: List[Dict], probes: Dict[str, ProbeResult], results: Dict,
+                       full_check: bool) -> List[Dict]:
+        """Record the machines the pre-scan settles; return those that still need an SSH login.
+        
+        Unreachable hosts are 'error' (as a failed login was before) and hosts with an SSH
+        banner are 'online'. Hosts that accepted the connection without a banner - or every
+        reachable host when ``full_check`` is set - go on to the login check.
+        """
+        machines_to_login = []
+        for machine in machines:
+            probe = probes.get(machine['ip'])
+            if probe is None or probe.state == UNREACHABLE:
+                results[machine['ip']] = self._record_status(
+                    machine, 'error', check='tcp', detail=probe.error if probe else None,
+                    latency_ms=probe.latency_ms if probe else None
+                )
+            elif probe.state == SSH_READY and not full_check:
+                results[machine['ip']] = self._record_status(
+                    machine, 'online', check='ssh_banner', detail=probe.banner, latency_ms=probe.latency_ms
+                )
+            else:
+                machines_to_login.append(machine)
+        
+        self.logger.info(f"📡 Pre-scan: {len(machines) - len(machines_to_login)} settled, "
+                         f"{len(machines_to_login)} need an SSH login (full_check={full_check})")
+        return machines_to_login
+    
+    def _split_cached_status(self, machines: List[Dict], use_cache: bool) -> tuple:
+        """Return (results served from the status store, machines that still need a check)"""
+        results = self.status_store.get_many(
+            (machine['ip'] for machine in machines), max_age=self._status_max_age
+        ) if use_cache else {}
+        machines_to_check = [machine for machine in machines if machine['ip'] not in results]
+        
+        self.logger.info(f"📊 Batch status check: {len(machines)} total, {len(results)} from store, {len(machines_to_check)} to check")
+        return results, machines_to_check
+    
+    def _record_status(self, machine: Dict, status: str, check: str = 'ssh_login', detail: Optional[str] = None,
+                       latency_ms: Optional[float] = None) -> Dict:
+        """Build a status result for a freshly checked machine (stored by the batch that checked it)"""
+        return {
+            'ip': machine['ip'],
+            'config_id': machine['config_id'],
+            'display_group': machine['display_group'],
+            'status': status,
+            'check': check,
+            'detail': detail,
+            'latency_ms': latency_ms,
+            'timestamp': datetime.now().isoformat(),
+            'cached': False
+        }
+    
+    def _store_checked(self, results: Dict):
+        """Save the freshly checked results of a batch to the status store"""
+        self.status_store.put_many(result for result in results.values() if not result['cached'])
+    
+    async def check_machine_status_fast_async(self, ip: str, timeout: int = 3) -> str:
+        """asyncssh counterpart of check_machine_status_fast"""
+        try:
+            exit_status, output, error = await async_ssh_runner.run(
+                ip, SSH_CONFIG['username'], 'echo "test"',
+                password=SSH_CONFIG['password'], port=SSH_CONFIG['port'],
+                connect_timeout=timeout, timeout=2, keep_connection=False
+            )
+            return 'online' if exit_status == 0 else 'offline'
+        except Exception:
+            return 'error'
+    
+    async def batch_check_status_async(self, machines: List[Dict], use_cache: bool = True,
+                                       full_check: bool = False) -> Dict:
+        """asyncssh counterpart of batch_check_status (logins at the adaptive "osm_ssh" limit)"""
+        results, machines_to_check = self._split_cached_status(machines, use_cache)
+        if not machines_to_check:
+            return results
+        
+        probes = await self._prescan(machines_to_check)
+        machines_to_login = self._apply_prescan(machines_to_check, probes, results, full_check)
+        
+        login = limiters.get("osm_ssh").wrap_async(
+            self.check_machine_status_fast_async, is_error=lambda status: status == 'error'
+        )
+        statuses = await asyncio.gather(*(login(machine['ip']) for machine in machines_to_login))
+        for machine, status in zip(machines_to_login, statuses):
+            results[machine['ip']] = self._record_status(machine, status, check='ssh_login')
+        
+        self._store_checked(results)
         return results
     
     def clear_status_cache(self):
-        """Clear the machine status cache"""
-        self._status_cache.clear()
-        self._status_cache_time.clear()
-        self.logger.info("🗑️ Machine status cache cleared")
+        """Clear the machine status store"""
+        self.status_store.clear()
+        self.logger.info("🗑️ Machine status store cleared")
+    
+    def _probe_interval(self, group_name: str) -> int:
+        return settings.OSMACHINE_PROBE_GROUP_INTERVALS.get(group_name, settings.OSMACHINE_PROBE_INTERVAL)
+    
+    async def run_status_prober(self):
+        """Background loop: re-check every allowed group at its cadence and write the results to the status store.
+        
+        Only the process holding the prober lease probes, so several uvicorn workers don't repeat the work.
+        """
+        owner = f"{socket.gethostname()}:{os.getpid()}"
+        # Earliest next attempt per group in this process, so a group whose probe fails isn't retried every tick
+        retry_at: Dict[str, float] = {}
+        self.logger.info(f"📡 Status prober started (default every {settings.OSMACHINE_PROBE_INTERVAL}s)")
+        try:
+            while True:
+                try:
+                    # Renewed every tick, so the lease doesn't lapse between probe rounds
+                    if self.status_store.acquire_lease(PROBER_LEASE, owner, PROBER_LEASE_TTL):
+                        await self._probe_due_groups(owner, retry_at)
+                except Exception as e:
+                    self.logger.error(f"❌ Status prober error: {str(e)}")
+                await asyncio.sleep(PROBER_TICK)
+        finally:
+            self.status_store.release_lease(PROBER_LEASE, owner)
+    
+    async def _probe_due_groups(self, owner: str, retry_at: Dict[str, float]):
+        """Probe the groups whose stored results are older than their interval (or incomplete).
+        
+        Due groups come from the store, not from this process's memory, so a worker taking
+        over the lease continues the previous owner's schedule instead of probing everything.
+        """
+        progress = self.status_store.group_progress()
+        now = time.time()
+        for group_name, group_machines in self.read_machines_from_lognavigator().items():
+            stored = progress.get(group_name)
+            if (stored and stored["machines"] >= len(group_machines)
+                    and now - stored["oldest_checked_at"] < self._probe_interval(group_name)):
+                continue
+            if retry_at.get(group_name, 0) > time.monotonic():
+                continue
+            retry_at[group_name] = time.monotonic() + self._probe_interval(group_name)
+            if not self.status_store.acquire_lease(PROBER_LEASE, owner, PROBER_LEASE_TTL):
+                return
+            
+            start = time.monotonic()
+            # Keep the lease while the group is probed (slow SSH logins can take longer than the TTL)
+            renewal = asyncio.create_task(self._renew_prober_lease(owner))
+            try:
+                if use_async_ssh():
+                    results = await self.batch_check_status_async(group_machines, use_cache=False)
+                else:
+                    results = await run_blocking("osmachine", self.batch_check_status, group_machines, use_cache=False)
+            finally:
+                renewal.cancel()
+            online = sum(1 for result in results.values() if result['status'] == 'online')
+            self.logger.info(f"📡 Probed {group_name}: {online}/{len(results)} online in {time.monotonic() - start:.1f}s")
+    
+    async def _renew_prober_lease(self, owner: str):
+        """Renew the prober lease every PROBER_LEASE_RENEW seconds until cancelled"""
+        while True:
+            await asyncio.sleep(PROBER_LEASE_RENEW)
+            try:
+                if not self.status_store.acquire_lease(PROBER_LEASE, owner, PROBER_LEASE_TTL):
+                    self.logger.warning("⚠️ Status prober lease taken over by another worker during a probe")
+            except Exception as e:
+                self.logger.error(f"❌ Status prober lease renewal failed: {str(e)}")
     
     def restart_machine(self, ip: str, operation_mode: str = 'soft_restart') -> tuple:
         """Restart a machine via SSH with different operation modes"""
@@ -470,6 +505,119 @@ class OSMachineService:
             self.logger.error(f"❌ Error {operation_mode} on machine {ip}: {str(e)}")
             return False, f"Error: {str(e)}"
     
+    async def restart_machine_async(self, ip: str, operation_mode: str = 'soft_restart') -> tuple:
+        """asyncssh counterpart of restart_machine"""
+        try:
+            if operation_mode not in OPERATION_MODES:
+                self.logger.error(f"❌ Invalid operation mode: {operation_mode}")
+                return False, f"Invalid operation mode: {operation_mode}"
+            
+            mode_info = OPERATION_MODES[operation_mode]
+            self.logger.info(f"{mode_info['icon']} Attempting {mode_info['name']} on machine: {ip}")
+            
+            exit_status, output, error_output = await async_ssh_runner.run(
+                ip, SSH_CONFIG['username'], mode_info['command'],
+                password=SSH_CONFIG['password'], port=SSH_CONFIG['port'],
+                connect_timeout=SSH_CONFIG['timeout'], timeout=30, keep_connection=False
+            )
+            
+            if exit_status == 0:
+                self.logger.info(f"✅ Successfully initiated {mode_info['name']} for machine: {ip}")
+                return True, f"{mode_info['name']} command sent successfully"
+            else:
+                self.logger.error(f"❌ Failed to {mode_info['name'].lower()} machine {ip}: {error_output}")
+                return False, f"{mode_info['name']} failed: {error_output}"
+                
+        except Exception as e:
+            self.logger.error(f"❌ Error {operation_mode} on machine {ip}: {str(e)}")
+            return False, f"Error: {str(e)}"
+    
+    def start_batch_restart_job(self, group_name: str, machines: List[Dict], operation_mode: str = 'soft_restart',
+                                max_concurrent: Optional[int] = None, async_mode: bool = False) -> Dict:
+        """Restart every machine of a group as a background job; poll /api/jobs/{job_id}"""
+        if async_mode:
+            async def run(job: Job) -> Dict:
+                return await self.batch_restart_async(group_name, machines, operation_mode, max_concurrent, job)
+        else:
+            def run(job: Job) -> Dict:
+                return self.batch_restart(group_name, machines, operation_mode, max_concurrent, job)
+        
+        mode_name = OPERATION_MODES[operation_mode]['name']
+        job, created = jobs.submit(
+            "osmachine.batch_restart", run,
+            title=f"{mode_name} of {len(machines)} machines in {group_name}",
+            total=len(machines),
+            params={"group_name": group_name, "operation_mode": operation_mode, "max_concurrent": max_concurrent},
+            dedupe_key=("osmachine.batch_restart", group_name)
+        )
+        return {"status": "success", "already_running": not created, "job_id": job.id, "job": job.to_dict()}
+    
+    def batch_restart(self, group_name: str, machines: List[Dict], operation_mode: str = 'soft_restart',
+                      max_concurrent: Optional[int] = None, job: Optional[Job] = None) -> Dict:
+        """Restart machines at the adaptive "osm_restart" limit (at most ``max_concurrent`` at a time, if given)"""
+        results = {}
+        limiter = limiters.get("osm_restart")
+        restart = limiter.wrap(self.restart_machine, is_error=lambda result: not result[0])
+        
+        def restart_single_machine(machine):
+            if job and job.cancelled:
+                return
+            success, message = restart(machine['ip'], operation_mode)
+            results[machine['ip']] = self._batch_restart_result(machine, operation_mode, success, message, job)
+        
+        with futures.ThreadPoolExecutor(max_workers=max(1, max_concurrent or limiter.max_limit)) as executor:
+            list(executor.map(restart_single_machine, machines))
+        return self._batch_restart_summary(group_name, operation_mode, results)
+    
+    async def batch_restart_async(self, group_name: str, machines: List[Dict], operation_mode: str = 'soft_restart',
+                                  max_concurrent: Optional[int] = None, job: Optional[Job] = None) -> Dict:
+        """asyncssh counterpart of batch_restart"""
+        results = {}
+        limiter = limiters.get("osm_restart")
+        semaphore = asyncio.Semaphore(max(1, max_concurrent or limiter.max_limit))
+        restart = limiter.wrap_async(self.restart_machine_async, is_error=lambda result: not result[0])
+        
+        async def restart_single_machine(machine):
+            async with semaphore:
+                if job and job.cancelled:
+                    return
+                success, message = await restart(machine['ip'], operation_mode)
+            results[machine['ip']] = self._batch_restart_result(machine, operation_mode, success, message, job)
+        
+        await asyncio.gather(*(restart_single_machine(machine) for machine in machines))
+        return self._batch_restart_summary(group_name, operation_mode, results)
+    
+    def _batch_restart_result(self, machine: Dict, operation_mode: str, success: bool, message: str,
+                              job: Optional[Job]) -> Dict:
+        result = {
+            'ip': machine['ip'],
+            'config_id': machine['config_id'],
+            'operation_mode': operation_mode,
+            'success': success,
+            'message': message,
+            'timestamp': datetime.now().isoformat()
+        }
+        if job:
+            job.advance(result, ok=success)
+        return result
+    
+    def _batch_restart_summary(self, group_name: str, operation_mode: str, results: Dict) -> Dict:
+        successful = len([r for r in results.values() if r['success']])
+        failed = len([r for r in results.values() if not r['success']])
+        self.logger.info(f"📊 Batch restart of {group_name}: {successful} successful, {failed} failed")
+        return {
+            "status": "success",
+            "group_name": group_name,
+            "operation_mode": operation_mode,
+            "summary": {
+                "total": len(results),
+                "successful": successful,
+                "failed": failed,
+                "success_rate": round((successful / len(results) * 100), 2) if results else 0
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+    
     def get_machine_logs(self, ip: str, date: str = None, lines: int = 100) -> Dict:
         """Get logs from a specific machine"""
         try:
@@ -579,14 +727,6 @@ class OSMachineService:
                 }
             
             # Production mode - read from XML
-            if os.path.exists(LOCAL_CACHE_FILE):
-                try:
-                    os.remove(LOCAL_CACHE_FILE)
-                    self.logger.info("🗑️ Removed local XML cache to force refresh")
-                except Exception as e:
-                    self.logger.warning(f"⚠️ Failed to remove cache: {str(e)}")
-            
-            self.logger.info("🔄 Forcing remote fetch of lognavigator.xml")
             machines_by_group = self.read_machines_from_lognavigator(force_remote=True)
             
             if not machines_by_group:
@@ -631,3 +771,7 @@ class OSMachineService:
             'total_allowed': len(ALLOWED_GROUPS),
             'group_categories': GROUP_CATEGORIES
         }
+
+
+# Shared instance for every router and background task
+services.register("osmachine", OSMachineService)
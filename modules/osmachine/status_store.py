@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger('osmachine')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS machine_status (
+    ip TEXT PRIMARY KEY,
+    config_id TEXT,
+    display_group TEXT,
+    status TEXT NOT NULL,
+    check_kind TEXT,
+    detail TEXT,
+    latency_ms REAL,
+    checked_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS machine_status_group ON machine_status (display_group);
+CREATE TABLE IF NOT EXISTS lease (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+COLUMNS = ("ip", "config_id", "display_group", "status", "check_kind", "detail", "latency_ms", "checked_at")
+
+
+class MachineStatusStore:
+    """Last known status per machine, in a local SQLite database (WAL mode).
+
+    The file is shared by every uvicorn worker: WAL lets readers run while
+    one writer commits. Each thread gets its own connection. A small lease
+    table lets exactly one process own the background prober at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_result(row: sqlite3.Row, now: float) -> Dict:
+        """Row in the status result shape used by the API, plus its age"""
+        age = max(0.0, now - row["checked_at"])
+        return {
+            "ip": row["ip"],
+            "config_id": row["config_id"],
+            "display_group": row["display_group"],
+            "status": row["status"],
+            "check": row["check_kind"],
+            "detail": row["detail"],
+            "latency_ms": row["latency_ms"],
+            "timestamp": datetime.fromtimestamp(row["checked_at"]).isoformat(),
+            "cached": True,
+            "cache_age_seconds": int(age)
+        }
+
+    def put_many(self, results: Iterable[Dict]):
+        """Store freshly checked results (one transaction)"""
+        now = time.time()
+        rows = [
+            (r["ip"], r.get("config_id"), r.get("display_group"), r["status"], r.get("check"),
+             r.get("detail"), r.get("latency_ms"), r.get("checked_at", now))
+            for r in results
+        ]
+        if not rows:
+            return
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO machine_status ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                rows
+            )
+
+    def get_many(self, ips: Iterable[str], max_age: Optional[float] = None) -> Dict[str, Dict]:
+        """Stored results for ``ips`` (only those younger than ``max_age`` seconds, if given)"""
+        now = time.time()
+        oldest = now - max_age if max_age is not None else 0
+        wanted = set(ips)
+        results = {}
+        for row in self._connect().execute("SELECT * FROM machine_status WHERE checked_at >= ?", (oldest,)):
+            if row["ip"] in wanted:
+                results[row["ip"]] = self._to_result(row, now)
+        return results
+
+    def group_progress(self) -> Dict[str, Dict]:
+        """Per display group: stored machines and the oldest check time (used to tell which groups are due)"""
+        rows = self._connect().execute(
+            "SELECT display_group, COUNT(*) AS n, MIN(checked_at) AS oldest FROM machine_status GROUP BY display_group"
+        ).fetchall()
+        return {row["display_group"]: {"machines": row["n"], "oldest_checked_at": row["oldest"]} for row in rows}
+
+    def retain(self, ips: Iterable[str]):
+        """Forget every machine not in ``ips`` (no longer in lognavigator.xml)"""
+        keep = set(ips)
+        conn = self._connect()
+        stale = [(row["ip"],) for row in conn.execute("SELECT ip FROM machine_status") if row["ip"] not in keep]
+        if stale:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany("DELETE FROM machine_status WHERE ip = ?", stale)
+            logger.info(f"🗑️ Removed {len(stale)} machines no longer in lognavigator.xml from the status store")
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM machine_status")
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Take or renew lease ``name`` for ``ttl`` seconds; False while another owner holds it"""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO lease (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE lease.owner = excluded.owner OR lease.expires_at < ?",
+                (name, owner, now + ttl, now)
+            )
+            row = conn.execute("SELECT owner FROM lease WHERE name = ?", (name,)).fetchone()
+        return row is not None and row["owner"] == owner
+
+    def release_lease(self, name: str, owner: str):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM lease WHERE name = ? AND owner = ?", (name, owner))
+
+    def get_stats(self) -> Dict:
+        now = time.time()
+        stats = {"path": self.path, "machines": 0, "by_status": {}, "by_group": {}}
+        rows = self._connect().execute(
+            "SELECT display_group, status, COUNT(*) AS n, MIN(checked_at) AS oldest, MAX(checked_at) AS newest "
+            "FROM machine_status GROUP BY display_group, status"
+        ).fetchall()
+        for row in rows:
+            stats["machines"] += row["n"]
+            stats["by_status"][row["status"]] = stats["by_status"].get(row["status"], 0) + row["n"]
+            group = stats["by_group"].setdefault(row["display_group"], {"machines": 0, "oldest_age_seconds": 0})
+            group["machines"] += row["n"]
+            group["oldest_age_seconds"] = max(group["oldest_age_seconds"], int(now - row["oldest"]))
+        return stats
@@ -298,17 +298,7 @@ async function executeConfiguration(devices) {
     showProgressModal('Configuring Devices', 'Starting TRTC configuration...');
     
     try {
-        const response = await fetch('/cctv-tools/configure-devices', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                devices: devicesToConfig
-            })
-        });
-        
-        const data = await response.json();
+        const data = await streamDeviceResults('/cctv-tools/configure-devices', devicesToConfig);
         
         // Always hide progress modal before showing results or errors
         hideProgressModal();
@@ -381,17 +371,7 @@ async function checkStatus() {
     showProgressModal('Checking Status', 'Checking device status...');
     
     try {
-        const response = await fetch('/cctv-tools/check-status', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                devices: uploadedDevices
-            })
-        });
-        
-        const data = await response.json();
+        const data = await streamDeviceResults('/cctv-tools/check-status', uploadedDevices);
         
         console.log('✅ Check status response:', data);
         console.log(`📊 Results: ${data.results?.length || 0} devices processed`);
@@ -544,16 +524,14 @@ function showProgressModal(title, message) {
     progressFill.style.animation = 'none'; // Remove pulse animation
     
     const total = uploadedDevices.length;
-    const batchSize = 10;
-    const totalBatches = Math.ceil(total / batchSize);
     
-    // Initialize with batch processing animation instead of static stats
+    // Initialize with processing animation instead of static stats
     if (progressStats) {
         progressStats.innerHTML = `
             <div class="batch-progress-container">
                 <div class="batch-info">
-                    <div class="batch-label">Processing in batches of ${batchSize}</div>
-                    <div class="batch-status" id="batchStatus">Starting batch 1 of ${totalBatches}...</div>
+                    <div class="batch-label">Each device starts as soon as a worker is free</div>
+                    <div class="batch-status" id="batchStatus">Starting...</div>
                 </div>
                 <div class="batch-animation" id="batchAnimation">
                     <div class="batch-dots">
@@ -575,26 +553,15 @@ function showProgressModal(title, message) {
     
     modal.style.display = 'block';
     
-    // Simulate batch progress animation
+    // Simulated progress until the first real result arrives (see updateStreamProgress)
     let progress = 10;
-    let currentBatch = 1;
     const progressInterval = setInterval(() => {
         progress += Math.random() * 15;
         if (progress > 90) progress = 90; // Cap at 90% until real results come back
         progressFill.style.width = progress + '%';
         
-        // Calculate current batch based on progress
-        const estimatedBatch = Math.min(Math.floor((progress / 100) * totalBatches) + 1, totalBatches);
-        if (estimatedBatch !== currentBatch) {
-            currentBatch = estimatedBatch;
-            const batchStatus = document.getElementById('batchStatus');
-            if (batchStatus) {
-                batchStatus.textContent = `Processing batch ${currentBatch} of ${totalBatches}...`;
-            }
-        }
-        
         if (progress > 30 && progress < 60) {
-            progressDetails.textContent = `Processing ${total} devices in ${totalBatches} batch${totalBatches !== 1 ? 'es' : ''}...`;
+            progressDetails.textContent = `Processing ${total} devices...`;
         } else if (progress >= 60) {
             progressDetails.textContent = 'Finalizing operation...';
         }
@@ -603,7 +570,74 @@ function showProgressModal(title, message) {
     // Store interval for cleanup
     modal.progressInterval = progressInterval;
     
-    console.log(`📊 Progress modal showing: ${total} devices in ${totalBatches} batches`);
+    console.log(`📊 Progress modal showing: ${total} devices`);
+}
+
+function updateStreamProgress(done, total, result) {
+    // Real progress from a streamed operation replaces the simulated animation
+    const modal = document.getElementById('progressModal');
+    if (modal && modal.progressInterval) {
+        clearInterval(modal.progressInterval);
+        modal.progressInterval = null;
+    }
+    
+    const progressFill = document.getElementById('progressFill');
+    const progressText = document.getElementById('progressText');
+    const progressDetails = document.getElementById('progressDetails');
+    const batchStatus = document.getElementById('batchStatus');
+    
+    if (progressFill) progressFill.style.width = Math.round(done / total * 100) + '%';
+    if (progressText) progressText.textContent = `${done} of ${total} devices done`;
+    if (progressDetails) progressDetails.textContent = `${result.device || result.ip}: ${result.message || result.status}`;
+    if (batchStatus) batchStatus.textContent = `${total - done} remaining`;
+}
+
+async function streamDeviceResults(url, devices) {
+    // Ask for NDJSON: one line per device as it finishes, then a summary line.
+    // Returns the same shape as the non-streamed response ({status, results, summary}).
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            devices: devices,
+            stream: true
+        })
+    });
+    
+    // Validation errors come back as plain JSON
+    if (!(response.headers.get('content-type') || '').includes('application/x-ndjson')) {
+        return await response.json();
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    const results = [];
+    let final = { status: 'error', message: 'Connection closed before all devices finished' };
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        
+        for (const line of lines) {
+            if (!line.trim()) continue;
+            const message = JSON.parse(line);
+            if (message.event === 'result') {
+                results.push(message.result);
+                updateStreamProgress(message.done, message.total, message.result);
+            } else {
+                final = message;
+            }
+        }
+    }
+    
+    return { ...final, results: results };
 }
 
 function hideProgressModal() {
@@ -960,76 +994,67 @@ async function batchUpdateAllFirmware() {
         return;
     }
     
-    if (!confirm(`Start batch update for ${readyDevices.length} devices? (10 devices at a time)`)) {
+    if (!confirm(`Start batch update for ${readyDevices.length} devices? (up to 10 devices at a time, adjusted to how the devices respond)`)) {
         return;
     }
     
-    // Process in batches of 10
-    const BATCH_SIZE = 10;
-    let successCount = 0;
-    let errorCount = 0;
+    readyDevices.forEach(device => { device.status = 'UPDATING'; });
+    renderFirmwareDeviceTable();
     
-    for (let i = 0; i < readyDevices.length; i += BATCH_SIZE) {
-        const batch = readyDevices.slice(i, i + BATCH_SIZE);
-        const batchNumber = Math.floor(i / BATCH_SIZE) + 1;
-        const totalBatches = Math.ceil(readyDevices.length / BATCH_SIZE);
-        
-        console.log(`Processing batch ${batchNumber}/${totalBatches} (${batch.length} devices)`);
-        
-        // Update all devices in this batch in parallel
-        const batchPromises = batch.map(device => {
-            device.status = 'UPDATING';
-            renderFirmwareDeviceTable();
-            
-            return fetch('/cctv-tools/update-single-firmware', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
+    try {
+        // One background job pushes the firmware, at the server's adaptive "cctv_firmware" limit (starts at 3, max 10 by default)
+        const response = await fetch('/cctv-tools/batch-update-firmware', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                devices: readyDevices.map(device => ({
                     ip: device.ip,
                     username: device.username || 'admin',
-                    password: device.password || '123456',
-                    firmware_version: firmwareVersion
-                })
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    device.status = 'SUCCESS';
-                    successCount++;
-                } else {
-                    device.status = 'ERROR';
-                    device.error = data.error || 'Update failed';
-                    errorCount++;
-                }
-                return data;
+                    password: device.password || '123456'
+                })),
+                firmware_version: firmwareVersion
             })
-            .catch(error => {
-                device.status = 'ERROR';
-                device.error = error.message;
-                errorCount++;
-                return { success: false, error: error.message };
-            });
         });
+        const started = await response.json();
+        if (started.status !== 'success') {
+            throw new Error(started.message);
+        }
         
-        // Wait for this batch to complete
-        await Promise.all(batchPromises);
+        const devicesByIp = Object.fromEntries(readyDevices.map(device => [device.ip, device]));
+        const applyResults = job => {
+            (job.results || []).forEach(result => {
+                const device = devicesByIp[result.ip];
+                if (device && device.status === 'UPDATING') {
+                    device.status = result.success ? 'SUCCESS' : 'ERROR';
+                    device.error = result.error || (result.success ? undefined : 'Update failed');
+                }
+            });
+            renderFirmwareDeviceTable();
+            console.log(`Firmware push ${job.done}/${job.total}, ETA ${CommonUtils.formatEta(job.eta_seconds)}`);
+        };
         
-        // Update UI after each batch
+        const job = await CommonUtils.waitForJob(started.job_id, applyResults, 3000);
+        readyDevices.filter(device => device.status === 'UPDATING').forEach(device => {
+            device.status = 'ERROR';
+            device.error = `Not updated (job ${job.state})`;
+        });
         renderFirmwareDeviceTable();
         
-        // Small delay between batches
-        if (i + BATCH_SIZE < readyDevices.length) {
-            await new Promise(resolve => setTimeout(resolve, 1000));
-        }
+        // Show final summary
+        showAlert(
+            `Batch update ${job.state}!\nSuccess: ${job.succeeded}\nFailed: ${job.failed}`,
+            job.state === 'completed' && job.failed === 0 ? 'success' : 'warning'
+        );
+    } catch (error) {
+        readyDevices.filter(device => device.status === 'UPDATING').forEach(device => {
+            device.status = 'ERROR';
+            device.error = error.message;
+        });
+        renderFirmwareDeviceTable();
+        showAlert(`Batch update failed: ${error.message}`, 'error');
     }
-    
-    // Show final summary
-    showAlert(
-        `Batch update completed!\nSuccess: ${successCount}\nFailed: ${errorCount}`,
-        successCount > 0 && errorCount === 0 ? 'success' : 'warning'
-    );
 }
 
 function sortConfigTable(column) {
@@ -365,6 +365,34 @@ function copyToClipboard(text) {
     }
 }
 
+// Background Jobs: long operations return a job id right away, then report progress here
+async function waitForJob(jobId, onProgress = null, intervalMs = 2000) {
+    // Poll the job until it is no longer queued or running; returns the final job
+    while (true) {
+        const response = await fetch(`/api/jobs/${jobId}`);
+        const data = await response.json();
+        if (data.status !== 'success') {
+            throw new Error(data.message || `Job ${jobId} not found`);
+        }
+        const job = data.job;
+        if (onProgress) {
+            onProgress(job);
+        }
+        if (!['queued', 'running'].includes(job.state)) {
+            return job;
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
+function formatEta(seconds) {
+    if (seconds === null || seconds === undefined) {
+        return 'estimating...';
+    }
+    const minutes = Math.floor(seconds / 60);
+    return minutes > 0 ? `${minutes}m ${Math.round(seconds % 60)}s` : `${Math.round(seconds)}s`;
+}
+
 // Export functions for use in other scripts
 window.CommonUtils = {
     showAlert,
@@ -379,5 +407,7 @@ window.CommonUtils = {
     validateForm,
     updateProgress,
     debounce,
-    copyToClipboard
+    copyToClipboard,
+    waitForJob,
+    formatEta
 };
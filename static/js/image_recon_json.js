@@ -959,21 +959,28 @@ async function restartServiceAfterSave(serverIp) {
     statusDiv.innerHTML = '<p style="color: #f0883e;">🔄 Restarting OSM service...</p>';
     
     try {
-        const response = await CommonUtils.apiRequest('/image-recon-service/restart-service', {
+        let response = await CommonUtils.apiRequest('/image-recon-service/restart-service', {
             method: 'POST',
             body: JSON.stringify({
-                server_ip: serverIp,
+                servers: [{ ip: serverIp, hostname: serverIp, label: '' }],
                 service_name: 'osm',
                 initiated_by: 'Edit JSON Modal'
             })
         });
         
-        if (response.status === 'success') {
+        // The restart runs as a background job; wait until it passes (or fails) the health gate
+        while (response.status === 'success' && ['pending', 'running'].includes(response.state)) {
+            await new Promise(resolve => setTimeout(resolve, 3000));
+            response = await CommonUtils.apiRequest(`/image-recon-service/restart-status/${response.job_id}`);
+        }
+        const result = (response.results || [])[0] || {};
+        
+        if (response.status === 'success' && response.state === 'completed' && result.status === 'success') {
             console.log(`✅ Service restart successful on ${serverIp}`);
             statusDiv.innerHTML = `<p style="color: #3fb950;">✅ Service restarted successfully on ${serverIp}!</p>`;
             CommonUtils.showAlert('Service restarted successfully!', 'success');
         } else {
-            throw new Error(response.message || 'Failed to restart service');
+            throw new Error(result.message || response.abort_reason || response.message || 'Failed to restart service');
         }
     } catch (error) {
         console.error(`❌ Service restart failed on ${serverIp}:`, error);
@@ -7,6 +7,9 @@ let currentServerHostname = null;
 let emailConfig = {};
 let searchTimeout = null;
 let logsRefreshInterval = null;
+let logsEventSource = null;
+let logLines = [];
+const MAX_LOG_LINES = 1000;
 
 // Performance tracking
 const pageLoadStart = performance.now();
@@ -342,21 +345,32 @@ async function refreshServers() {
     refreshBtn.disabled = true;
     
     try {
-        // Call backend to fetch IDs from each server via SSH
+        // Start the refresh job (SSH into each server for its IDs), then follow its progress
         const response = await fetch('/image-recon-service/refresh-servers', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             }
         });
+        const started = await response.json();
+        if (started.status !== 'success') {
+            CommonUtils.showAlert('Failed to refresh servers: ' + started.message, 'error');
+            return;
+        }
         
-        const data = await response.json();
+        const job = await CommonUtils.waitForJob(started.job_id, progress => {
+            if (progress.total) {
+                refreshBtn.innerHTML = `<i class="fas fa-spinner fa-spin"></i> Fetching from servers... (${progress.done}/${progress.total})`;
+            }
+        }, 1000);
+        const data = job.result || { status: 'error', message: job.error || `Refresh ${job.state}` };
         
         if (data.status === 'success') {
             // Reload the server list from the updated ir.json
             await loadServers();
+            const timedOutNote = data.timed_out ? ` (${data.timed_out} timed out, previous IDs kept)` : '';
             CommonUtils.showAlert(
-                `Server list refreshed! ${data.successful_fetches}/${data.total_servers} servers successful`,
+                `Server list refreshed! ${data.successful_fetches}/${data.total_servers} servers successful${timedOutNote}`,
                 'success'
             );
         } else {
@@ -392,24 +406,94 @@ async function showLogs(serverIP, hostname) {
     
     modal.style.display = 'block';
     
-    // Clear any existing refresh interval
-    if (logsRefreshInterval) {
-        console.log('⏹️ Clearing existing log refresh interval');
-        clearInterval(logsRefreshInterval);
-    }
-    
-    // Start auto-refresh every 2.5 seconds (matches Flask version)
-    console.log('⏰ Starting log auto-refresh (every 2.5s)');
-    logsRefreshInterval = setInterval(() => {
-        loadLogs(serverIP);
-    }, 2500);
+    // Stop any previous live stream or refresh interval
+    stopLogStream();
     
     // Hide search results
     document.getElementById('searchResults').style.display = 'none';
     document.getElementById('searchBox').value = '';
     
-    // Load logs
-    await loadLogs(serverIP);
+    if (window.EventSource) {
+        // Live tail: the server pushes new lines as they are logged
+        startLogStream(serverIP);
+    } else {
+        // Fallback: auto-refresh every 2.5 seconds (matches Flask version)
+        console.log('⏰ Starting log auto-refresh (every 2.5s)');
+        logsRefreshInterval = setInterval(() => {
+            loadLogs(serverIP);
+        }, 2500);
+        await loadLogs(serverIP);
+    }
+}
+
+function startLogStream(serverIP, lines = 50) {
+    console.log(`📡 Opening live log stream for ${serverIP}`);
+    const logsContainer = document.getElementById('logs');
+    logsEventSource = new EventSource(`/image-recon-service/stream-logs?server_ip=${encodeURIComponent(serverIP)}&lines=${lines}`);
+    
+    // Sent on every (re)connect: replaces whatever is shown
+    logsEventSource.addEventListener('backlog', (event) => {
+        const data = JSON.parse(event.data);
+        if (data.logs.startsWith('Error:')) {
+            console.warn(`⚠️ Failed to load logs: ${data.logs}`);
+            logLines = [data.logs];
+        } else {
+            logLines = data.logs.split('\n');
+        }
+        renderLogLines(logsContainer, true);
+    });
+    
+    logsEventSource.addEventListener('lines', (event) => {
+        appendLogLines(logsContainer, JSON.parse(event.data).lines);
+    });
+    
+    logsEventSource.addEventListener('dropped', (event) => {
+        const count = JSON.parse(event.data).count;
+        console.warn(`⚠️ ${count} log lines skipped (client too slow or rate limited)`);
+        appendLogLines(logsContainer, [`... ${count} lines skipped ...`]);
+    });
+    
+    logsEventSource.addEventListener('status', (event) => {
+        const message = JSON.parse(event.data).message;
+        console.warn(`⚠️ ${message}`);
+        appendLogLines(logsContainer, [`-- ${message} --`]);
+    });
+    
+    logsEventSource.onerror = () => {
+        // EventSource reconnects on its own
+        console.warn('⚠️ Live log stream interrupted, reconnecting...');
+    };
+}
+
+function appendLogLines(logsContainer, lines) {
+    logLines.push(...lines);
+    if (logLines.length > MAX_LOG_LINES) {
+        logLines = logLines.slice(-MAX_LOG_LINES);
+    }
+    // Only follow the tail if the user hasn't scrolled up
+    const atBottom = logsContainer.scrollHeight - logsContainer.scrollTop - logsContainer.clientHeight < 40;
+    renderLogLines(logsContainer, atBottom);
+}
+
+function renderLogLines(logsContainer, scrollToBottom) {
+    logsContainer.textContent = logLines.join('\n');
+    if (scrollToBottom) {
+        logsContainer.scrollTop = logsContainer.scrollHeight;
+    }
+}
+
+function stopLogStream() {
+    if (logsEventSource) {
+        console.log('⏹️ Closing live log stream');
+        logsEventSource.close();
+        logsEventSource = null;
+    }
+    if (logsRefreshInterval) {
+        console.log('⏹️ Clearing existing log refresh interval');
+        clearInterval(logsRefreshInterval);
+        logsRefreshInterval = null;
+    }
+    logLines = [];
 }
 
 async function loadLogs(serverIP, lines = 50) {
@@ -456,7 +540,13 @@ async function loadLogs(serverIP, lines = 50) {
 async function refreshLogs() {
     if (currentServerIP) {
         console.log('🔄 Manual log refresh triggered');
-        await loadLogs(currentServerIP);
+        if (logsEventSource) {
+            // Reopen the stream to get a fresh backlog
+            stopLogStream();
+            startLogStream(currentServerIP);
+        } else {
+            await loadLogs(currentServerIP);
+        }
     }
 }
 
@@ -486,10 +576,21 @@ async function restartService() {
         const data = await response.json();
         
         if (data.status === 'success') {
-            console.log('✅ Service restart initiated successfully');
+            console.log(`✅ Service restart initiated (job ${data.job_id})`);
             showMessage('Service restart initiated successfully!', 'success');
             // Refresh logs after a delay
             setTimeout(() => refreshLogs(), 3000);
+            
+            // The restart runs in the background; report once it passes (or fails) the health gate
+            const job = await waitForRestartJob(data.job_id);
+            const result = (job.results || [])[0] || {};
+            if (job.state === 'completed' && result.status === 'success') {
+                console.log(`✅ ${currentServerHostname || 'Server'} restarted and healthy`);
+                showMessage(result.message || 'Service restarted successfully!', 'success');
+            } else {
+                console.warn('⚠️ Restart did not complete cleanly:', job);
+                showMessage('Service restart failed: ' + (result.message || job.abort_reason || job.message || job.state), 'error');
+            }
         } else {
             console.warn('⚠️ Failed to restart service:', data.message);
             showMessage('Failed to restart service: ' + data.message, 'error');
@@ -500,6 +601,19 @@ async function restartService() {
     }
 }
 
+async function waitForRestartJob(jobId, intervalMs = 3000) {
+    // Poll the rolling restart job until it is no longer running
+    while (true) {
+        const response = await fetch(`/image-recon-service/restart-status/${jobId}`);
+        const job = await response.json();
+        if (job.status !== 'success' || !['pending', 'running'].includes(job.state)) {
+            return job;
+        }
+        console.log(`⏳ Restart job ${jobId}: wave ${job.current_wave}/${job.waves_total}`);
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
 // =====================
 // 📧 Email Management
 // =====================
@@ -805,11 +919,20 @@ async function startBatchUpdate() {
         
         const data = await response.json();
         
-        if (data.status === 'success') {
-            displayUpdateResults(data.results);
-        } else {
+        if (!data.job_id) {
             hideProgressModal();
             CommonUtils.showAlert('Batch update failed: ' + data.message, 'error');
+            return;
+        }
+        if (data.status !== 'success') {
+            // An update is already running: follow that one instead of starting another
+            console.warn(`⚠️ ${data.message}, following job ${data.job_id}`);
+        }
+        
+        const job = await CommonUtils.waitForJob(data.job_id, showUpdateProgress, 3000);
+        displayUpdateResults((job.details || {}).results || []);
+        if (job.state !== 'completed') {
+            CommonUtils.showAlert(`Batch update ${job.state}${job.error ? ': ' + job.error : ''}`, 'error');
         }
     } catch (error) {
         console.error('Error starting batch update:', error);
@@ -818,6 +941,17 @@ async function startBatchUpdate() {
     }
 }
 
+function showUpdateProgress(job) {
+    const rollout = job.details || {};
+    const stage = rollout.current_wave === 1 && rollout.canary_size ? 'canary' : `wave ${rollout.current_wave || 0}/${rollout.waves_total || 0}`;
+    document.getElementById('progressText').textContent =
+        `Updating ${job.done}/${job.total} servers (${job.progress_percent}%) - ${stage}`;
+    document.getElementById('progressDetails').textContent =
+        `Target: ${rollout.target_version || 'set by canary'} · ` +
+        `✅ ${job.succeeded} ❌ ${job.failed} · Remaining: ${CommonUtils.formatEta(job.eta_seconds)}`;
+    document.getElementById('progressFill').style.width = `${job.progress_percent}%`;
+}
+
 function displayUpdateResults(results) {
     const progressText = document.getElementById('progressText');
     const progressDetails = document.getElementById('progressDetails');
@@ -828,7 +962,7 @@ function displayUpdateResults(results) {
     
     let detailsHTML = '<h4>Update Results:</h4>';
     results.forEach(result => {
-        const statusIcon = result.status === 'success' ? '✅' : '❌';
+        const statusIcon = { success: '✅', skipped: '⏭️' }[result.status] || '❌';
         detailsHTML += `<div>${statusIcon} ${result.hostname}: ${result.message}</div>`;
     });
     
@@ -844,11 +978,8 @@ function displayUpdateResults(results) {
 // 🎛️ Modal Management
 // =====================
 function closeModal() {
-    // Stop auto-refresh
-    if (logsRefreshInterval) {
-        clearInterval(logsRefreshInterval);
-        logsRefreshInterval = null;
-    }
+    // Stop the live stream / auto-refresh
+    stopLogStream();
     
     document.getElementById('logsModal').style.display = 'none';
     currentServerIP = null;
@@ -913,7 +1044,11 @@ function setupEventListeners() {
         modals.forEach(modalId => {
             const modal = document.getElementById(modalId);
             if (event.target === modal) {
-                modal.style.display = 'none';
+                if (modalId === 'logsModal') {
+                    closeModal();
+                } else {
+                    modal.style.display = 'none';
+                }
             }
         });
     });
@@ -926,7 +1061,11 @@ function setupEventListeners() {
             modals.forEach(modalId => {
                 const modal = document.getElementById(modalId);
                 if (modal.style.display === 'block') {
-                    modal.style.display = 'none';
+                    if (modalId === 'logsModal') {
+                        closeModal();
+                    } else {
+                        modal.style.display = 'none';
+                    }
                 }
             });
             
@@ -239,8 +239,7 @@ async function checkGroupStatus(groupName) {
                 'Content-Type': 'application/json',
             },
             body: JSON.stringify({ 
-                group_name: groupName,
-                max_concurrent: 20
+                group_name: groupName
             })
         });
         
@@ -458,23 +457,36 @@ async function executeBatchRestart() {
             },
             body: JSON.stringify({ 
                 group_name: currentBatchGroup,
-                operation_mode: operationMode,
-                max_concurrent: 3
+                operation_mode: operationMode
             })
         });
         
-        const data = await response.json();
+        const started = await response.json();
+        if (started.status !== 'success') {
+            hideProgressModal();
+            console.error(`❌ Batch restart failed: ${started.message}`);
+            showAlert(`Batch restart failed: ${started.message}`, 'error');
+            return;
+        }
+        
+        // The restart runs as a background job; follow its progress
+        const job = await CommonUtils.waitForJob(started.job_id, progress => {
+            document.getElementById('progressBar').style.width = `${progress.progress_percent}%`;
+            document.getElementById('progressStats').textContent =
+                `${progress.done}/${progress.total} done · ${progress.failed} failed · ETA ${CommonUtils.formatEta(progress.eta_seconds)}`;
+        });
         const endTime = performance.now();
         
         hideProgressModal();
         
-        if (data.status === 'success') {
+        if (job.state === 'completed') {
+            const summary = job.result.summary;
             console.log(`✅ Batch restart complete in ${(endTime - startTime).toFixed(2)}ms`);
-            console.log(`📊 Results: ${data.summary.successful} successful, ${data.summary.failed} failed`);
-            showAlert(`Batch restart complete!\n${data.summary.successful} successful, ${data.summary.failed} failed`, 'success');
+            console.log(`📊 Results: ${summary.successful} successful, ${summary.failed} failed`);
+            showAlert(`Batch restart complete!\n${summary.successful} successful, ${summary.failed} failed`, 'success');
         } else {
-            console.error(`❌ Batch restart failed: ${data.message}`);
-            showAlert(`Batch restart failed: ${data.message}`, 'error');
+            console.error(`❌ Batch restart ${job.state}: ${job.error}`);
+            showAlert(`Batch restart ${job.state}: ${job.succeeded} successful, ${job.failed} failed before it stopped`, 'error');
         }
         
     } catch (error) {